@@ -1,23 +1,45 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, request, jsonify, g, has_request_context, Response, stream_with_context
 from flask_cors import CORS
 import os
 from dotenv import load_dotenv
 import logging
 import json
+import math
 import re
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from groq import Groq
-import PyPDF2
-from docx import Document
 import io
+import threading
+import time
+from typing import Optional
+import metrics
+import tracing
+from tracing import create_tracer_from_env
+from llm_cache import MemoryCache, create_cache_from_env, make_cache_key
+from question_pool import QuestionPool, job_fingerprint
+from llm_async import AsyncLLMClient
+from llm_router import Route, StubLLMClient, create_router_from_env, endpoint_of
+from prompts import (PromptInput, PromptStats, build_batch_prompt, build_evaluation_prompt, build_ideal_prompt,
+                     build_question_prompt, build_repair_prompt, build_score_batch_prompt, build_score_prompt,
+                     build_summary_prompt, prompt_tokens)
+from llm_output import OutputParseError, OutputParser
+from json_stream import iter_array_items
+from score_batcher import ScoreBatcher
+from resume_parser import ALLOWED_EXTENSIONS, MAX_FILE_BYTES, FileTooLargeError, spool_upload
+from resume_pool import ResumeParsePool, PoolBusyError
+from resume_cache import create_resume_cache_from_env, new_hasher
+from db import InvalidCursorError, JobStore, ReadThroughCache, SharedVersions, create_supabase_client
+from email_outbox import EmailOutbox, SMTPPool
+from email_templates import DEFAULT_TEMPLATE_DIR, EmailTemplates, TemplateError
+from leaderboard import MemoryLeaderboard, SupabaseLeaderboard
+from bulk_ingest import (StudentUpserter, ingest, iter_zip_files, make_workdir, remove_workdir,
+                         MAX_ARCHIVE_FILES)
+from rate_limiter import (RateLimitScheduler, RateLimitError, is_rate_limit_error,
+                          PRIORITY_INTERACTIVE, PRIORITY_DEFAULT, PRIORITY_BACKGROUND)
 
 # Load environment variables
 load_dotenv()
 
-app = Flask(__name__)
-CORS(app, resources={r"/api/*": {"origins": ["https://swipe-ai-interview.vercel.app", "http://localhost:3000"]}}, supports_credentials=True)
+# Routes are registered on this blueprint; create_app() builds the Flask app around it
+api = Blueprint('api', __name__)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -32,9 +54,10 @@ SMTP_PORT = os.getenv('SMTP_PORT')
 SMTP_USER = os.getenv('SMTP_USER')
 SMTP_PASS = os.getenv('SMTP_PASS')
 FLASK_SECRET = os.getenv('FLASK_SECRET')
-
-# Set Flask secret key
-app.config['SECRET_KEY'] = FLASK_SECRET or 'dev-secret-key'
+GROQ_MODEL = os.getenv('GROQ_MODEL', 'llama-3.1-8b-instant')
+LLM_FALLBACK_MODEL = os.getenv('LLM_FALLBACK_MODEL')
+LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'groq')
+GROQ_TEMPERATURE = 0.7
 
 # Diagnostics: log env presence (without leaking secrets)
 try:
@@ -51,18 +74,184 @@ try:
 except Exception:
     logger.info('[Backend:init] env diagnostics unavailable')
 
-# Initialize Groq client
-groq_client = None
-if GROQ_API_KEY:
-    try:
-        groq_client = Groq(api_key=GROQ_API_KEY)
-        logger.info("Groq client initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize Groq client: {e}")
-else:
+# The Groq SDK is imported and its client created on the first LLM call (see AsyncLLMClient)
+if not GROQ_API_KEY:
     logger.warning("GROQ_API_KEY not found, using mock responses")
 
-@app.route('/api/health', methods=['GET'])
+# Supabase client is created on first use so the app starts without it
+supabase_client = None
+job_store = None
+
+def get_supabase_client():
+    """Return the shared, pooled Supabase client, or None when Supabase env is not configured"""
+    global supabase_client
+    if supabase_client is None and SUPABASE_URL and SUPABASE_KEY:
+        try:
+            supabase_client = create_supabase_client(
+                SUPABASE_URL, SUPABASE_KEY,
+                max_connections=int(os.getenv('SUPABASE_MAX_CONNECTIONS', 20)),
+                max_keepalive_connections=int(os.getenv('SUPABASE_MAX_KEEPALIVE', 10)),
+                timeout=float(os.getenv('SUPABASE_TIMEOUT', 10)),
+            )
+            logger.info("Supabase client initialized successfully")
+        except Exception as e:
+            logger.error(f"Failed to initialize Supabase client: {e}")
+    return supabase_client
+
+def get_job_store():
+    """Return the Supabase-backed job store, or None to fall back to mock data"""
+    global job_store
+    if job_store is None:
+        client = get_supabase_client()
+        if client:
+            job_store = JobStore(client, page_size=int(os.getenv('API_PAGE_SIZE', 50)))
+    return job_store
+
+leaderboard = None
+
+def get_leaderboard():
+    """Return the Supabase leaderboard, or a per-process one when Supabase is not configured"""
+    global leaderboard
+    if leaderboard is None:
+        client = get_supabase_client()
+        leaderboard = SupabaseLeaderboard(client) if client else MemoryLeaderboard()
+    return leaderboard
+
+# Read-through cache for job and candidate listings, invalidated on writes. Namespace versions are
+# shared through a SQLite file so a write in one worker invalidates the others; writes that bypass
+# the API (the browser's Supabase client) show up once pages expire after READ_CACHE_TTL
+READ_CACHE_VERSIONS_PATH = os.getenv('READ_CACHE_VERSIONS_PATH',
+                                     os.path.join(os.path.dirname(__file__), '.cache', 'read_cache_versions.sqlite3'))
+read_cache = ReadThroughCache(MemoryCache(
+    ttl_seconds=float(os.getenv('READ_CACHE_TTL', 30)),
+    max_entries=int(os.getenv('READ_CACHE_MAX_ENTRIES', 512)),
+), versions=SharedVersions(READ_CACHE_VERSIONS_PATH) if READ_CACHE_VERSIONS_PATH.lower() not in ('', 'off', 'none') else None)
+
+# Initialize pooled async clients and the model router used for all completions
+def create_groq_async_client(api_key: str) -> AsyncLLMClient:
+    return AsyncLLMClient(
+        api_key=api_key,
+        model=GROQ_MODEL,
+        temperature=GROQ_TEMPERATURE,
+        max_connections=int(os.getenv('LLM_MAX_CONNECTIONS', 20)),
+        max_keepalive_connections=int(os.getenv('LLM_MAX_KEEPALIVE', 10)),
+        max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', 8)),
+        timeout=float(os.getenv('LLM_TIMEOUT', 30)),
+        # 429 retries are handled by llm_scheduler so they respect priorities and deadlines
+        max_retries=0,
+    )
+
+# Shared rate-limit scheduler in front of every Groq call
+llm_scheduler = RateLimitScheduler(
+    requests_per_minute=float(os.getenv('GROQ_RPM', 30)),
+    tokens_per_minute=float(os.getenv('GROQ_TPM', 0)),
+    max_queue=int(os.getenv('LLM_MAX_QUEUE', 100)),
+    max_retries=int(os.getenv('LLM_MAX_RETRIES', 3)),
+)
+
+# Resources that start threads or open files (LLM loop, caches, pools, email workers) are
+# built on first use, so importing the app, e.g. on a serverless cold start, starts nothing
+_init_lock = threading.RLock()
+
+llm_client = None
+
+def get_llm_client():
+    """Return the model router used for all completions, or None when no LLM is configured"""
+    global llm_client
+    if llm_client is None and (LLM_PROVIDER == 'stub' or GROQ_API_KEY):
+        with _init_lock:
+            if llm_client is None:
+                llm_routes = []
+                if LLM_PROVIDER == 'stub':
+                    llm_routes.append(Route('stub', StubLLMClient(latency=float(os.getenv('LLM_STUB_LATENCY', 0)))))
+                    logger.warning("LLM_PROVIDER=stub, completions come from the local deterministic stub")
+                else:
+                    groq_async_client = create_groq_async_client(GROQ_API_KEY)
+                    llm_routes.append(Route('groq', groq_async_client))
+                    if LLM_FALLBACK_MODEL:
+                        # A separate key puts the fallback on its own account and connection pool
+                        fallback_key = os.getenv('LLM_FALLBACK_API_KEY')
+                        fallback_client = create_groq_async_client(fallback_key) if fallback_key else groq_async_client
+                        llm_routes.append(Route(f'groq:{LLM_FALLBACK_MODEL}', fallback_client, LLM_FALLBACK_MODEL))
+                # Hedges and failovers are charged to llm_scheduler too
+                llm_client = create_router_from_env(llm_routes, llm_scheduler)
+    return llm_client
+
+# Estimated input tokens per prompt type, reported in /api/stats
+prompt_stats = PromptStats()
+
+llm_cache = None
+_llm_cache_loaded = False
+
+def get_llm_cache():
+    """Return the LLM response cache, or None when LLM_CACHE_BACKEND disables it"""
+    global llm_cache, _llm_cache_loaded
+    if not _llm_cache_loaded:
+        with _init_lock:
+            if not _llm_cache_loaded:
+                llm_cache = create_cache_from_env()
+                if llm_cache:
+                    logger.info(f"LLM response cache enabled ({llm_cache.backend})")
+                _llm_cache_loaded = True
+    return llm_cache
+
+HTTP_REQUEST_SECONDS = metrics.histogram('swipe_http_request_seconds',
+                                         'Time to response headers by route, method and status',
+                                         ('route', 'method', 'status'))
+MOCK_FALLBACKS = metrics.counter('swipe_mock_fallbacks_total',
+                                 'Responses served from mock or heuristic content instead of the LLM',
+                                 ('endpoint', 'reason'))
+
+def record_mock_fallback(endpoint: str, count: int = 1) -> None:
+    """Count responses (or items) that fell back to mock content"""
+    MOCK_FALLBACKS.inc(endpoint, 'llm_error' if get_llm_client() else 'llm_unconfigured', amount=count)
+
+# Per-request traces; sampled, slow and failed requests are exported
+tracer = create_tracer_from_env()
+
+@api.before_app_request
+def start_request():
+    """Start the request timer and trace; X-Interview-ID ties the requests of one interview together"""
+    g.request_started = time.perf_counter()
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    g.trace = tracer.start(f'{request.method} {route}', request_id=request.headers.get('X-Request-ID'),
+                           route=route, method=request.method,
+                           interview_id=request.headers.get('X-Interview-ID'))
+
+@api.teardown_app_request
+def finish_request_trace(error):
+    """Runs once the response, including a streamed body, is complete"""
+    trace = g.pop('trace', None)
+    if trace is not None:
+        status = g.get('response_status', 500)
+        tracer.finish(trace, error=error is not None or status >= 500, status=status)
+
+@api.after_app_request
+def record_request_metrics(response):
+    """Observe request latency; streamed responses are measured up to their headers"""
+    started = g.get('request_started')
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, route, request.method,
+                                     str(response.status_code))
+    g.response_status = response.status_code
+    trace = g.get('trace')
+    if trace is not None:
+        response.headers['X-Request-ID'] = trace.request_id
+    return response
+
+@api.after_app_request
+def add_llm_cache_header(response):
+    """Report whether the response came from the LLM cache or the question pool"""
+    cache_status = g.get('llm_cache_status')
+    if cache_status:
+        response.headers['X-LLM-Cache'] = cache_status
+    pool_status = g.get('question_pool_status')
+    if pool_status:
+        response.headers['X-Question-Pool'] = pool_status
+    return response
+
+@api.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
@@ -70,24 +259,290 @@ def health_check():
         'message': 'Swipe AI Interview Portal API is running'
     })
 
-def call_groq_api(prompt: str, max_tokens: int = 500) -> str:
-    """Call Groq API with error handling"""
-    if not groq_client:
+@api.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus metrics in the text exposition format"""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+@api.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Runtime statistics for caches and other shared resources (null until first used or when disabled)"""
+    return jsonify({
+        'llm_cache': llm_cache.stats() if llm_cache else None,
+        'question_pool': question_pool.stats() if question_pool else None,
+        'score_batcher': score_batcher.stats() if score_batcher else None,
+        'prompts': prompt_stats.stats(),
+        'llm_output': output_parser.stats(),
+        'rate_limiter': llm_scheduler.stats(),
+        'llm_router': llm_client.stats() if llm_client else None,
+        'resume_pool': resume_pool.stats(),
+        'resume_cache': resume_cache.stats() if resume_cache else None,
+        'read_cache': read_cache.stats(),
+        'tracing': tracer.stats(),
+        'email_outbox': email_outbox.stats() if email_outbox else None
+    })
+
+def record_llm_cache_status(status: str) -> None:
+    """Remember the cache outcome for the current request (HIT, MISS or BYPASS)"""
+    if not has_request_context():
+        return
+    # A request that issues several calls reports MISS if any of them missed
+    if g.get('llm_cache_status') != 'MISS':
+        g.llm_cache_status = status
+
+def cache_model(prompt: PromptInput) -> str:
+    """Model whose completions are cached for this prompt"""
+    client = get_llm_client()
+    return client.model_for(prompt) if client else GROQ_MODEL
+
+def invalidate_llm_cache(prompt: PromptInput, max_tokens: int = 500) -> None:
+    """Drop a cached completion, e.g. after it turned out to be unusable"""
+    cache = get_llm_cache()
+    if cache:
+        cache.delete(make_cache_key(cache_model(prompt), prompt, max_tokens, GROQ_TEMPERATURE))
+
+def _cache_lookup(prompt: PromptInput, max_tokens: int, use_cache: bool):
+    """Return (cache_key, cached_response); cache_key is None when the cache is bypassed"""
+    cache = get_llm_cache() if use_cache else None
+    if not cache:
+        record_llm_cache_status('BYPASS')
+        return None, None
+    cache_key = make_cache_key(cache_model(prompt), prompt, max_tokens, GROQ_TEMPERATURE)
+    cached = cache.get(cache_key)
+    record_llm_cache_status('HIT' if cached is not None else 'MISS')
+    return cache_key, cached
+
+def call_groq_api(prompt: PromptInput, max_tokens: int = 500, use_cache: bool = False,
+                  priority: int = PRIORITY_DEFAULT) -> str:
+    """Call Groq API with error handling, optionally through the response cache"""
+    client = get_llm_client()
+    if not client:
+        raise Exception("Groq client not initialized")
+    
+    with tracing.span('llm.call', endpoint=endpoint_of(prompt), max_tokens=max_tokens) as span:
+        cache_key, cached = _cache_lookup(prompt, max_tokens, use_cache)
+        if cached is not None:
+            if span:
+                span.set(cache='hit')
+            return cached
+        
+        prompt_stats.record(prompt)
+        try:
+            # The router pauses llm_scheduler on 429s itself
+            content = llm_scheduler.call(lambda: client.complete(prompt, max_tokens, priority),
+                                         tokens=prompt_tokens(prompt) + max_tokens, priority=priority,
+                                         penalize=False)
+        except Exception as e:
+            logger.error(f"Groq API error: {e}")
+            raise e
+        
+        if cache_key:
+            get_llm_cache().set(cache_key, content)
+        return content
+
+def call_groq_api_many(requests: list, use_cache: bool = False, priority: int = PRIORITY_DEFAULT) -> list:
+    """
+    Run several (prompt, max_tokens) completions concurrently over the pooled client.
+    Returns one entry per request: the response text, or the exception it failed with.
+    """
+    if not get_llm_client():
         raise Exception("Groq client not initialized")
     
+    with tracing.span('llm.call_many', requests=len(requests)):
+        return _call_groq_api_many(requests, use_cache, priority)
+
+def _call_groq_api_many(requests: list, use_cache: bool, priority: int) -> list:
+    results = [None] * len(requests)
+    pending = []
+    for i, (prompt, max_tokens) in enumerate(requests):
+        cache_key, cached = _cache_lookup(prompt, max_tokens, use_cache)
+        if cached is not None:
+            results[i] = cached
+        else:
+            prompt_stats.record(prompt)
+            pending.append((i, cache_key))
+    
+    attempt = 0
+    while pending:
+        batch = [requests[i] for i, _ in pending]
+        try:
+            llm_scheduler.acquire(tokens=sum(prompt_tokens(p) + m for p, m in batch),
+                                  priority=priority, requests=len(batch))
+        except RateLimitError as e:
+            for i, _ in pending:
+                results[i] = e
+            break
+        
+        responses = get_llm_client().gather(batch, priority)
+        throttled = []
+        for (i, cache_key), response in zip(pending, responses):
+            if isinstance(response, BaseException):
+                if is_rate_limit_error(response):
+                    throttled.append((i, cache_key))
+                logger.error(f"Groq API error: {response}")
+            elif cache_key:
+                get_llm_cache().set(cache_key, response)
+            results[i] = response
+        
+        # Retry only the requests Groq rejected with 429; the router already paused llm_scheduler,
+        # and the next acquire() waits that pause out
+        if not throttled or attempt >= llm_scheduler.max_retries:
+            break
+        time.sleep(llm_scheduler.backoff(attempt))
+        attempt += 1
+        pending = throttled
+    return results
+
+def stream_groq_api(prompt: PromptInput, max_tokens: int = 500, priority: int = PRIORITY_DEFAULT):
+    """Yield completion text deltas as Groq produces them"""
+    client = get_llm_client()
+    if not client:
+        raise Exception("Groq client not initialized")
+    with tracing.span('llm.stream', endpoint=endpoint_of(prompt), max_tokens=max_tokens):
+        prompt_stats.record(prompt)
+        llm_scheduler.acquire(tokens=prompt_tokens(prompt) + max_tokens, priority=priority)
+        yield from client.stream(prompt, max_tokens, priority)
+
+# Shared structured-output parser; success rates and parse latency are reported in /api/stats
+output_parser = OutputParser()
+
+def parse_llm_output(response: str, schema: str, repair: bool = True, priority: int = PRIORITY_DEFAULT) -> dict:
+    """Parse a completion against an output schema, asking Groq once to fix it if it cannot be parsed"""
+    def repair_output(text, output_schema, error):
+        return call_groq_api(build_repair_prompt(text, output_schema.example, error),
+                             max_tokens=min(4000, prompt_tokens(text) + 200), priority=priority)
+    with tracing.span('llm.parse', schema=schema, chars=len(response or '')):
+        return output_parser.parse(response, schema, repair=repair_output if repair and get_llm_client() else None)
+
+BATCH_DIFFICULTIES = ['easy', 'easy', 'medium', 'medium', 'hard', 'hard']
+
+def generate_question_batch(job_context: str, job_description: str, custom_questions=None, use_cache: bool = False,
+                            priority: int = PRIORITY_DEFAULT) -> list:
+    """Generate 6 (question, ideal_answer) pairs in one Groq call; raises ValueError on bad output"""
+    prompt = build_batch_prompt(job_context, job_description, custom_questions)
+    response = call_groq_api(prompt, max_tokens=2000, use_cache=use_cache, priority=priority)
+    logger.debug("Batch generation response: %.200s...", response)
+    
     try:
-        response = groq_client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama-3.1-8b-instant",
-            max_tokens=max_tokens,
-            temperature=0.7
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        logger.error(f"Groq API error: {e}")
-        raise e
+        result = parse_llm_output(response, 'question_batch', priority=priority)
+    except OutputParseError as e:
+        logger.error(f"JSON parse error: {e}, Response: {response}")
+        if use_cache:
+            # Don't keep serving an unusable completion from the cache
+            invalidate_llm_cache(prompt, max_tokens=2000)
+        raise ValueError(f"Invalid batch response: {e}")
+    
+    questions = result['questions']
+    for question, difficulty in zip(questions, BATCH_DIFFICULTIES):
+        question['difficulty'] = difficulty
+    return questions
+
+# Per-job question pools (only useful when questions come from Groq)
+question_pool = None
+
+def get_question_pool():
+    """Return the shared question pool, or None when no LLM is configured"""
+    global question_pool
+    if question_pool is None and get_llm_client():
+        with _init_lock:
+            if question_pool is None:
+                question_pool = QuestionPool(
+                    lambda context, description, custom: generate_question_batch(context, description, custom,
+                                                                                 priority=PRIORITY_BACKGROUND),
+                    target_per_difficulty=int(os.getenv('QUESTION_POOL_TARGET', 12)),
+                    low_watermark=int(os.getenv('QUESTION_POOL_LOW_WATERMARK', 4)),
+                    max_workers=int(os.getenv('QUESTION_POOL_WORKERS', 2)),
+                    max_jobs=int(os.getenv('QUESTION_POOL_MAX_JOBS', 200)),
+                    ttl_seconds=float(os.getenv('QUESTION_POOL_TTL', 24 * 3600)),
+                    max_pending_refills=int(os.getenv('QUESTION_POOL_MAX_REFILLS', 8)),
+                )
+    return question_pool
+
+def draw_pooled_questions(pool: QuestionPool, job_id, job_context: str, job_description: str,
+                          custom_questions, difficulties: list) -> Optional[list]:
+    """
+    Draw a question set for the job described by the request, or None on a miss.
+    A job's own pool is seeded from the stored job (create_job, update_job) and is only used when
+    the request describes the same job fields; otherwise the request is served from, and on a
+    miss warms, a pool keyed by the fingerprint of its own fields, so it cannot seed another job's pool.
+    """
+    fingerprint = job_fingerprint(job_context, job_description, custom_questions)
+    if job_id and pool.matches(str(job_id), fingerprint):
+        # A miss here already scheduled the job pool's refill
+        return pool.draw(str(job_id), difficulties)
+    pooled = pool.draw(fingerprint, difficulties)
+    if not pooled:
+        # Start warming so the next candidate for this job is served from the pool
+        pool.warm(fingerprint, job_context, job_description, custom_questions)
+    return pooled
+
+MOCK_QUESTIONS = {
+    'easy': 'What is React and how does it differ from vanilla JavaScript?',
+    'medium': 'Explain the concept of state management in React applications.',
+    'hard': 'Design a scalable architecture for a real-time chat application using React and Node.js.'
+}
 
-@app.route('/api/generate', methods=['POST'])
+def mock_ideal_answer(question: str) -> str:
+    return f'This is an ideal answer for: {question}. It demonstrates understanding of the concept and provides practical examples.'
+
+def parse_question_response(response: str, difficulty: str) -> dict:
+    """Parse a single-question completion; non-JSON output is used as the question text"""
+    try:
+        return parse_llm_output(response, 'question', repair=False)
+    except OutputParseError:
+        # If not valid JSON, wrap the response
+        return {
+            'question': response,
+            'difficulty': difficulty
+        }
+
+def parse_ideal_response(response: str) -> dict:
+    """Parse an ideal-answer completion; non-JSON output is used as the answer text"""
+    try:
+        return parse_llm_output(response, 'ideal_answer', repair=False)
+    except OutputParseError:
+        return {
+            'ideal': response
+        }
+
+def generate_questions_concurrently(job_context: str, difficulties: list) -> list:
+    """
+    Fallback for failed batch generation: generate each question, then each ideal
+    answer, with all difficulties fanned out concurrently. Items whose calls fail
+    get mock content; returns an empty list if every question call failed.
+    """
+    # Repeated difficulties share a prompt, so the cache would hand back duplicate questions
+    question_responses = call_groq_api_many(
+        [(build_question_prompt(d, job_context), 300) for d in difficulties], use_cache=False)
+    if all(isinstance(r, BaseException) for r in question_responses):
+        return []
+    
+    questions = []
+    for difficulty, response in zip(difficulties, question_responses):
+        if isinstance(response, BaseException):
+            question = None
+        else:
+            question = parse_question_response(response, difficulty).get('question')
+        if not question:
+            record_mock_fallback('generate_questions')
+            question = MOCK_QUESTIONS.get(difficulty, 'Sample question')
+        questions.append(question)
+    
+    ideal_responses = call_groq_api_many([(build_ideal_prompt(q), 500) for q in questions], use_cache=True)
+    
+    results = []
+    for question, difficulty, response in zip(questions, difficulties, ideal_responses):
+        if isinstance(response, BaseException):
+            ideal = None
+        else:
+            ideal = parse_ideal_response(response).get('ideal')
+        if not ideal:
+            record_mock_fallback('generate_ideal')
+            ideal = mock_ideal_answer(question)
+        results.append({'question': question, 'ideal_answer': ideal, 'difficulty': difficulty})
+    return results
+
+@api.route('/api/generate', methods=['POST'])
 def generate_question():
     """
     Generate interview question or ideal answer
@@ -111,154 +566,73 @@ def generate_question():
         
         # NEW: Batch generation - Generate all 6 questions at once
         if action == 'generate_batch':
-            difficulties = data.get('difficulties', ['easy', 'easy', 'medium', 'medium', 'hard', 'hard'])
+            difficulties = data.get('difficulties', BATCH_DIFFICULTIES)
             job_description = data.get('job_description', '')
             
-            if groq_client:
+            if get_llm_client():
+                # Serve from the pre-generated pool when this job has one
+                pool = get_question_pool()
+                if pool:
+                    pooled = draw_pooled_questions(pool, data.get('job_id'), job_context, job_description,
+                                                   data.get('custom_questions'), difficulties)
+                    if pooled:
+                        g.question_pool_status = 'HIT'
+                        logger.info(f"Served {len(pooled)} pooled questions for {job_context}")
+                        return jsonify({'questions': pooled})
+                    g.question_pool_status = 'MISS'
+                
                 try:
-                    prompt = f"""Generate 6 technical interview questions for a {job_context} position.
-Job Description: {job_description}
-
-Generate EXACTLY 6 questions with the following difficulties:
-1. EASY question (20 seconds to answer)
-2. EASY question (20 seconds to answer)
-3. MEDIUM question (60 seconds to answer)
-4. MEDIUM question (60 seconds to answer)
-5. HARD question (120 seconds to answer)
-6. HARD question (120 seconds to answer)
-
-For EACH question, also provide an ideal answer (40-200 words).
-
-DIFFICULTY GUIDELINES:
-- EASY: Basic concepts, definitions, "what is" or "explain briefly"
-- MEDIUM: Practical application, "how would you", comparisons, use cases
-- HARD: System design, architecture, complex problem-solving, trade-offs
-
-IMPORTANT: Questions must be specific to {job_context} role, not generic programming questions.
-
-Output ONLY valid JSON in this EXACT format:
-{{
-  "questions": [
-    {{"question": "...", "ideal_answer": "..."}},
-    {{"question": "...", "ideal_answer": "..."}},
-    {{"question": "...", "ideal_answer": "..."}},
-    {{"question": "...", "ideal_answer": "..."}},
-    {{"question": "...", "ideal_answer": "..."}},
-    {{"question": "...", "ideal_answer": "..."}}
-  ]
-}}"""
-                    
-                    response = call_groq_api(prompt, max_tokens=2000)
-                    logger.info(f"Batch generation response: {response[:200]}...")
-                    
-                    try:
-                        result = json.loads(response)
-                        if 'questions' in result and len(result['questions']) == 6:
-                            logger.info(f"Successfully generated {len(result['questions'])} questions for {job_context}")
-                            return jsonify(result)
-                        else:
-                            logger.error(f"Invalid response format: {result}")
-                            raise ValueError("Invalid response format")
-                    except (json.JSONDecodeError, ValueError) as e:
-                        logger.error(f"JSON parse error: {e}, Response: {response}")
-                        # Fall back to individual generation
-                        
+                    questions = generate_question_batch(job_context, job_description,
+                                                        data.get('custom_questions'), use_cache=True)
+                    logger.info(f"Successfully generated {len(questions)} questions for {job_context}")
+                    return jsonify({'questions': questions})
                 except Exception as e:
                     logger.error(f"Batch generation failed: {e}")
+                
+                # Generate each question and its ideal answer individually, concurrently
+                try:
+                    questions = generate_questions_concurrently(job_context, difficulties)
+                    if questions:
+                        logger.info(f"Generated {len(questions)} questions individually for {job_context}")
+                        return jsonify({'questions': questions})
+                except Exception as e:
+                    logger.error(f"Concurrent question generation failed: {e}")
             
             # Fallback: Return error to trigger individual generation
             return jsonify({'error': 'Batch generation failed, use individual calls'}), 500
         
         elif action == 'generate_question':
-            if groq_client:
+            if get_llm_client():
                 try:
-                    # Enhanced prompt with time-appropriate difficulty
-                    time_guidance = {
-                        'easy': '20 seconds - should be answerable with basic knowledge',
-                        'medium': '60 seconds - requires explanation and examples',
-                        'hard': '120 seconds - needs detailed analysis and design thinking'
-                    }
-                    
-                    prompt = f"""Generate ONE {difficulty.upper()} technical interview question for a {job_context} position.
-
-REQUIREMENTS:
-- Difficulty: {difficulty.upper()} ({time_guidance.get(difficulty, '')})
-- Must be answerable within the time limit
-- Should test practical knowledge, not memorization
-- Clear and unambiguous wording
-
-DIFFICULTY GUIDELINES:
-- EASY: Basic concepts, definitions, simple "what is" or "explain briefly" questions
-- MEDIUM: Practical application, "how would you", comparisons, use cases
-- HARD: System design, architecture decisions, complex problem-solving, trade-offs
-
-EXAMPLES:
-Easy: "What is the purpose of the virtual DOM in React?"
-Medium: "How would you optimize performance in a React application with large lists?"
-Hard: "Design a real-time collaborative editing system using React. Explain your architecture, state management approach, and how you'd handle conflicts."
-
-Generate a question that is:
-1. Specific and focused
-2. Answerable in the given time
-3. Tests understanding, not just recall
-4. Relevant to real-world {job_context} work
-
-Output ONLY valid JSON: {{"question":"<your question here>","difficulty":"{difficulty}"}}"""
-                    
-                    response = call_groq_api(prompt, max_tokens=300)
-                    
-                    # Try to parse JSON response
-                    try:
-                        result = json.loads(response)
-                        return jsonify(result)
-                    except json.JSONDecodeError:
-                        # If not valid JSON, wrap the response
-                        return jsonify({
-                            'question': response,
-                            'difficulty': difficulty
-                        })
+                    response = call_groq_api(build_question_prompt(difficulty, job_context), max_tokens=300, use_cache=True)
+                    return jsonify(parse_question_response(response, difficulty))
                         
                 except Exception as e:
                     logger.error(f"Groq API failed: {e}")
                     # Fall back to mock questions
             
             # Mock questions as fallback
-            mock_questions = {
-                'easy': 'What is React and how does it differ from vanilla JavaScript?',
-                'medium': 'Explain the concept of state management in React applications.',
-                'hard': 'Design a scalable architecture for a real-time chat application using React and Node.js.'
-            }
-            
+            record_mock_fallback('generate_question')
             return jsonify({
-                'question': mock_questions.get(difficulty, 'Sample question'),
+                'question': MOCK_QUESTIONS.get(difficulty, 'Sample question'),
                 'difficulty': difficulty
             })
         
         elif action == 'generate_ideal':
             question = data.get('question')
             
-            if groq_client:
+            if get_llm_client():
                 try:
-                    prompt = f"""Provide a clear, concise ideal answer for the question: "{question}"
-                    The answer should be 40-200 words, technically accurate, and demonstrate best practices.
-                    Output JSON: {{"ideal":"..."}}"""
-                    
-                    response = call_groq_api(prompt)
-                    
-                    try:
-                        result = json.loads(response)
-                        return jsonify(result)
-                    except json.JSONDecodeError:
-                        return jsonify({
-                            'ideal': response
-                        })
+                    response = call_groq_api(build_ideal_prompt(question), use_cache=True)
+                    return jsonify(parse_ideal_response(response))
                         
                 except Exception as e:
                     logger.error(f"Groq API failed: {e}")
             
             # Mock ideal answer as fallback
+            record_mock_fallback('generate_ideal')
             return jsonify({
-                'ideal': f'This is an ideal answer for: {question}. It demonstrates understanding of the concept and provides practical examples.'
+                'ideal': mock_ideal_answer(question)
             })
         
         else:
@@ -268,7 +642,159 @@ Output ONLY valid JSON: {{"question":"<your question here>","difficulty":"{diffi
         logger.error(f"Error in generate_question: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@app.route('/api/score', methods=['POST'])
+def sse_event(event: str, data) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events) -> Response:
+    """Stream an event generator to the client without proxy buffering"""
+    return Response(stream_with_context(events), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@api.route('/api/generate/stream', methods=['POST'])
+def generate_question_stream():
+    """
+    Stream a batch of interview questions as Server-Sent Events
+    Expected payload: same as the generate_batch action of /api/generate
+    Events:
+        question: {"index": 0, "question": "...", "ideal_answer": "...", "difficulty": "easy"}
+        done: {"count": 6, "source": "pool|cache|llm"}
+        error: {"error": "..."}
+    """
+    data = request.get_json(silent=True)
+    
+    if not data:
+        return jsonify({'error': 'No JSON data provided'}), 400
+    
+    job_context = data.get('job_context')
+    job_description = data.get('job_description', '')
+    difficulties = data.get('difficulties', BATCH_DIFFICULTIES)
+    custom_questions = data.get('custom_questions')
+    
+    if not get_llm_client():
+        return jsonify({'error': 'Batch generation failed, use individual calls'}), 500
+    
+    # Resolve pool and cache before streaming so their outcome is reported in the headers
+    ready = None
+    source = 'llm'
+    pool = get_question_pool()
+    if pool:
+        ready = draw_pooled_questions(pool, data.get('job_id'), job_context, job_description,
+                                      custom_questions, difficulties)
+        g.question_pool_status = 'HIT' if ready else 'MISS'
+        if ready:
+            source = 'pool'
+    
+    prompt = build_batch_prompt(job_context, job_description, custom_questions)
+    cache_key = None
+    if ready is None:
+        cache_key, cached = _cache_lookup(prompt, 2000, use_cache=True)
+        if cached is not None:
+            try:
+                ready = parse_llm_output(cached, 'question_batch')['questions']
+                for question, difficulty in zip(ready, BATCH_DIFFICULTIES):
+                    question['difficulty'] = difficulty
+                source = 'cache'
+            except OutputParseError:
+                invalidate_llm_cache(prompt, max_tokens=2000)
+    
+    def events():
+        if ready is not None:
+            for i, question in enumerate(ready):
+                yield sse_event('question', dict(question, index=i))
+            yield sse_event('done', {'count': len(ready), 'source': source})
+            return
+        
+        chunks = []
+        
+        def deltas():
+            for delta in stream_groq_api(prompt, 2000):
+                chunks.append(delta)
+                yield delta
+        
+        count = 0
+        stream = deltas()
+        try:
+            for question in iter_array_items(stream, 'questions'):
+                if count >= len(BATCH_DIFFICULTIES):
+                    break
+                question['difficulty'] = BATCH_DIFFICULTIES[count]
+                yield sse_event('question', dict(question, index=count))
+                count += 1
+            # Drain the rest of the completion so it can be cached
+            for _ in stream:
+                pass
+        except Exception as e:
+            logger.error(f"Streaming batch generation failed: {e}")
+        
+        if count == len(BATCH_DIFFICULTIES):
+            if cache_key:
+                get_llm_cache().set(cache_key, ''.join(chunks).strip())
+            yield sse_event('done', {'count': count, 'source': source})
+            return
+        
+        # Fill whatever the stream did not deliver with concurrent individual generation
+        try:
+            remaining = generate_questions_concurrently(job_context, BATCH_DIFFICULTIES[count:])
+        except Exception as e:
+            logger.error(f"Concurrent question generation failed: {e}")
+            remaining = []
+        for question in remaining:
+            yield sse_event('question', dict(question, index=count))
+            count += 1
+        if count < len(BATCH_DIFFICULTIES):
+            yield sse_event('error', {'error': 'Batch generation failed, use individual calls'})
+        else:
+            yield sse_event('done', {'count': count, 'source': source})
+    
+    return sse_response(events())
+
+def normalize_score(result: dict) -> dict:
+    """Clamp a score to 1-10 and fill in a default reason"""
+    return {
+        'score': max(1, min(10, int(result.get('score', 5)))),
+        'reason': result.get('reason', 'Good understanding demonstrated')
+    }
+
+def grade_score_batch(items: list) -> list:
+    """Grade a batch of answers with one Groq call; missing or invalid grades come back as None"""
+    if len(items) == 1:
+        item = items[0]
+        response = call_groq_api(build_score_prompt(item['question'], item['ideal'], item['candidate_answer']),
+                                 priority=PRIORITY_INTERACTIVE)
+        return [normalize_score(parse_llm_output(response, 'score', priority=PRIORITY_INTERACTIVE))]
+    
+    max_tokens = min(4000, 100 + 80 * len(items))
+    response = call_groq_api(build_score_batch_prompt(items), max_tokens=max_tokens, priority=PRIORITY_INTERACTIVE)
+    scores = parse_llm_output(response, 'score_batch', priority=PRIORITY_INTERACTIVE)['scores']
+    
+    grades = []
+    for result in scores[:len(items)]:
+        try:
+            grades.append(normalize_score(result))
+        except (AttributeError, TypeError, ValueError):
+            grades.append(None)
+    return grades
+
+SCORE_TIMEOUT = float(os.getenv('SCORE_TIMEOUT', 30))
+
+# The /api/score micro-batcher
+score_batcher = None
+
+def get_score_batcher():
+    """Return the /api/score micro-batcher, or None when no LLM is configured"""
+    global score_batcher
+    if score_batcher is None and get_llm_client():
+        with _init_lock:
+            if score_batcher is None:
+                score_batcher = ScoreBatcher(
+                    grade_score_batch,
+                    max_batch_size=int(os.getenv('SCORE_BATCH_MAX_SIZE', 16)),
+                    max_wait_ms=float(os.getenv('SCORE_BATCH_WINDOW_MS', 50)),
+                )
+    return score_batcher
+
+@api.route('/api/score', methods=['POST'])
 def score_answer():
     """
     Score candidate answer against ideal answer
@@ -292,42 +818,21 @@ def score_answer():
         if not all([question, ideal, candidate_answer]):
             return jsonify({'error': 'Missing required fields'}), 400
         
-        if groq_client:
+        if get_llm_client():
             try:
-                prompt = f"""Compare the ideal answer and candidate answer for this question:
-
-Question: "{question}"
-
-Ideal Answer: "{ideal}"
-
-Candidate Answer: "{candidate_answer}"
-
-Score the candidate answer from 1-10 based on:
-- Technical accuracy
-- Completeness
-- Understanding of concepts
-- Practical application
-
-Provide a JSON response: {{"score": 7, "reason": "Brief explanation of the score"}}"""
-                
-                response = call_groq_api(prompt)
-                
-                try:
-                    result = json.loads(response)
-                    # Ensure score is within valid range
-                    score = max(1, min(10, int(result.get('score', 5))))
-                    return jsonify({
-                        'score': score,
-                        'reason': result.get('reason', 'Good understanding demonstrated')
-                    })
-                except (json.JSONDecodeError, ValueError):
-                    # Fall back to mock scoring
-                    pass
-                    
+                # Concurrent score requests are graded together in one Groq call
+                with tracing.span('llm.score_batch'):
+                    result = get_score_batcher().score({
+                        'question': question,
+                        'ideal': ideal,
+                        'candidate_answer': candidate_answer
+                    }, timeout=SCORE_TIMEOUT)
+                return jsonify(result)
             except Exception as e:
                 logger.error(f"Groq API failed: {e}")
         
         # Mock scoring as fallback
+        record_mock_fallback('score')
         import random
         score = random.randint(6, 10)
         
@@ -340,7 +845,25 @@ Provide a JSON response: {{"score": 7, "reason": "Brief explanation of the score
         logger.error(f"Error in score_answer: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@app.route('/api/evaluate-answers', methods=['POST'])
+def fallback_evaluation(question: dict) -> dict:
+    """Basic evaluation based on answer length and content, used when Groq is unavailable"""
+    answer = question.get('candidate_answer', '').strip()
+    
+    if not answer or len(answer) < 10:
+        return {'score': 0, 'reason': 'No meaningful answer provided'}
+    elif len(answer) < 30:
+        return {'score': 3, 'reason': 'Answer too brief, lacks detail'}
+    elif len(answer) < 100:
+        return {'score': 5, 'reason': 'Basic understanding shown'}
+    else:
+        return {'score': 6, 'reason': 'Adequate response provided'}
+
+def normalize_evaluation(eval_item: dict) -> dict:
+    """Ensure the score is an int within the valid range"""
+    eval_item['score'] = max(0, min(10, int(eval_item.get('score', 0))))
+    return eval_item
+
+@api.route('/api/evaluate-answers', methods=['POST'])
 def evaluate_answers():
     """
     Evaluate all interview answers at once with strict grading
@@ -369,75 +892,14 @@ def evaluate_answers():
         if not questions:
             return jsonify({'error': 'No questions provided'}), 400
         
-        evaluations = []
-        
-        if groq_client:
+        if get_llm_client():
             try:
-                # Prepare comprehensive evaluation prompt
-                questions_text = ""
-                for i, q in enumerate(questions):
-                    questions_text += f"""
----
-Question {i+1} (Difficulty: {q.get('difficulty', 'medium').upper()}):
-{q.get('question', '')}
-
-Expected Answer:
-{q.get('ideal_answer', '')}
-
-Candidate's Answer:
-{q.get('candidate_answer', '')}
-"""
-                
-                prompt = f"""You are a professional technical interviewer evaluating candidates for a {job_title} position. Your role is to grade answers with STRICT and FAIR judgment.
-
-GRADING CRITERIA:
-1. **Correctness (40%)**: Is the answer technically accurate?
-2. **Completeness (30%)**: Does it cover all key points?
-3. **Depth (20%)**: Shows understanding beyond surface level?
-4. **Clarity (10%)**: Is it well-articulated?
-
-GRADING RULES:
-- Blank/empty answers = 0 points (NO EXCEPTIONS)
-- Irrelevant or nonsensical answers = 0-1 points
-- Partially correct but incomplete = 2-4 points
-- Correct but lacks depth = 5-6 points
-- Good answer with minor gaps = 7-8 points
-- Excellent comprehensive answer = 9-10 points
-- DO NOT give high scores for long answers without substance
-- DO NOT be lenient - this is a professional evaluation
-
-EXAMPLES:
-Example 1 - Easy Question: "What is React?"
-- Candidate: "React is a JavaScript library for building user interfaces" → Score: 6/10 (Correct but too brief)
-- Candidate: "React is a JavaScript library for building UIs, uses virtual DOM for efficient updates, component-based architecture" → Score: 9/10 (Comprehensive)
-- Candidate: "It's a framework for making websites" → Score: 3/10 (Partially correct, technically inaccurate)
-
-Example 2 - Medium Question: "Explain useEffect hook"
-- Candidate: "useEffect is for side effects" → Score: 4/10 (Too vague)
-- Candidate: "useEffect handles side effects like API calls, runs after render, cleanup with return function, dependency array controls when it runs" → Score: 9/10 (Excellent)
-- Candidate: "" → Score: 0/10 (Blank)
-
-Example 3 - Hard Question: "Design scalable state management"
-- Candidate: "Use Redux" → Score: 2/10 (Oversimplified)
-- Candidate: "Implement Redux Toolkit with normalized state, use RTK Query for server state, Context for local UI state, proper selectors with memoization" → Score: 9/10 (Comprehensive design)
-
-NOW EVALUATE THESE ANSWERS:
-{questions_text}
-
-Provide ONLY a valid JSON array with this exact format:
-{{"evaluations": [
-    {{"score": <number 0-10>, "reason": "<brief 10-15 word explanation>"}},
-    ...
-]}}
-
-Be STRICT. Most candidates should score 4-7. Only exceptional answers deserve 8-10."""
-
-                response = call_groq_api(prompt, max_tokens=1500)
+                prompt = build_evaluation_prompt(questions, job_title)
+
+                response = call_groq_api(prompt, max_tokens=1500, priority=PRIORITY_INTERACTIVE)
                 
                 try:
-                    # Try to parse JSON response
-                    result = json.loads(response)
-                    evaluations = result.get('evaluations', [])
+                    evaluations = parse_llm_output(response, 'evaluation', priority=PRIORITY_INTERACTIVE)['evaluations']
                     
                     # Validate and ensure we have evaluations for all questions
                     if len(evaluations) < len(questions):
@@ -447,11 +909,11 @@ Be STRICT. Most candidates should score 4-7. Only exceptional answers deserve 8-
                     
                     # Ensure scores are within valid range
                     for eval_item in evaluations:
-                        eval_item['score'] = max(0, min(10, int(eval_item.get('score', 0))))
+                        normalize_evaluation(eval_item)
                     
                     return jsonify({'evaluations': evaluations})
                     
-                except (json.JSONDecodeError, ValueError) as e:
+                except OutputParseError as e:
                     logger.error(f"JSON parse error: {e}, Response: {response}")
                     # Fall back to individual evaluation
                     
@@ -459,17 +921,8 @@ Be STRICT. Most candidates should score 4-7. Only exceptional answers deserve 8-
                 logger.error(f"Groq API failed: {e}")
         
         # Fallback: Basic evaluation based on answer length and content
-        for q in questions:
-            answer = q.get('candidate_answer', '').strip()
-            
-            if not answer or len(answer) < 10:
-                evaluations.append({'score': 0, 'reason': 'No meaningful answer provided'})
-            elif len(answer) < 30:
-                evaluations.append({'score': 3, 'reason': 'Answer too brief, lacks detail'})
-            elif len(answer) < 100:
-                evaluations.append({'score': 5, 'reason': 'Basic understanding shown'})
-            else:
-                evaluations.append({'score': 6, 'reason': 'Adequate response provided'})
+        record_mock_fallback('evaluate_answers')
+        evaluations = [fallback_evaluation(q) for q in questions]
         
         return jsonify({'evaluations': evaluations})
         
@@ -477,16 +930,73 @@ Be STRICT. Most candidates should score 4-7. Only exceptional answers deserve 8-
         logger.error(f"Error in evaluate_answers: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@app.route('/api/summary', methods=['POST'])
+@api.route('/api/evaluate-answers/stream', methods=['POST'])
+def evaluate_answers_stream():
+    """
+    Stream per-question evaluations as Server-Sent Events
+    Expected payload: same as /api/evaluate-answers
+    Events:
+        evaluation: {"index": 0, "score": 6, "reason": "..."}
+        done: {"count": 6}
+    """
+    data = request.get_json(silent=True)
+    
+    if not data:
+        return jsonify({'error': 'No JSON data provided'}), 400
+    
+    questions = data.get('questions', [])
+    job_title = data.get('job_title', 'Developer')
+    
+    if not questions:
+        return jsonify({'error': 'No questions provided'}), 400
+    
+    def events():
+        count = 0
+        stream_failed = not get_llm_client()
+        if not stream_failed:
+            try:
+                stream = stream_groq_api(build_evaluation_prompt(questions, job_title), 1500,
+                                         priority=PRIORITY_INTERACTIVE)
+                for eval_item in iter_array_items(stream, 'evaluations'):
+                    if count >= len(questions):
+                        break
+                    try:
+                        eval_item = normalize_evaluation(eval_item)
+                    except (TypeError, ValueError):
+                        eval_item = {'score': 0, 'reason': 'Evaluation failed'}
+                    yield sse_event('evaluation', dict(eval_item, index=count))
+                    count += 1
+            except Exception as e:
+                logger.error(f"Streaming evaluation failed: {e}")
+                stream_failed = True
+        
+        if stream_failed and count < len(questions):
+            record_mock_fallback('evaluate_answers_stream')
+        for i in range(count, len(questions)):
+            if stream_failed:
+                # Groq unavailable or the stream broke off: grade the rest heuristically
+                eval_item = fallback_evaluation(questions[i])
+            else:
+                # The model returned fewer evaluations than questions
+                eval_item = {'score': 0, 'reason': 'Evaluation failed'}
+            yield sse_event('evaluation', dict(eval_item, index=i))
+        yield sse_event('done', {'count': len(questions)})
+    
+    return sse_response(events())
+
+@api.route('/api/summary', methods=['POST'])
 def generate_summary():
     """
     Generate final interview summary
     Expected payload:
     {
         "answers": [{"question": "...", "candidate_answer": "...", "score": 8}],
-        "candidate": {"name": "John Doe", "email": "john@example.com"},
-        "job": {"title": "Fullstack Developer"}
+        "candidate": {"id": "<student id, optional>", "name": "John Doe", "email": "john@example.com"},
+        "job": {"id": "<job id, optional>", "title": "Fullstack Developer"},
+        "interview_id": "<optional>"
     }
+    When the job id and a candidate id or email are given, the final score is
+    recorded on the job leaderboard.
     """
     try:
         data = request.get_json()
@@ -503,61 +1013,31 @@ def generate_summary():
         
         # Calculate average score
         total_score = sum(answer.get('score', 0) for answer in answers)
-        final_score = total_score / len(answers) if answers else 0
+        final_score = clamp_final_score(total_score / len(answers) if answers else 0)
         
-        if groq_client:
+        if get_llm_client():
             try:
-                # Prepare answers summary for AI
-                answers_text = "\n".join([
-                    f"Q{i+1}: {ans.get('question', '')}\nAnswer: {ans.get('candidate_answer', '')}\nScore: {ans.get('score', 0)}/10\n"
-                    for i, ans in enumerate(answers)
-                ])
-                
                 # Determine performance level for better summary
                 performance_level = "excellent" if final_score >= 8 else "good" if final_score >= 6 else "adequate" if final_score >= 4 else "needs improvement"
                 
-                prompt = f"""You are a professional technical interviewer. Based on this interview performance, provide a final assessment.
-
-Candidate: {candidate.get('name', 'Unknown')}
-Job Position: {job.get('title', 'Developer')}
-Average Score: {final_score:.1f}/10
-Performance Level: {performance_level}
-
-Interview Answers:
-{answers_text}
-
-IMPORTANT: Provide ONLY a valid JSON response with NO additional text before or after.
-
-Requirements:
-1. Write a 2-3 sentence professional summary that:
-   - Reflects the actual score ({final_score:.1f}/10)
-   - Is honest about performance (don't be overly positive for low scores)
-   - Mentions specific strengths if score >= 6
-   - Mentions areas for improvement if score < 6
-   - Is constructive and professional
-
-2. Output ONLY this JSON (no markdown, no code blocks, no extra text):
-{{"final_score": {final_score:.1f}, "summary": "your summary here"}}"""
+                prompt = build_summary_prompt(answers, candidate.get('name', 'Unknown'), job.get('title', 'Developer'),
+                                              final_score, performance_level)
                 
                 logger.info(f"[Summary] Calling Groq API for candidate: {candidate.get('name', 'Unknown')}, score: {final_score:.1f}")
-                response = call_groq_api(prompt, max_tokens=400)
-                logger.info(f"[Summary] Raw Groq response: {response[:200]}...")
+                response = call_groq_api(prompt, max_tokens=400, priority=PRIORITY_INTERACTIVE)
+                logger.debug("[Summary] Raw Groq response: %.200s...", response)
                 
                 try:
-                    # Try to extract JSON if wrapped in markdown code blocks
-                    cleaned_response = response.strip()
-                    if cleaned_response.startswith('```'):
-                        # Remove markdown code blocks
-                        cleaned_response = re.sub(r'^```(?:json)?\s*', '', cleaned_response)
-                        cleaned_response = re.sub(r'\s*```$', '', cleaned_response)
-                    
-                    result = json.loads(cleaned_response)
+                    result = parse_llm_output(response, 'summary', priority=PRIORITY_INTERACTIVE)
                     logger.info(f"[Summary] ✅ Successfully parsed JSON summary")
+                    # The model's score goes on the leaderboard, so keep it within 0-10 like the table
+                    llm_score = clamp_final_score(result.get('final_score'), default=final_score)
+                    record_final_score(data, llm_score)
                     return jsonify({
-                        'final_score': float(result.get('final_score', final_score)),
+                        'final_score': llm_score,
                         'summary': result.get('summary', f'Candidate {candidate.get("name", "Unknown")} demonstrated solid technical knowledge with an average score of {final_score:.1f}/10.')
                     })
-                except (json.JSONDecodeError, ValueError) as e:
+                except OutputParseError as e:
                     logger.error(f"[Summary] ❌ JSON parse error: {e}, Response: {response}")
                     # Fall back to mock summary
                     pass
@@ -567,6 +1047,7 @@ Requirements:
         
         # Dynamic fallback summary based on score
         logger.warning(f"[Summary] Using fallback summary for score: {final_score:.1f}")
+        record_mock_fallback('summary')
         
         candidate_name = candidate.get("name", "The candidate")
         
@@ -579,6 +1060,7 @@ Requirements:
         else:
             summary = f'{candidate_name} scored {final_score:.1f}/10, indicating limited technical knowledge for this position. The candidate would benefit from further study and practice in the core concepts required for this role before reapplying.'
         
+        record_final_score(data, final_score)
         return jsonify({
             'final_score': round(final_score, 1),
             'summary': summary
@@ -588,117 +1070,117 @@ Requirements:
         logger.error(f"Error in generate_summary: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-def send_email_notification(to_email: str, template: str, candidate_name: str, job_title: str) -> bool:
-    """Send email notification using SMTP"""
+def clamp_final_score(value, default: float = 0.0) -> float:
+    """Final interview score within 0-10 (job_leaderboard's CHECK); non-numbers give default"""
     try:
-        if not all([SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS]):
-            logger.warning("SMTP credentials not configured, skipping email")
-            return False
-        
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['From'] = SMTP_USER
-        msg['To'] = to_email
-        
-        if template == 'shortlist':
-            msg['Subject'] = f'Congratulations! You have been shortlisted for {job_title}'
-            html_content = create_shortlist_email(candidate_name, job_title)
-        elif template == 'reject':
-            msg['Subject'] = f'Interview Results Update - {job_title}'
-            html_content = create_reject_email(candidate_name, job_title)
-        else:
-            logger.error(f"Unknown email template: {template}")
-            return False
-        
-        # Attach HTML content
-        html_part = MIMEText(html_content, 'html')
-        msg.attach(html_part)
-        
-        # Send email
-        with smtplib.SMTP(SMTP_HOST, int(SMTP_PORT)) as server:
-            server.starttls()
-            server.login(SMTP_USER, SMTP_PASS)
-            server.send_message(msg)
-        
-        logger.info(f"Email sent successfully to {to_email}")
-        return True
-        
+        score = float(value)
+    except (TypeError, ValueError):
+        return default
+    if not math.isfinite(score):
+        return default
+    return max(0.0, min(10.0, score))
+
+def record_final_score(data: dict, final_score: float) -> None:
+    """Update the job leaderboard with a finalized score; never fails the request"""
+    job_id = (data.get('job') or {}).get('id')
+    candidate = data.get('candidate') or {}
+    if not job_id or not (candidate.get('id') or candidate.get('email')):
+        return
+    try:
+        board = get_leaderboard()
+        candidate_id = board.candidate_key(candidate)
+        if candidate_id is None:
+            logger.info(f"[Leaderboard] No student record for candidate of job {job_id}, score not ranked")
+            return
+        board.record(str(job_id), candidate_id, final_score,
+                     name=candidate.get('name'), interview_id=data.get('interview_id'))
+        read_cache.invalidate(f'candidates:{job_id}')
     except Exception as e:
-        logger.error(f"Failed to send email to {to_email}: {str(e)}")
-        return False
-
-def create_shortlist_email(candidate_name: str, job_title: str) -> str:
-    """Create HTML email template for shortlisted candidates"""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <title>Congratulations!</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: linear-gradient(135deg, #3A7CFF, #2563EB); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
-            .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }}
-            .button {{ display: inline-block; background: #3A7CFF; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; margin: 20px 0; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🎉 Congratulations!</h1>
-                <p>You have been shortlisted for the next round</p>
-            </div>
-            <div class="content">
-                <h2>Dear {candidate_name},</h2>
-                <p>We are excited to inform you that you have been <strong>shortlisted</strong> for the <strong>{job_title}</strong> position!</p>
-                <p>Your performance in our AI-powered interview was impressive, and we would like to move forward with the next steps in our hiring process.</p>
-                <p>Our team will be in touch with you shortly to schedule the next round of interviews.</p>
-                <p>Thank you for your interest in joining our team!</p>
-                <br>
-                <p>Best regards,<br>The Hiring Team</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-
-def create_reject_email(candidate_name: str, job_title: str) -> str:
-    """Create HTML email template for rejected candidates"""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <title>Interview Results Update</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: linear-gradient(135deg, #FF573A, #E53E3E); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
-            .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>Interview Results Update</h1>
-                <p>Thank you for your interest</p>
-            </div>
-            <div class="content">
-                <h2>Dear {candidate_name},</h2>
-                <p>Thank you for taking the time to participate in our interview process for the <strong>{job_title}</strong> position.</p>
-                <p>After careful consideration, we have decided to move forward with other candidates for this role. This decision was not easy, as we were impressed by your qualifications and enthusiasm.</p>
-                <p>We encourage you to apply for other positions that may be a better fit for your skills and experience. We will keep your information on file for future opportunities.</p>
-                <p>We wish you the best of luck in your job search!</p>
-                <br>
-                <p>Best regards,<br>The Hiring Team</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-
-@app.route('/api/send-email', methods=['POST'])
+        logger.error(f"[Leaderboard] Failed to record score for job {job_id}: {e}")
+
+@api.route('/api/leaderboard/<job_id>', methods=['GET'])
+def get_leaderboard_top(job_id):
+    """
+    Top candidates for a job from the leaderboard
+    Query: ?k=10&percentile=90 (percentile adds the score needed to reach it)
+    """
+    try:
+        k = max(1, min(request.args.get('k', 10, type=int), 100))
+        board = get_leaderboard()
+        result = {'job_id': job_id, 'top': board.top(job_id, k)}
+        percentile = request.args.get('percentile', type=float)
+        if percentile is not None:
+            result['percentile'] = percentile
+            result['score_at_percentile'] = board.score_at_percentile(job_id, percentile)
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f"Error in get_leaderboard_top: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@api.route('/api/leaderboard/<job_id>/candidates/<candidate_id>', methods=['GET'])
+def get_leaderboard_rank(job_id, candidate_id):
+    """Rank, total and percentile of one candidate for a job"""
+    try:
+        rank = get_leaderboard().rank(job_id, candidate_id)
+        if rank is None:
+            return jsonify({'error': 'Candidate is not ranked for this job'}), 404
+        return jsonify(dict(rank, job_id=job_id, candidate_id=candidate_id))
+    except Exception as e:
+        logger.error(f"Error in get_leaderboard_rank: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+# Outgoing email is queued in a persistent outbox and sent by background workers
+email_outbox = None
+if not (SMTP_HOST and SMTP_PORT):
+    logger.warning("SMTP_HOST/SMTP_PORT not configured, emails will not be sent")
+
+def get_email_outbox():
+    """Return the email outbox, starting its workers on first use, or None when SMTP is not configured"""
+    global email_outbox
+    if email_outbox is None and SMTP_HOST and SMTP_PORT:
+        with _init_lock:
+            if email_outbox is None:
+                try:
+                    email_outbox = EmailOutbox(
+                        os.getenv('EMAIL_OUTBOX_PATH',
+                                  os.path.join(os.path.dirname(__file__), '.cache', 'email_outbox.sqlite3')),
+                        pool=SMTPPool(
+                            SMTP_HOST, int(SMTP_PORT), SMTP_USER, SMTP_PASS,
+                            starttls=os.getenv('SMTP_STARTTLS', 'true').lower() in ('1', 'true', 'yes'),
+                            max_connections=int(os.getenv('SMTP_POOL_SIZE', 2)),
+                            max_messages_per_session=int(os.getenv('SMTP_MESSAGES_PER_SESSION', 100)),
+                        ),
+                        sender=SMTP_USER or os.getenv('SMTP_FROM', ''),
+                        workers=int(os.getenv('EMAIL_WORKERS', 2)),
+                        max_attempts=int(os.getenv('EMAIL_MAX_ATTEMPTS', 5)),
+                        lease_timeout=float(os.getenv('EMAIL_CLAIM_LEASE', 600)),
+                    )
+                    logger.info("Email outbox initialized successfully")
+                except Exception as e:
+                    logger.error(f"Failed to initialize email outbox: {e}")
+    return email_outbox
+
+# Email templates are compiled once from backend/templates/email/*.html
+email_templates = EmailTemplates(os.getenv('EMAIL_TEMPLATES_DIR') or DEFAULT_TEMPLATE_DIR)
+
+def render_email(template: str, candidate_name: str, job_title: str, **variables) -> tuple:
+    """Return (subject, html) for a template; raises TemplateError for unknown templates or missing variables"""
+    return email_templates.render(template, candidate_name=candidate_name, job_title=job_title, **variables)
+
+def queue_email_notification(to_email: str, template: str, candidate_name: str, job_title: str,
+                             **variables) -> Optional[int]:
+    """Queue an email notification; returns the outbox id, or None if email is not configured"""
+    outbox = get_email_outbox()
+    if not outbox:
+        logger.warning("SMTP not configured, skipping email")
+        return None
+    with tracing.span('email.queue', template=template):
+        subject, html_content = render_email(template, candidate_name, job_title, **variables)
+        message_id = outbox.enqueue(to_email, subject, html_content)
+    logger.info(f"Email to {to_email} queued as {message_id}")
+    return message_id
+
+@api.route('/api/send-email', methods=['POST'])
 def send_email():
     """
     Send email notification
@@ -706,9 +1188,10 @@ def send_email():
     {
         "to": "candidate@example.com",
         "subject": "Interview Result",
-        "template": "shortlist|reject",
+        "template": "shortlist|reject|interview_invite|reminder",
         "candidate_name": "John Doe",
-        "job_title": "Fullstack Developer"
+        "job_title": "Fullstack Developer",
+        "variables": {"interview_link": "...", "deadline": "..."}  # extra template variables
     }
     """
     try:
@@ -725,17 +1208,22 @@ def send_email():
         if not all([to_email, template, candidate_name, job_title]):
             return jsonify({'error': 'Missing required fields'}), 400
         
-        if template not in ['shortlist', 'reject']:
-            return jsonify({'error': 'Invalid template. Must be "shortlist" or "reject"'}), 400
+        if template not in email_templates:
+            return jsonify({'error': f'Invalid template. Must be one of: {", ".join(email_templates.names())}'}), 400
         
-        # Send email
-        success = send_email_notification(to_email, template, candidate_name, job_title)
+        # Queue email; delivery happens in the background
+        try:
+            message_id = queue_email_notification(to_email, template, candidate_name, job_title,
+                                                  **(data.get('variables') or {}))
+        except TemplateError as e:
+            return jsonify({'error': str(e)}), 400
         
-        if success:
+        if message_id is not None:
             return jsonify({
-                'status': 'success',
-                'message': f'Email sent successfully to {to_email}'
-            })
+                'status': 'queued',
+                'id': message_id,
+                'message': f'Email to {to_email} queued for delivery'
+            }), 202
         else:
             return jsonify({
                 'status': 'warning',
@@ -746,26 +1234,184 @@ def send_email():
         logger.error(f"Error in send_email: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@app.route('/api/jobs', methods=['GET'])
+@api.route('/api/send-email/<int:message_id>', methods=['GET'])
+def get_email_status(message_id):
+    """Delivery status of a queued email"""
+    outbox = get_email_outbox()
+    if not outbox:
+        return jsonify({'error': 'Email is not configured'}), 404
+    status = outbox.status(message_id)
+    if status is None:
+        return jsonify({'error': 'Email not found'}), 404
+    return jsonify(status)
+
+BULK_EMAIL_MAX_RECIPIENTS = int(os.getenv('BULK_EMAIL_MAX_RECIPIENTS', 1000))
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+def iter_ranked_candidates(job_id: str):
+    """Scored candidates for a job, best first, as dicts with name, email and final_score"""
+    store = get_job_store()
+    if store:
+        cursor = None
+        while True:
+            page = store.list_candidates(job_id, limit=store.max_page_size, cursor=cursor)
+            yield from page['candidates']
+            cursor = page['next_cursor']
+            if not cursor:
+                return
+    # Without Supabase the in-memory leaderboard keys candidates by email
+    for entry in get_leaderboard().top(job_id, BULK_EMAIL_MAX_RECIPIENTS):
+        yield {'name': entry.get('name'), 'email': entry['student_id'], 'final_score': entry['final_score']}
+
+def select_recipients(job_id: str, shortlist_top=None, min_score=None, reject_rest: bool = False) -> list:
+    """Apply a ranking rule: shortlist the top N and/or everyone at or above min_score"""
+    recipients = []
+    for position, candidate in enumerate(iter_ranked_candidates(job_id)):
+        score = candidate.get('final_score')
+        shortlisted = ((shortlist_top is None or position < shortlist_top) and
+                       (min_score is None or (score is not None and float(score) >= min_score)))
+        if shortlisted or reject_rest:
+            recipients.append({'email': candidate.get('email'), 'name': candidate.get('name'),
+                               'template': 'shortlist' if shortlisted else 'reject',
+                               'final_score': score})
+    return recipients
+
+@api.route('/api/notifications/bulk', methods=['POST'])
+def send_bulk_notifications():
+    """
+    Notify a cohort of candidates and report the result for each recipient
+    Expected payload, with explicit recipients:
+    {
+        "job": {"id": "...", "title": "Fullstack Developer"},
+        "recipients": [{"email": "jane@example.com", "name": "Jane", "template": "shortlist|reject", "variables": {}}]
+    }
+    or with a ranking rule over the job's scored candidates:
+    {
+        "job": {"id": "...", "title": "Fullstack Developer"},
+        "shortlist_top": 20,
+        "min_score": 7.5,
+        "reject_rest": true
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No JSON data provided'}), 400
+        
+        job = data.get('job') or {}
+        job_title = job.get('title')
+        if not job_title:
+            return jsonify({'error': 'Job title is required'}), 400
+        outbox = get_email_outbox()
+        if not outbox:
+            return jsonify({'error': 'Email is not configured'}), 503
+        
+        if data.get('recipients') is not None:
+            recipients = data['recipients']
+            if not isinstance(recipients, list):
+                return jsonify({'error': 'recipients must be a list'}), 400
+        elif data.get('shortlist_top') is not None or data.get('min_score') is not None:
+            if not job.get('id'):
+                return jsonify({'error': 'Job id is required for ranking rules'}), 400
+            recipients = select_recipients(
+                str(job['id']),
+                shortlist_top=int(data['shortlist_top']) if data.get('shortlist_top') is not None else None,
+                min_score=float(data['min_score']) if data.get('min_score') is not None else None,
+                reject_rest=bool(data.get('reject_rest')),
+            )
+        else:
+            return jsonify({'error': 'Provide recipients or shortlist_top/min_score'}), 400
+        
+        if len(recipients) > BULK_EMAIL_MAX_RECIPIENTS:
+            return jsonify({'error': f'At most {BULK_EMAIL_MAX_RECIPIENTS} recipients per request'}), 400
+        
+        started = time.perf_counter()
+        results = []
+        messages = []
+        for recipient in recipients:
+            email = (recipient.get('email') or '').strip()
+            template = recipient.get('template')
+            result = {'email': email, 'template': template}
+            if not EMAIL_PATTERN.match(email) or template not in email_templates:
+                result.update(status='invalid', error='Invalid email or template')
+            else:
+                try:
+                    messages.append((email, *render_email(template, recipient.get('name') or 'Candidate', job_title,
+                                                          **(recipient.get('variables') or {}))))
+                except TemplateError as e:
+                    result.update(status='invalid', error=str(e))
+            results.append(result)
+        
+        # Store everything first so nothing is lost, then send over a shared session
+        ids = iter(outbox.enqueue_many(messages, wake=False)) if messages else iter(())
+        pending = [result for result in results if 'status' not in result]
+        for result in pending:
+            result['id'] = next(ids)
+        statuses = outbox.send_now([result['id'] for result in pending])
+        for result, status in zip(pending, statuses):
+            result['status'] = status['status']
+            if status.get('last_error'):
+                result['error'] = status['last_error']
+        
+        elapsed = time.perf_counter() - started
+        summary = {'total': len(results), 'seconds': round(elapsed, 3),
+                   'messages_per_second': round(len(pending) / elapsed, 1) if elapsed > 0 else None}
+        for result in results:
+            summary[result['status']] = summary.get(result['status'], 0) + 1
+        logger.info(f"[Notifications] Bulk send for {job_title}: {summary}")
+        return jsonify({'job_id': job.get('id'), 'summary': summary, 'results': results})
+        
+    except Exception as e:
+        logger.error(f"Error in send_bulk_notifications: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+def cached_json_response(namespace: str, params: dict, loader):
+    """Serve a listing through the read-through cache, answering If-None-Match with 304"""
+    body, etag, hit = read_cache.fetch(namespace, params, loader)
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.headers['X-Read-Cache'] = 'hit' if hit else 'miss'
+    return response.make_conditional(request)
+
+def page_args() -> dict:
+    """Pagination query parameters shared by list endpoints"""
+    return {
+        'limit': request.args.get('limit', type=int),
+        'cursor': request.args.get('cursor') or None,
+    }
+
+@api.route('/api/jobs', methods=['GET'])
 def get_jobs():
-    """Get all jobs"""
-    if not (SUPABASE_URL and SUPABASE_KEY):
+    """
+    Get jobs, newest first
+    Query: ?limit=50&cursor=<next_cursor from the previous page>
+    """
+    store = get_job_store()
+    if not store:
         logger.warning('[Backend:/api/jobs GET] Using mock data - Supabase env not configured')
-    else:
-        logger.info('[Backend:/api/jobs GET] Placeholder response - Supabase integration pending')
-    return jsonify({
-        'jobs': [
-            {
-                'id': 1,
-                'title': 'Fullstack Developer',
-                'description': 'React/Node.js developer position',
-                'custom_questions': [],
-                'created_at': '2024-01-01T00:00:00Z'
-            }
-        ]
-    })
+        return jsonify({
+            'jobs': [
+                {
+                    'id': 1,
+                    'title': 'Fullstack Developer',
+                    'description': 'React/Node.js developer position',
+                    'custom_questions': [],
+                    'created_at': '2024-01-01T00:00:00Z'
+                }
+            ]
+        })
+    try:
+        args = page_args()
+        return cached_json_response('jobs', args, lambda: store.list_jobs(**args))
+    except InvalidCursorError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in get_jobs: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
 
-@app.route('/api/jobs', methods=['POST'])
+@api.route('/api/jobs', methods=['POST'])
 def create_job():
     """Create a new job"""
     try:
@@ -781,49 +1427,138 @@ def create_job():
         if not title:
             return jsonify({'error': 'Job title is required'}), 400
         
-        if not (SUPABASE_URL and SUPABASE_KEY):
-            logger.warning('[Backend:/api/jobs POST] Using mock create - Supabase env not configured')
-        else:
-            logger.info('[Backend:/api/jobs POST] Placeholder create - Supabase integration pending')
-        return jsonify({
-            'id': 1,
+        job = {
             'title': title,
             'description': description,
-            'custom_questions': custom_questions,
-            'created_at': '2024-01-01T00:00:00Z'
-        })
+            'custom_questions': custom_questions
+        }
+        store = get_job_store()
+        if store:
+            job = store.create_job(job)
+            read_cache.invalidate('jobs')
+        else:
+            logger.warning('[Backend:/api/jobs POST] Using mock create - Supabase env not configured')
+            job = dict(job, id=1, created_at='2024-01-01T00:00:00Z')
+        warm_question_pool(job)
+        return jsonify(job)
         
     except Exception as e:
         logger.error(f"Error in create_job: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@app.route('/api/candidates/<int:job_id>', methods=['GET'])
+@api.route('/api/jobs/<job_id>', methods=['PUT'])
+def update_job(job_id):
+    """Update a job; changed fields or custom questions re-warm its question pool"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No JSON data provided'}), 400
+        
+        if not data.get('title'):
+            return jsonify({'error': 'Job title is required'}), 400
+        
+        changes = {
+            'title': data.get('title'),
+            'description': data.get('description'),
+            'custom_questions': data.get('custom_questions', [])
+        }
+        store = get_job_store()
+        if store:
+            job = store.update_job(job_id, changes)
+            if job is None:
+                return jsonify({'error': 'Job not found'}), 404
+            read_cache.invalidate('jobs')
+        else:
+            logger.warning('[Backend:/api/jobs PUT] Using mock update - Supabase env not configured')
+            job = dict(changes, id=job_id)
+        warm_question_pool(job)
+        return jsonify(job)
+        
+    except Exception as e:
+        logger.error(f"Error in update_job: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+def warm_question_pool(job: dict) -> None:
+    """Start pre-generating questions for a job in the background"""
+    pool = get_question_pool()
+    if not pool:
+        return
+    try:
+        pool.warm(str(job['id']), job.get('title') or '', job.get('description') or '',
+                  job.get('custom_questions') or [])
+    except Exception as e:
+        logger.error(f"Failed to schedule question pool warm-up for job {job.get('id')}: {e}")
+
+@api.route('/api/candidates/<job_id>', methods=['GET'])
 def get_candidates(job_id):
-    """Get candidates for a specific job"""
-    # TODO: Implement Supabase integration
-    return jsonify({
-        'candidates': [
-            {
-                'id': 1,
-                'name': 'John Doe',
-                'email': 'john@example.com',
-                'phone': '+1234567890',
-                'final_score': 8.5,
-                'status': 'completed',
-                'interview_data': {
-                    'answers': [],
-                    'scores': [],
-                    'summary': 'Strong candidate with good technical skills.'
+    """
+    Get scored candidates for a specific job, best first
+    Query: ?limit=50&cursor=<next_cursor>&status=completed|shortlisted|rejected
+    """
+    store = get_job_store()
+    if not store:
+        return jsonify({
+            'candidates': [
+                {
+                    'id': 1,
+                    'name': 'John Doe',
+                    'email': 'john@example.com',
+                    'phone': '+1234567890',
+                    'final_score': 8.5,
+                    'status': 'completed',
+                    'interview_data': {
+                        'answers': [],
+                        'scores': [],
+                        'summary': 'Strong candidate with good technical skills.'
+                    }
                 }
-            }
-        ]
-    })
+            ]
+        })
+    try:
+        args = dict(page_args(), status=request.args.get('status') or None)
+        return cached_json_response(f'candidates:{job_id}', args,
+                                    lambda: store.list_candidates(job_id, **args))
+    except InvalidCursorError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in get_candidates: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+# CPU-bound resume parsing runs in worker processes (RESUME_POOL_WORKERS=0 parses in-thread)
+resume_pool = ResumeParsePool(
+    max_workers=int(os.getenv('RESUME_POOL_WORKERS', 2)),
+    max_tasks_per_child=int(os.getenv('RESUME_POOL_MAX_TASKS_PER_CHILD', 50)),
+    task_timeout=float(os.getenv('RESUME_PARSE_TIMEOUT', 20)),
+    max_pending=int(os.getenv('RESUME_POOL_MAX_PENDING', 16)),
+)
+
+# Bulk ingest queues for a parser slot instead of failing files while interactive uploads hold them
+RESUME_BULK_WAIT = float(os.getenv('RESUME_POOL_BULK_WAIT', 120))
+
+def bulk_parse(path: str, file_ext: str) -> tuple:
+    return resume_pool.parse(path, file_ext, wait=RESUME_BULK_WAIT)
 
-@app.route('/api/parse-resume', methods=['POST'])
+# Parsed resumes keyed by a hash of the file bytes, so re-uploads skip extraction
+resume_cache = None
+_resume_cache_loaded = False
+
+def get_resume_cache():
+    """Return the parsed-resume cache, or None when RESUME_CACHE_BACKEND disables it"""
+    global resume_cache, _resume_cache_loaded
+    if not _resume_cache_loaded:
+        with _init_lock:
+            if not _resume_cache_loaded:
+                resume_cache = create_resume_cache_from_env()
+                _resume_cache_loaded = True
+    return resume_cache
+
+@api.route('/api/parse-resume', methods=['POST'])
 def parse_resume():
     """
     Parse resume file and extract information
     Expected: multipart/form-data with 'file' field
+    Optional 'fields_only' field: stop reading once contact fields are found
     """
     try:
         if 'file' not in request.files:
@@ -834,121 +1569,162 @@ def parse_resume():
             return jsonify({'error': 'No file selected'}), 400
         
         # Validate file type
-        allowed_extensions = {'.pdf', '.docx'}
         file_ext = os.path.splitext(file.filename)[1].lower()
-        if file_ext not in allowed_extensions:
+        if file_ext not in ALLOWED_EXTENSIONS:
             return jsonify({'error': 'Only PDF and DOCX files are allowed'}), 400
         
-        # Validate file size (10MB limit)
-        file.seek(0, os.SEEK_END)
-        file_size = file.tell()
-        file.seek(0)
-        
-        if file_size > 10 * 1024 * 1024:  # 10MB
+        # Validate file size (10MB limit) while spooling the upload to disk
+        hasher = new_hasher()
+        try:
+            path = spool_upload(file.stream, MAX_FILE_BYTES, suffix=file_ext, hasher=hasher)
+        except FileTooLargeError:
             return jsonify({'error': 'File size must be less than 10MB'}), 400
+        digest = hasher.hexdigest()
+        
+        # Optional: stop reading once name, email and phone are found
+        fields_only = request.form.get('fields_only', '').lower() in ('1', 'true', 'yes')
         
-        # Extract text based on file type
-        text = ""
-        if file_ext == '.pdf':
-            text = extract_text_from_pdf(file)
-        elif file_ext == '.docx':
-            text = extract_text_from_docx(file)
+        cache = get_resume_cache()
+        try:
+            cached = cache.get(digest, fields_only) if cache else None
+            if cached:
+                text, extracted_info = cached
+            else:
+                text, extracted_info = resume_pool.parse(path, file_ext, fields_only=fields_only)
+                if cache and text.strip():
+                    cache.set(digest, text, extracted_info, fields_only)
+        except PoolBusyError:
+            response = jsonify({'error': 'Resume parser is busy, please retry shortly'})
+            response.headers['Retry-After'] = '2'
+            return response, 503
+        finally:
+            os.unlink(path)
         
         if not text.strip():
             return jsonify({'error': 'Could not extract text from file'}), 400
         
-        # Extract information from text
-        extracted_info = extract_info_from_text(text)
-        
-        return jsonify({
+        response = jsonify({
             'success': True,
             'text': text,
             'extracted_info': extracted_info
         })
+        if cache:
+            response.headers['X-Resume-Cache'] = 'hit' if cached else 'miss'
+        return response
         
     except Exception as e:
         logger.error(f"Error parsing resume: {str(e)}")
         return jsonify({'error': 'Failed to parse resume file'}), 500
 
-def extract_text_from_pdf(file):
-    """Extract text from PDF file"""
-    try:
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text
-    except Exception as e:
-        logger.error(f"Error extracting text from PDF: {e}")
-        raise e
+BULK_MAX_ARCHIVE_BYTES = int(os.getenv('BULK_MAX_ARCHIVE_BYTES', 200 * 1024 * 1024))
+BULK_UPSERT_BATCH_SIZE = int(os.getenv('BULK_UPSERT_BATCH_SIZE', 100))
 
-def extract_text_from_docx(file):
-    """Extract text from DOCX file"""
-    try:
-        doc = Document(file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
-    except Exception as e:
-        logger.error(f"Error extracting text from DOCX: {e}")
-        raise e
+@api.route('/api/parse-resumes/bulk', methods=['POST'])
+def parse_resumes_bulk():
+    """
+    Parse many resumes at once and stream one NDJSON line per file
+    Expected: multipart/form-data with either a 'file' ZIP archive or several
+    'files' entries (e.g. a directory upload)
+    Optional 'upsert' field: upsert parsed candidates into the students table
+    Optional 'include_text' field: include the extracted text in each line
+    Lines:
+        {"file": "a.pdf", "status": "ok", "extracted_info": {...}, "chars": 1234}
+        {"file": "b.docx", "status": "error", "error": "..."}
+        {"summary": {"files": 2, "ok": 1, "error": 1, "seconds": 0.8}}
+    """
+    archive = request.files.get('file')
+    uploads = [f for f in request.files.getlist('files') if f.filename]
+    if not archive and not uploads:
+        return jsonify({'error': 'No file provided'}), 400
+    if archive and os.path.splitext(archive.filename)[1].lower() != '.zip':
+        return jsonify({'error': 'Bulk upload expects a ZIP archive'}), 400
+    if len(uploads) > MAX_ARCHIVE_FILES:
+        return jsonify({'error': f'At most {MAX_ARCHIVE_FILES} files per request'}), 400
 
-def extract_info_from_text(text):
-    """Extract name, email, and phone from text"""
+    include_text = request.form.get('include_text', '').lower() in ('1', 'true', 'yes')
+    upserter = None
+    if request.form.get('upsert', '').lower() in ('1', 'true', 'yes'):
+        client = get_supabase_client()
+        if not client:
+            return jsonify({'error': 'Supabase is not configured'}), 503
+        upserter = StudentUpserter(client, batch_size=BULK_UPSERT_BATCH_SIZE)
+
+    # Spool everything to a private work directory before streaming starts
+    workdir = make_workdir()
     try:
-        # Email regex
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, text)
-        email = email_match.group() if email_match else None
-        
-        # Phone regex (various formats)
-        phone_patterns = [
-            r'\+?1?[-.\s]?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})',
-            r'\+?[0-9]{1,3}[-.\s]?[0-9]{3,4}[-.\s]?[0-9]{3,4}[-.\s]?[0-9]{3,4}',
-            r'\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}'
-        ]
-        
-        phone = None
-        for pattern in phone_patterns:
-            phone_match = re.search(pattern, text)
-            if phone_match:
-                phone = phone_match.group().strip()
-                break
-        
-        # Name extraction (look for common patterns)
-        name_patterns = [
-            r'(?:Name|Full Name|Candidate Name)[:\s]+([A-Za-z\s]{2,50})',
-            r'^([A-Za-z\s]{2,50})\s*$',  # Lines with only name
-            r'([A-Z][a-z]+\s+[A-Z][a-z]+)',  # First Last pattern
-        ]
-        
-        name = None
-        for pattern in name_patterns:
-            name_match = re.search(pattern, text, re.MULTILINE | re.IGNORECASE)
-            if name_match:
-                name = name_match.group(1).strip()
-                # Clean up the name
-                name = re.sub(r'\s+', ' ', name)  # Remove extra spaces
-                if len(name) > 2 and len(name) < 50:  # Reasonable name length
-                    break
-        
-        return {
-            'name': name,
-            'email': email,
-            'phone': phone
-        }
-        
+        if archive:
+            archive_path = spool_upload(archive.stream, BULK_MAX_ARCHIVE_BYTES, suffix='.zip')
+            os.replace(archive_path, os.path.join(workdir, 'upload.zip'))
+            files = iter_zip_files(os.path.join(workdir, 'upload.zip'), workdir)
+        else:
+            files = []
+            for index, upload in enumerate(uploads):
+                ext = os.path.splitext(upload.filename)[1].lower()
+                if ext not in ALLOWED_EXTENSIONS:
+                    continue
+                path = spool_upload(upload.stream, MAX_FILE_BYTES, suffix=ext)
+                os.replace(path, os.path.join(workdir, f'{index}{ext}'))
+                files.append((upload.filename, os.path.join(workdir, f'{index}{ext}'), ext))
+    except FileTooLargeError:
+        remove_workdir(workdir)
+        return jsonify({'error': 'Upload is too large'}), 400
     except Exception as e:
-        logger.error(f"Error extracting info from text: {e}")
-        return {
-            'name': None,
-            'email': None,
-            'phone': None
-        }
+        remove_workdir(workdir)
+        logger.error(f"Error receiving bulk upload: {str(e)}")
+        return jsonify({'error': 'Failed to read upload'}), 400
+
+    def lines():
+        try:
+            for result in ingest(files, bulk_parse, max_workers=max(1, resume_pool.max_workers),
+                                 upserter=upserter, include_text=include_text, cleanup=True):
+                yield json.dumps(result) + "\n"
+        except Exception as e:
+            # Usually a corrupt archive; the client still gets a parseable last line
+            logger.error(f"Error in bulk resume ingestion: {str(e)}")
+            yield json.dumps({'error': 'Bulk ingestion failed'}) + "\n"
+        finally:
+            remove_workdir(workdir)
+
+    return Response(stream_with_context(lines()), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def create_app() -> Flask:
+    """
+    Build the Flask app. Heavy dependencies are not touched here: the Groq SDK is
+    imported on the first LLM call, PyPDF2 and python-docx on the first resume parse
+    and the Supabase client on the first database request. Background threads and
+    SQLite files are likewise only started or opened by the get_* accessors.
+    """
+    flask_app = Flask(__name__)
+    flask_app.config['SECRET_KEY'] = FLASK_SECRET or 'dev-secret-key'
+    CORS(flask_app, resources={r"/api/*": {"origins": ["https://swipe-ai-interview.vercel.app", "http://localhost:3000"]}}, supports_credentials=True)
+    flask_app.register_blueprint(api)
+    return flask_app
+
+# Module-level app for gunicorn (app:app), Vercel and the tests
+app = create_app()
+
+def shutdown_app(drain_timeout: float = 30.0) -> None:
+    """
+    Stop background work and drain in-flight LLM calls before the process exits.
+    Called from gunicorn's worker_exit hook once the worker stopped accepting requests;
+    queued emails stay in the outbox for the next worker to deliver.
+    """
+    logger.info(f"[Backend:shutdown] Draining in-flight work (up to {drain_timeout:.0f}s)")
+    if question_pool:
+        question_pool.shutdown(wait=False)
+    if score_batcher:
+        score_batcher.shutdown(wait=True)
+    if llm_client:
+        llm_client.close(drain_timeout)
+    if email_outbox:
+        email_outbox.shutdown()
+    resume_pool.shutdown(wait=True)
+    tracer.close()
 
 
 if __name__ == '__main__':
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py)
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_ENV') == 'development'
-    app.run(host='0.0.0.0', port=port, debug=True)
+    app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
@@ -0,0 +1,139 @@
+"""
+Benchmark the single-pass contact extractor against the regex cascade it replaced.
+
+Usage:
+    python backend/benchmarks/bench_contact_extractor.py [--resumes 200] [--repeat 3]
+
+Builds a corpus of synthetic resumes (short, typical, long, and a few
+adversarial inputs that make unbounded patterns backtrack) and reports
+per-resume timings plus how often both implementations agree.
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_extractor import extract_contact_info  # noqa: E402
+
+FIRST_NAMES = ['Jane', 'John', 'Priya', 'Wei', 'Carlos', 'Amara', 'Lukas', 'Sofia', 'Omar', 'Hana']
+LAST_NAMES = ['Smith', 'Patel', 'Chen', 'Garcia', 'Okafor', 'Muller', 'Rossi', 'Haddad', 'Tanaka', 'Brown']
+SKILLS = ['Python', 'React', 'Node.js', 'PostgreSQL', 'Docker', 'Kubernetes', 'TypeScript', 'AWS', 'Flask', 'Redis']
+SECTIONS = ['Summary', 'Experience', 'Education', 'Projects', 'Skills', 'Certifications']
+
+
+def legacy_extract_info_from_text(text):
+    """The regex cascade previously used by resume_parser.extract_info_from_text"""
+    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    email_match = re.search(email_pattern, text)
+    email = email_match.group() if email_match else None
+
+    phone_patterns = [
+        r'\+?1?[-.\s]?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})',
+        r'\+?[0-9]{1,3}[-.\s]?[0-9]{3,4}[-.\s]?[0-9]{3,4}[-.\s]?[0-9]{3,4}',
+        r'\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}'
+    ]
+    phone = None
+    for pattern in phone_patterns:
+        phone_match = re.search(pattern, text)
+        if phone_match:
+            phone = phone_match.group().strip()
+            break
+
+    name_patterns = [
+        r'(?:Name|Full Name|Candidate Name)[:\s]+([A-Za-z\s]{2,50})',
+        r'^([A-Za-z\s]{2,50})\s*$',
+        r'([A-Z][a-z]+\s+[A-Z][a-z]+)',
+    ]
+    name = None
+    for pattern in name_patterns:
+        name_match = re.search(pattern, text, re.MULTILINE | re.IGNORECASE)
+        if name_match:
+            name = name_match.group(1).strip()
+            name = re.sub(r'\s+', ' ', name)
+            if len(name) > 2 and len(name) < 50:
+                break
+    return {'name': name, 'email': email, 'phone': phone}
+
+
+def make_resume(rng: random.Random, paragraphs: int) -> str:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    lines = [
+        f'{first} {last}',
+        f'{first.lower()}.{last.lower()}@example.com | +1 {rng.randint(200, 999)}-555-{rng.randint(1000, 9999)}',
+        'San Francisco, CA | linkedin.com/in/' + first.lower() + last.lower(),
+    ]
+    for index in range(paragraphs):
+        lines.append('')
+        lines.append(SECTIONS[index % len(SECTIONS)])
+        for _ in range(rng.randint(3, 8)):
+            words = rng.sample(SKILLS, 4)
+            lines.append(f'Built services with {words[0]} and {words[1]}, migrated {words[2]} workloads to '
+                         f'{words[3]} between {rng.randint(2012, 2020)}-{rng.randint(2021, 2024)}.')
+    return '\n'.join(lines)
+
+
+def make_corpus(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        paragraphs = rng.choice([2, 6, 6, 6, 20, 60])
+        corpus.append(make_resume(rng, paragraphs))
+    # Adversarial inputs: long letter runs and unterminated address-like tokens
+    corpus.append(('a' * 60 + ' ') * 2000)
+    corpus.append('x' * 20000 + '@' + 'y' * 20000)
+    corpus.append(('Experience ' * 5 + '\n') * 3000)
+    return corpus
+
+
+def time_per_item(fn, corpus, repeat: int) -> list:
+    timings = []
+    for text in corpus:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(text)
+            best = min(best, time.perf_counter() - start)
+        timings.append(best)
+    return timings
+
+
+def summarize(label: str, timings: list) -> None:
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(f"{label:<10} total={sum(ms):9.2f}ms  mean={statistics.mean(ms):7.3f}ms  "
+          f"p95={p95:7.3f}ms  max={ms[-1]:8.3f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--resumes', type=int, default=200, help='synthetic resumes to generate')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per resume (best is kept)')
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.resumes)
+    print(f"Corpus: {len(corpus)} texts, {sum(map(len, corpus)) / 1024:.0f} KiB")
+
+    legacy = time_per_item(legacy_extract_info_from_text, corpus, args.repeat)
+    current = time_per_item(extract_contact_info, corpus, args.repeat)
+    summarize('legacy', legacy)
+    summarize('extractor', current)
+    print(f"Speedup: {sum(legacy) / sum(current):.1f}x total, "
+          f"{max(legacy) / max(current):.1f}x on the slowest input")
+
+    fields = ('name', 'email', 'phone')
+    agree = {field: 0 for field in fields}
+    for text in corpus[:args.resumes]:
+        old, new = legacy_extract_info_from_text(text), extract_contact_info(text)
+        for field in fields:
+            agree[field] += old[field] == new[field]
+    print('Agreement on synthetic resumes: ' +
+          ', '.join(f"{field}={agree[field] / args.resumes:.0%}" for field in fields))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark precompiled email templates against the f-string builders they replaced.
+
+Usage:
+    python backend/benchmarks/bench_email_templates.py [--emails 10000] [--render-only]
+
+Renders the shortlist template for N distinct recipients and serializes each
+message the way the outbox does at send time, old pipeline versus new. With
+--render-only just the HTML rendering is timed; the f-string is hard to beat
+there, and the compiled templates also HTML-escape every variable.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from email.mime.multipart import MIMEMultipart  # noqa: E402
+from email.mime.text import MIMEText  # noqa: E402
+
+from email_outbox import build_message  # noqa: E402
+from email_templates import EmailTemplates  # noqa: E402
+
+
+def legacy_create_shortlist_email(candidate_name, job_title):
+    """The f-string builder previously in app.py"""
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <title>Congratulations!</title>
+        <style>
+            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+            .header {{ background: linear-gradient(135deg, #3A7CFF, #2563EB); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
+            .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }}
+            .button {{ display: inline-block; background: #3A7CFF; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; margin: 20px 0; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h1>🎉 Congratulations!</h1>
+                <p>You have been shortlisted for the next round</p>
+            </div>
+            <div class="content">
+                <h2>Dear {candidate_name},</h2>
+                <p>We are excited to inform you that you have been <strong>shortlisted</strong> for the <strong>{job_title}</strong> position!</p>
+                <p>Your performance in our AI-powered interview was impressive, and we would like to move forward with the next steps in our hiring process.</p>
+                <p>Our team will be in touch with you shortly to schedule the next round of interviews.</p>
+                <p>Thank you for your interest in joining our team!</p>
+                <br>
+                <p>Best regards,<br>The Hiring Team</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+
+def legacy_build_message(sender, to_addr, subject, html):
+    """MIME construction previously done for every message"""
+    msg = MIMEMultipart('alternative')
+    msg['From'] = sender
+    msg['To'] = to_addr
+    msg['Subject'] = subject
+    msg.attach(MIMEText(html, 'html'))
+    return msg.as_bytes()
+
+
+def legacy_render(name, job_title):
+    subject = f'Congratulations! You have been shortlisted for {job_title}'
+    return subject, legacy_create_shortlist_email(name, job_title)
+
+
+def run(label, render, build, names, job_title, mime):
+    started = time.perf_counter()
+    for i, name in enumerate(names):
+        subject, html = render(name, job_title)
+        if mime:
+            build('hr@example.com', f'c{i}@example.com', subject, html)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<10} {len(names)} emails in {elapsed * 1000:8.1f}ms  "
+          f"({len(names) / elapsed:,.0f}/s, {elapsed / len(names) * 1e6:.2f}us each)")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--emails', type=int, default=10000, help='recipients to render')
+    parser.add_argument('--render-only', action='store_true', help='skip building the MIME message')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    templates = EmailTemplates()
+    print(f"Loaded {len(templates.names())} templates in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    names = [f'Candidate {i}' for i in range(args.emails)]
+    job_title = 'Fullstack Developer'
+    legacy = run('f-string', legacy_render, legacy_build_message, names, job_title, not args.render_only)
+    compiled = run('compiled', lambda name, title: templates.render('shortlist', candidate_name=name, job_title=title),
+                   build_message, names, job_title, not args.render_only)
+    print(f"Speedup: {legacy / compiled:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
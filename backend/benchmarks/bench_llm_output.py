@@ -0,0 +1,82 @@
+"""
+Measure the structured-output parser on the recorded LLM response corpus.
+
+Usage:
+    python backend/benchmarks/bench_llm_output.py [--repeat 2000]
+
+For every response in backend/tests/fixtures/llm_responses.json, compares the
+shared parser with what the endpoints used to do (json.loads, plus code-fence
+stripping in /api/summary) and reports success rates and parse latency.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from llm_output import OutputParseError, OutputParser, SCHEMAS  # noqa: E402
+
+FIXTURES = os.path.join(BACKEND, 'tests', 'fixtures', 'llm_responses.json')
+
+
+def legacy_parse(response, schema):
+    """json.loads with the fence stripping /api/summary used to do"""
+    cleaned = response.strip()
+    if schema == 'summary' and cleaned.startswith('```'):
+        cleaned = re.sub(r'^```(?:json)?\s*', '', cleaned)
+        cleaned = re.sub(r'\s*```$', '', cleaned)
+    return SCHEMAS[schema].validate(json.loads(cleaned))
+
+
+def time_call(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        try:
+            fn()
+        except (OutputParseError, ValueError):
+            pass
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=2000, help='parses per response when timing')
+    args = parser.parse_args()
+
+    with open(FIXTURES, encoding='utf-8') as f:
+        corpus = json.load(f)
+    recoverable = [case for case in corpus if case['ok']]
+    output_parser = OutputParser()
+
+    def succeeds(fn, case):
+        try:
+            fn(case['response'], case['schema'])
+            return True
+        except (OutputParseError, ValueError):
+            return False
+
+    legacy_ok = sum(succeeds(legacy_parse, case) for case in recoverable)
+    parser_ok = sum(succeeds(output_parser.parse, case) for case in recoverable)
+    rejected = sum(not succeeds(output_parser.parse, case) for case in corpus if not case['ok'])
+    print(f"Corpus: {len(corpus)} responses, {len(recoverable)} recoverable")
+    print(f"Recovered without a repair call: legacy {legacy_ok}/{len(recoverable)}, "
+          f"parser {parser_ok}/{len(recoverable)}")
+    print(f"Invalid output rejected: {rejected}/{len(corpus) - len(recoverable)}")
+
+    timings = {}
+    for case in corpus:
+        parse_us = time_call(lambda: output_parser.parse(case['response'], case['schema']), args.repeat)
+        legacy_us = time_call(lambda: legacy_parse(case['response'], case['schema']), args.repeat)
+        timings[case['note']] = (legacy_us, parse_us)
+        print(f"  {case['note']:<34} legacy={legacy_us:7.1f}us  parser={parse_us:7.1f}us")
+    parser_times = sorted(t[1] for t in timings.values())
+    print(f"Parser latency: median {statistics.median(parser_times):.1f}us, max {parser_times[-1]:.1f}us")
+
+
+if __name__ == '__main__':
+    main()
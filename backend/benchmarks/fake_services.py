@@ -0,0 +1,230 @@
+"""
+Local stand-ins for Groq and SMTP used by the load tests.
+
+FakeGroqServer speaks the OpenAI-compatible chat completions API the Groq SDK
+calls (point GROQ_BASE_URL at it). It answers with the same schema-valid JSON
+as llm_router.StubLLMClient, after a configurable latency, and injects 5xx
+errors and 429 rate limits at configurable rates. Streaming requests get SSE
+chunks over chunked transfer encoding, so httpx keeps its pooled connections.
+
+SMTPSink accepts and counts messages without delivering them (no STARTTLS, no
+AUTH; run the app with SMTP_STARTTLS=false and no SMTP_USER).
+"""
+import json
+import random
+import socketserver
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from llm_router import StubLLMClient
+from prompts import (EVALUATION_SYSTEM, IDEAL_SYSTEM, QUESTION_BATCH_SYSTEM, QUESTION_SYSTEM, REPAIR_SYSTEM,
+                     SCORE_BATCH_SYSTEM, SCORE_SYSTEM, SUMMARY_SYSTEM, Prompt)
+
+# The system message identifies the prompt, exactly as the app builds it
+PROMPT_NAMES = {
+    QUESTION_BATCH_SYSTEM: 'question_batch',
+    QUESTION_SYSTEM: 'question',
+    IDEAL_SYSTEM: 'ideal_answer',
+    SCORE_SYSTEM: 'score',
+    SCORE_BATCH_SYSTEM: 'score_batch',
+    EVALUATION_SYSTEM: 'evaluation',
+    SUMMARY_SYSTEM: 'summary',
+    REPAIR_SYSTEM: 'repair',
+}
+
+STREAM_CHUNK_CHARS = 24
+
+
+class FakeGroqServer:
+    def __init__(self, latency: float = 0.5, jitter: float = 0.3, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, host: str = '127.0.0.1', port: int = 0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.random = random.Random(seed)
+        self.stub = StubLLMClient()
+        self.counts = {'requests': 0, 'ok': 0, 'errors': 0, 'rate_limited': 0, 'streams': 0}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+    def _decide(self) -> str:
+        with self._lock:
+            roll = self.random.random()
+            delay = max(0.0, self.latency * (1 + self.random.uniform(-self.jitter, self.jitter)))
+        self._count('requests')
+        time.sleep(delay)
+        if roll < self.rate_limit_rate:
+            return 'rate_limited'
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 'errors'
+        return 'ok'
+
+    def respond(self, body: Dict[str, Any]) -> str:
+        messages = body.get('messages') or []
+        system = next((m['content'] for m in messages if m.get('role') == 'system'), '')
+        user = next((m['content'] for m in reversed(messages) if m.get('role') == 'user'), '')
+        return self.stub.respond(Prompt(PROMPT_NAMES.get(system, 'unknown'), system, user))
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _chunk(self, data: bytes) -> None:
+                self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+                if not self.path.endswith('/chat/completions'):
+                    self._json(404, {'error': {'message': 'Not found'}})
+                    return
+                outcome = fake._decide()
+                fake._count(outcome)
+                if outcome == 'rate_limited':
+                    self._json(429, {'error': {'message': 'Rate limit reached', 'type': 'tokens',
+                                               'code': 'rate_limit_exceeded'}}, {'retry-after': '1'})
+                    return
+                if outcome == 'errors':
+                    self._json(500, {'error': {'message': 'Injected upstream error', 'type': 'internal_server_error'}})
+                    return
+
+                content = fake.respond(body)
+                completion_id = f'chatcmpl-{uuid.uuid4().hex[:24]}'
+                created = int(time.time())
+                model = body.get('model', 'fake')
+                if not body.get('stream'):
+                    prompt_chars = sum(len(m.get('content') or '') for m in body.get('messages') or [])
+                    self._json(200, {
+                        'id': completion_id, 'object': 'chat.completion', 'created': created, 'model': model,
+                        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                                     'finish_reason': 'stop'}],
+                        'usage': {'prompt_tokens': prompt_chars // 4, 'completion_tokens': len(content) // 4,
+                                  'total_tokens': (prompt_chars + len(content)) // 4},
+                    })
+                    return
+
+                fake._count('streams')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                pieces = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+                for index, piece in enumerate(pieces + [None]):
+                    choice = ({'index': 0, 'delta': {'content': piece}, 'finish_reason': None} if piece is not None
+                              else {'index': 0, 'delta': {}, 'finish_reason': 'stop'})
+                    event = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created,
+                             'model': model, 'choices': [choice]}
+                    self._chunk(f'data: {json.dumps(event)}\n\n'.encode())
+                self._chunk(b'data: [DONE]\n\n')
+                self.wfile.write(b'0\r\n\r\n')
+
+        return Handler
+
+    def start(self) -> 'FakeGroqServer':
+        self._thread = threading.Thread(target=self.server.serve_forever, name='fake-groq', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SMTPSink:
+    """Minimal SMTP server that accepts every message and counts it"""
+
+    def __init__(self, latency: float = 0.0, host: str = '127.0.0.1', port: int = 0):
+        self.latency = latency
+        self.messages = 0
+        self.sessions = 0
+        self._lock = threading.Lock()
+        self.server = socketserver.ThreadingTCPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def host(self) -> str:
+        return self.server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def _handler(self):
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str) -> None:
+                self.wfile.write(line.encode() + b'\r\n')
+
+            def handle(self):
+                with sink._lock:
+                    sink.sessions += 1
+                self.reply('220 smtp-sink ESMTP')
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode('latin-1').strip().split(' ', 1)[0].upper()
+                    if command == 'EHLO':
+                        self.reply('250-smtp-sink')
+                        self.reply('250-8BITMIME')
+                        self.reply('250 SIZE 26214400')
+                    elif command in ('HELO', 'MAIL', 'RCPT', 'RSET', 'NOOP'):
+                        self.reply('250 OK')
+                    elif command == 'DATA':
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        while True:
+                            data = self.rfile.readline()
+                            if not data or data in (b'.\r\n', b'.\n'):
+                                break
+                        if sink.latency:
+                            time.sleep(sink.latency)
+                        with sink._lock:
+                            sink.messages += 1
+                        self.reply('250 OK queued')
+                    elif command == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        self.reply('502 Command not implemented')
+
+        return Handler
+
+    def start(self) -> 'SMTPSink':
+        self._thread = threading.Thread(target=self.server.serve_forever, name='smtp-sink', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,381 @@
+"""
+Load-test the backend API at a target request rate.
+
+Usage:
+    python backend/benchmarks/loadtest.py [--rps 5] [--duration 30] [--scenarios generate,evaluate]
+        [--groq-latency 0.5] [--groq-error-rate 0.02] [--groq-429-rate 0.05]
+        [--save baseline.json] [--compare baseline.json]
+
+By default the app is started in this process on a local port, with Groq
+replaced by a fake server (configurable latency, error and 429 rates), SMTP
+by a local sink and resumes generated as synthetic PDF/DOCX files. With
+--url the load goes to an already running server instead (e.g. under
+gunicorn); pass --pid to sample that server's memory.
+
+Each scenario is driven open-loop at --rps: requests start on schedule
+whether or not earlier ones have finished, and latency is measured from the
+scheduled start, so a saturated server shows up as growing latency instead
+of a lower request rate. All scenarios run concurrently, like interviews in
+different stages. The report has throughput, error rate and p50/p95/p99 per
+scenario plus RSS memory; --save writes it as JSON and --compare fails (exit
+status 1) when p95 or the error rate regresses against a saved baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+sys.path.insert(0, os.path.join(BACKEND, 'tests'))
+
+import requests  # noqa: E402
+
+from resume_fixtures import SAMPLE_HEADER, make_docx, make_pdf  # noqa: E402
+
+JOBS = [
+    ('Fullstack Developer', 'React, Node.js and PostgreSQL; owns features end to end.'),
+    ('Data Engineer', 'Builds batch and streaming pipelines in Python and SQL.'),
+    ('Backend Engineer', 'Designs REST APIs in Python, caching and queueing.'),
+]
+
+ANSWER = ('I would start by clarifying the requirements, then pick a data model, write tests for the '
+          'edge cases and measure before optimizing. ')
+
+
+# --- Scenarios ---------------------------------------------------------------
+
+class Scenario:
+    """One endpoint and how to build the i-th request for it"""
+
+    def __init__(self, name: str, build: Callable[[int], Dict[str, Any]]):
+        self.name = name
+        self.build = build
+
+
+def build_generate(i: int) -> Dict[str, Any]:
+    title, description = JOBS[i % len(JOBS)]
+    return {'method': 'POST', 'path': '/api/generate',
+            'json': {'action': 'generate_batch', 'job_id': f'bench-job-{i % len(JOBS)}',
+                     'job_context': title, 'job_description': description}}
+
+
+def build_evaluate(i: int) -> Dict[str, Any]:
+    questions = [{'question': f'Question {n + 1} for candidate {i}', 'ideal_answer': 'An ideal answer.',
+                  'candidate_answer': ANSWER * (1 + n % 3), 'difficulty': d}
+                 for n, d in enumerate(['easy', 'easy', 'medium', 'medium', 'hard', 'hard'])]
+    return {'method': 'POST', 'path': '/api/evaluate-answers',
+            'json': {'questions': questions, 'job_title': JOBS[i % len(JOBS)][0]}}
+
+
+def build_summary(i: int) -> Dict[str, Any]:
+    answers = [{'question': f'Question {n + 1}', 'candidate_answer': ANSWER, 'score': (i + n) % 10 + 1}
+               for n in range(6)]
+    return {'method': 'POST', 'path': '/api/summary',
+            'json': {'answers': answers, 'candidate': {'name': f'Candidate {i}'},
+                     'job': {'title': JOBS[i % len(JOBS)][0]}}}
+
+
+def make_resumes(pages: int) -> List[tuple]:
+    body = [f'Experience line {n}: shipped a service handling production traffic.' for n in range(30)]
+    pdf = make_pdf([SAMPLE_HEADER + body] + [body] * (pages - 1))
+    docx = make_docx(SAMPLE_HEADER + body * pages)
+    return [('resume.pdf', pdf, 'application/pdf'),
+            ('resume.docx', docx, 'application/vnd.openxmlformats-officedocument.wordprocessingml.document')]
+
+
+def resume_builder(pages: int) -> Callable[[int], Dict[str, Any]]:
+    resumes = make_resumes(pages)
+
+    def build(i: int) -> Dict[str, Any]:
+        # The in-process app runs with the resume cache off, so every upload is parsed
+        name, data, mimetype = resumes[i % len(resumes)]
+        return {'method': 'POST', 'path': '/api/parse-resume', 'files': {'file': (name, data, mimetype)}}
+
+    return build
+
+
+def build_send_email(i: int) -> Dict[str, Any]:
+    return {'method': 'POST', 'path': '/api/send-email',
+            'json': {'to': f'candidate{i}@example.com', 'template': 'shortlist' if i % 2 else 'reject',
+                     'candidate_name': f'Candidate {i}', 'job_title': JOBS[i % len(JOBS)][0]}}
+
+
+def make_scenarios(resume_pages: int) -> Dict[str, Scenario]:
+    return {scenario.name: scenario for scenario in (
+        Scenario('generate', build_generate),
+        Scenario('evaluate', build_evaluate),
+        Scenario('summary', build_summary),
+        Scenario('parse_resume', resume_builder(resume_pages)),
+        Scenario('send_email', build_send_email),
+    )}
+
+
+# --- Measurement -------------------------------------------------------------
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Resident set size of a process from /proc (Linux only)"""
+    try:
+        with open(f'/proc/{pid or "self"}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class MemorySampler:
+    def __init__(self, pid: Optional[int] = None, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[float] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            value = rss_mb(self.pid)
+            if value is not None:
+                self.samples.append(value)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> 'MemorySampler':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def report(self) -> Optional[Dict[str, float]]:
+        if not self.samples:
+            return None
+        return {'start_mb': round(self.samples[0], 1), 'peak_mb': round(max(self.samples), 1),
+                'end_mb': round(self.samples[-1], 1)}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.service_times: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, status: str, latency: float, service_time: float) -> None:
+        with self._lock:
+            self.latencies.append(latency)
+            self.service_times.append(service_time)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        total = len(latencies)
+        errors = sum(count for status, count in self.statuses.items() if not status.startswith(('2', '3')))
+        ms = lambda value: round(value * 1000, 1) if value is not None else None  # noqa: E731
+        return {
+            'requests': total,
+            'throughput_rps': round(total / elapsed, 2) if elapsed else None,
+            'error_rate': round(errors / total, 4) if total else None,
+            'statuses': dict(sorted(self.statuses.items())),
+            'p50_ms': ms(percentile(latencies, 50)),
+            'p95_ms': ms(percentile(latencies, 95)),
+            'p99_ms': ms(percentile(latencies, 99)),
+            'max_ms': ms(latencies[-1] if latencies else None),
+            'service_p95_ms': ms(percentile(sorted(self.service_times), 95)),
+        }
+
+
+def drive(base_url: str, scenarios: List[Scenario], rps: float, duration: float, concurrency: int,
+          timeout: float) -> Dict[str, Any]:
+    """Open-loop load: every scenario issues rps requests per second for duration seconds"""
+    local = threading.local()
+    recorders = {scenario.name: Recorder() for scenario in scenarios}
+
+    def session() -> requests.Session:
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return local.session
+
+    def run(scenario: Scenario, index: int, scheduled: float) -> None:
+        spec = scenario.build(index)
+        started = time.perf_counter()
+        try:
+            response = session().request(spec['method'], base_url + spec['path'], json=spec.get('json'),
+                                         files=spec.get('files'), timeout=timeout)
+            response.content
+            status = str(response.status_code)
+        except requests.RequestException as e:
+            status = type(e).__name__
+        finished = time.perf_counter()
+        recorders[scenario.name].record(status, finished - scheduled, finished - started)
+
+    total_per_scenario = max(1, int(rps * duration))
+    schedule = sorted((n / rps, scenario_index, n)
+                      for scenario_index in range(len(scenarios)) for n in range(total_per_scenario))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for offset, scenario_index, n in schedule:
+            scheduled = started + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(run, scenarios[scenario_index], n, scheduled)
+    elapsed = time.perf_counter() - started
+    return {name: recorder.report(elapsed) for name, recorder in recorders.items()}
+
+
+# --- In-process target -------------------------------------------------------
+
+def start_local_app(args, workdir: str):
+    """Start fake Groq, the SMTP sink and the app on local ports; returns (base_url, services, server)"""
+    from fake_services import FakeGroqServer, SMTPSink
+
+    groq = FakeGroqServer(latency=args.groq_latency, jitter=args.groq_jitter, error_rate=args.groq_error_rate,
+                          rate_limit_rate=args.groq_429_rate, seed=1).start()
+    smtp = SMTPSink(latency=args.smtp_latency).start()
+    os.environ.update({
+        'GROQ_API_KEY': 'bench-key',
+        'GROQ_BASE_URL': groq.url,
+        'GROQ_RPM': str(args.groq_rpm),
+        'GROQ_TPM': '0',
+        'LLM_CACHE_BACKEND': 'memory' if args.llm_cache else 'off',
+        'RESUME_CACHE_BACKEND': 'off',
+        'SMTP_HOST': smtp.host,
+        'SMTP_PORT': str(smtp.port),
+        'SMTP_STARTTLS': 'false',
+        'SMTP_FROM': 'bench@example.com',
+        'EMAIL_OUTBOX_PATH': os.path.join(workdir, 'email_outbox.sqlite3'),
+        'TRACE_EXPORTER': 'off',
+    })
+    for name in ('SUPABASE_URL', 'SUPABASE_KEY', 'SMTP_USER', 'SMTP_PASS', 'LLM_PROVIDER'):
+        os.environ.pop(name, None)
+
+    import logging
+    # Injected Groq errors would otherwise flood the report with tracebacks
+    logging.disable(logging.ERROR)
+    from werkzeug.serving import make_server
+    import app as app_module
+
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='bench-app', daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}', (groq, smtp), server
+
+
+# --- Baselines ---------------------------------------------------------------
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return one line per regression: p95 up by more than tolerance, or a higher error rate"""
+    regressions = []
+    for name, current in report['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        if before.get('p95_ms') and current.get('p95_ms') is not None:
+            change = current['p95_ms'] / before['p95_ms'] - 1
+            print(f"  {name:<13} p95 {before['p95_ms']:>9.1f} -> {current['p95_ms']:>9.1f} ms ({change:+.0%})")
+            if change > tolerance:
+                regressions.append(f'{name}: p95 {before["p95_ms"]}ms -> {current["p95_ms"]}ms')
+        if (current.get('error_rate') or 0) > (before.get('error_rate') or 0) + 0.01:
+            regressions.append(f'{name}: error rate {before.get("error_rate")} -> {current["error_rate"]}')
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', help='target an already running server instead of starting one in-process')
+    parser.add_argument('--pid', type=int, help='with --url, sample memory of this server process')
+    parser.add_argument('--scenarios', default='generate,evaluate,summary,parse_resume,send_email',
+                        help='comma-separated scenarios to run concurrently')
+    parser.add_argument('--rps', type=float, default=5, help='target requests per second, per scenario')
+    parser.add_argument('--duration', type=float, default=30, help='seconds of load')
+    parser.add_argument('--concurrency', type=int, default=128, help='client threads (max requests in flight)')
+    parser.add_argument('--timeout', type=float, default=60, help='per-request client timeout in seconds')
+    parser.add_argument('--resume-pages', type=int, default=2, help='pages per synthetic resume')
+    parser.add_argument('--groq-latency', type=float, default=0.5, help='fake Groq mean latency in seconds')
+    parser.add_argument('--groq-jitter', type=float, default=0.3, help='fake Groq latency jitter (fraction)')
+    parser.add_argument('--groq-error-rate', type=float, default=0.0, help='fraction of Groq calls failing with 500')
+    parser.add_argument('--groq-429-rate', type=float, default=0.0, help='fraction of Groq calls answered with 429')
+    parser.add_argument('--groq-rpm', type=float, default=0, help='client-side GROQ_RPM for the app (0 = off)')
+    parser.add_argument('--smtp-latency', type=float, default=0.02, help='SMTP sink delay per message in seconds')
+    parser.add_argument('--llm-cache', action='store_true', help='keep the LLM response cache enabled')
+    parser.add_argument('--save', help='write the report as baseline JSON')
+    parser.add_argument('--compare', help='compare against a baseline JSON; exit 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p95 increase when comparing')
+    args = parser.parse_args()
+
+    all_scenarios = make_scenarios(args.resume_pages)
+    unknown = [name for name in args.scenarios.split(',') if name not in all_scenarios]
+    if unknown:
+        parser.error(f'unknown scenarios {unknown}, choose from {list(all_scenarios)}')
+    scenarios = [all_scenarios[name] for name in args.scenarios.split(',')]
+
+    workdir = tempfile.mkdtemp(prefix='swipe-loadtest-')
+    services = ()
+    if args.url:
+        base_url, pid = args.url.rstrip('/'), args.pid
+    else:
+        base_url, services, _ = start_local_app(args, workdir)
+        pid = None  # this process: the app plus the load generator
+
+    print(f"Target {base_url}: {', '.join(s.name for s in scenarios)} at {args.rps} rps each "
+          f"for {args.duration:.0f}s")
+    with MemorySampler(pid) as memory:
+        results = drive(base_url, scenarios, args.rps, args.duration, args.concurrency, args.timeout)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'target': 'in-process' if not args.url else args.url,
+            'config': {key: value for key, value in vars(args).items() if key not in ('save', 'compare')},
+        },
+        'scenarios': results,
+        'memory': memory.report(),
+    }
+    if services:
+        groq, smtp = services
+        report['fake_groq'] = dict(groq.counts)
+        report['smtp_sink'] = {'sessions': smtp.sessions, 'messages': smtp.messages}
+
+    print(f"\n{'scenario':<13} {'requests':>8} {'rps':>7} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, result in results.items():
+        print(f"{name:<13} {result['requests']:>8} {result['throughput_rps']:>7} "
+              f"{result['error_rate']:>7.1%} {result['p50_ms']:>9} {result['p95_ms']:>9} {result['p99_ms']:>9}")
+    if report['memory']:
+        print(f"\nRSS {report['memory']['start_mb']} MB -> peak {report['memory']['peak_mb']} MB")
+    for key in ('fake_groq', 'smtp_sink'):
+        if key in report:
+            print(f"{key}: {report[key]}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.compare} ({baseline.get('meta', {}).get('timestamp')}):")
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print('Regressions:\n  ' + '\n  '.join(regressions))
+            sys.exit(1)
+        print('No regressions')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+Bulk resume ingestion shared by the /api/parse-resumes/bulk endpoint and
+scripts/ingest_resumes.py.
+
+Files come from a ZIP archive or a directory, are parsed in parallel with a
+bounded number in flight, and results are yielded per file as soon as they
+are ready so callers can stream NDJSON. Parsed candidates are upserted into
+the `students` table in batches rather than one request per row.
+"""
+import logging
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from resume_parser import ALLOWED_EXTENSIONS, MAX_FILE_BYTES
+
+logger = logging.getLogger(__name__)
+
+MAX_ARCHIVE_FILES = int(os.getenv('BULK_MAX_FILES', 1000))
+
+# (display name, path on disk, extension)
+ResumeFile = Tuple[str, str, str]
+# (path, extension) -> (text, extracted_info)
+ParseFn = Callable[[str, str], Tuple[str, dict]]
+
+
+def iter_directory_files(directory: str) -> Iterator[ResumeFile]:
+    """Yield supported resume files below a directory"""
+    for root, _, names in os.walk(directory):
+        for name in sorted(names):
+            ext = os.path.splitext(name)[1].lower()
+            if ext in ALLOWED_EXTENSIONS:
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, directory), path, ext
+
+
+def iter_zip_files(zip_path: str, workdir: str, max_files: int = MAX_ARCHIVE_FILES) -> Iterator[ResumeFile]:
+    """
+    Extract supported resume files from a ZIP archive one at a time into workdir.
+    Oversized members and anything past max_files are skipped.
+    """
+    count = 0
+    with zipfile.ZipFile(zip_path) as archive:
+        for index, member in enumerate(archive.infolist()):
+            name = member.filename
+            ext = os.path.splitext(name)[1].lower()
+            if member.is_dir() or ext not in ALLOWED_EXTENSIONS or '__MACOSX' in name:
+                continue
+            if member.file_size > MAX_FILE_BYTES:
+                logger.warning(f"[BulkIngest] Skipping {name}: larger than {MAX_FILE_BYTES} bytes")
+                continue
+            if count >= max_files:
+                logger.warning(f"[BulkIngest] Archive has more than {max_files} resumes, ignoring the rest")
+                return
+            # Never trust member names as paths
+            path = os.path.join(workdir, f'{index}{ext}')
+            with archive.open(member) as src, open(path, 'wb') as dst:
+                shutil.copyfileobj(src, dst, 64 * 1024)
+            count += 1
+            yield name, path, ext
+
+
+def parse_files(files: Iterable[ResumeFile], parse_fn: ParseFn, max_workers: int = 4,
+                include_text: bool = False, cleanup: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Parse files in parallel, yielding one result dict per file in completion order.
+    At most 2 * max_workers files are in flight, so memory stays flat for large batches.
+    """
+    def run(item: ResumeFile) -> Dict[str, Any]:
+        name, path, ext = item
+        try:
+            text, info = parse_fn(path, ext)
+            if not text.strip():
+                return {'file': name, 'status': 'error', 'error': 'Could not extract text from file'}
+            result = {'file': name, 'status': 'ok', 'extracted_info': info, 'chars': len(text)}
+            if include_text:
+                result['text'] = text
+            return result
+        except Exception as e:
+            logger.error(f"[BulkIngest] Failed to parse {name}: {e}")
+            return {'file': name, 'status': 'error', 'error': str(e) or e.__class__.__name__}
+        finally:
+            if cleanup:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+    max_in_flight = max(1, 2 * max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bulk-ingest') as executor:
+        in_flight = set()
+        for item in files:
+            in_flight.add(executor.submit(run, item))
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in in_flight:
+            yield future.result()
+
+
+class StudentUpserter:
+    """Buffer parsed candidates and upsert them into `students` in batches keyed on email"""
+
+    def __init__(self, client, batch_size: int = 100):
+        self.client = client
+        self.batch_size = batch_size
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self.upserted = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def add(self, info: Optional[dict]) -> bool:
+        """Queue one candidate; returns False if it lacks the required name/email"""
+        info = info or {}
+        email = (info.get('email') or '').strip().lower()
+        name = (info.get('name') or '').strip()
+        if not email or not name:
+            self.skipped += 1
+            return False
+        phone = (info.get('phone') or '').strip()
+        # Postgres rejects an upsert that touches the same key twice; last one wins
+        self._rows[email] = {'name': name[:255], 'email': email[:255], 'phone': phone[:20] or None}
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+        return True
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+        rows: List[Dict[str, Any]] = list(self._rows.values())
+        self._rows = {}
+        try:
+            self.client.table('students').upsert(rows, on_conflict='email').execute()
+            self.upserted += len(rows)
+        except Exception as e:
+            self.failed += len(rows)
+            logger.error(f"[BulkIngest] Upsert of {len(rows)} students failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return {'upserted': self.upserted, 'skipped': self.skipped, 'failed': self.failed}
+
+
+def ingest(files: Iterable[ResumeFile], parse_fn: ParseFn, max_workers: int = 4,
+           upserter: Optional[StudentUpserter] = None, include_text: bool = False,
+           cleanup: bool = False) -> Iterator[Dict[str, Any]]:
+    """Parse files, optionally upsert them, and finish with a {"summary": ...} record"""
+    started = time.perf_counter()
+    totals = {'files': 0, 'ok': 0, 'error': 0}
+    for result in parse_files(files, parse_fn, max_workers, include_text, cleanup):
+        totals['files'] += 1
+        totals[result['status']] += 1
+        if upserter is not None and result['status'] == 'ok':
+            result['upsert'] = 'queued' if upserter.add(result['extracted_info']) else 'skipped'
+        yield result
+    if upserter is not None:
+        upserter.flush()
+        totals['students'] = upserter.stats()
+    totals['seconds'] = round(time.perf_counter() - started, 3)
+    yield {'summary': totals}
+
+
+def make_workdir() -> str:
+    return tempfile.mkdtemp(prefix='bulk-resumes-')
+
+
+def remove_workdir(workdir: str) -> None:
+    shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,179 @@
+"""
+Single-pass name/email/phone extraction for resume text.
+
+All patterns are compiled once at import time and every quantifier is
+bounded, so no input can trigger catastrophic backtracking. Contact details
+almost always sit at the top of a resume, so the header region is scanned
+first and the rest of the text is only searched for fields still missing.
+Each field comes with a confidence score between 0 and 1.
+"""
+import re
+from typing import Any, Dict, Optional, Tuple
+
+HEADER_CHARS = 3000
+HEADER_LINES = 40
+MAX_LINE_CHARS = 200
+
+_EMAIL = r'[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9-]{1,63}(?:\.[A-Za-z0-9-]{1,63}){0,8}\.[A-Za-z]{2,24}'
+_PHONE = r'\+?(?:\d{1,3}[-. ]?)?\(?\d{3,4}\)?[-. ]?\d{3,4}[-. ]?\d{3,4}(?:[-. ]?\d{3,4})?'
+
+# Emails and phones are found together in one scan; the lookarounds keep
+# matches from starting or ending inside a longer token
+CONTACT_RE = re.compile(rf'(?<![\w.%+-])(?P<email>{_EMAIL})(?![\w-])|(?<![\w+])(?P<phone>{_PHONE})(?!\w)')
+PHONE_LABEL_RE = re.compile(r'(?:phone|mobile|mob|tel|cell|contact)\W{0,3}$', re.IGNORECASE)
+
+_NAME_WORD = r"[A-Za-z][A-Za-z'.-]{0,24}"
+LABELED_NAME_RE = re.compile(
+    rf'^[ \t]{{0,10}}(?:full name|candidate name|name)[ \t]{{0,5}}[:\-][ \t]{{0,5}}'
+    rf'({_NAME_WORD}(?: {{1,3}}{_NAME_WORD}){{0,4}})[ \t]{{0,10}}$',
+    re.IGNORECASE | re.MULTILINE,
+)
+NAME_LINE_RE = re.compile(rf'^({_NAME_WORD}(?: {{1,3}}{_NAME_WORD}){{1,3}})$')
+FIRST_LAST_RE = re.compile(r'\b([A-Z][a-z]{1,24} [A-Z][a-z]{1,24})\b')
+
+# Lines that look like names but are section headings
+HEADING_WORDS = frozenset({
+    'resume', 'curriculum', 'vitae', 'cv', 'profile', 'summary', 'objective', 'experience',
+    'education', 'skills', 'projects', 'contact', 'information', 'details', 'personal',
+    'professional', 'work', 'history', 'references', 'certifications', 'languages',
+})
+
+
+def _line_name(line: str) -> Optional[Tuple[str, float]]:
+    """Name candidate from a single line, if it looks like one"""
+    labeled = LABELED_NAME_RE.match(line)
+    if labeled:
+        return re.sub(r'\s+', ' ', labeled.group(1)).strip(), 0.95
+    stripped = line.strip()
+    match = NAME_LINE_RE.match(stripped)
+    if not match or stripped.endswith('.') or HEADING_WORDS.intersection(stripped.lower().split()):
+        return None
+    # Names are written "Jane Smith" or "JANE SMITH"; lowercase words mean a sentence
+    if not all(word[0].isupper() for word in stripped.split()):
+        return None
+    return re.sub(r'\s+', ' ', match.group(1)), 0.75 if stripped.isupper() else 0.85
+
+
+def _phone_confidence(phone: str, prefix: str) -> float:
+    digits = sum(ch.isdigit() for ch in phone)
+    if not 9 <= digits <= 15:
+        return 0.3
+    score = 0.8 if (phone.startswith('+') or any(ch in phone for ch in '-. ()')) else 0.6
+    if PHONE_LABEL_RE.search(prefix):
+        score += 0.15
+    return round(min(score, 0.95), 2)
+
+
+def _scan(text: str, result: Dict[str, Any], confidence: Dict[str, float], weight: float,
+          context: str = '') -> None:
+    """
+    One pass over text filling in whichever of email/phone are still missing.
+    context is the text just before it, so a phone label in an earlier chunk still counts.
+    """
+    for match in CONTACT_RE.finditer(text):
+        if match.lastgroup == 'email':
+            if result['email'] is None:
+                result['email'] = match.group('email')
+                confidence['email'] = round(0.95 * weight, 2)
+        elif result['phone'] is None:
+            phone = match.group('phone').strip()
+            start = match.start()
+            prefix = text[start - 12:start] if start >= 12 else (context + text[:start])[-12:]
+            result['phone'] = phone
+            confidence['phone'] = round(_phone_confidence(phone, prefix) * weight, 2)
+        if result['email'] is not None and result['phone'] is not None:
+            return
+
+
+class ContactScanner:
+    """
+    extract_contact_info for text that arrives in chunks (pages, paragraphs).
+
+    Every chunk is scanned once and fields already found are kept, so the work
+    is linear in the text read. Chunks should end at line breaks, as the
+    resume_parser iterators do.
+    """
+
+    def __init__(self):
+        self.result: Dict[str, Any] = {'name': None, 'email': None, 'phone': None}
+        self.confidence = {'name': 0.0, 'email': 0.0, 'phone': 0.0}
+        self.header_chars = 0
+        self.header_done = False
+        self._lines = 0
+        self._line_name = False
+        self._seen_newline = False
+        self._tail = ''
+
+    @property
+    def complete(self) -> bool:
+        return None not in self.result.values()
+
+    def feed(self, chunk: str) -> None:
+        chunk = chunk or ''
+        tail = (self._tail + chunk[-12:])[-12:]
+        if self.header_done:
+            self._body(chunk)
+        else:
+            # Cut the header at a line break so no token is split between the two scans
+            room = HEADER_CHARS - self.header_chars
+            if len(chunk) <= room:
+                cut = len(chunk)
+            else:
+                cut = chunk.rfind('\n', 0, room) + 1 or (0 if self._seen_newline else room)
+            self._header(chunk[:cut])
+            if cut < len(chunk):
+                self.header_done = True
+                self._tail = (self._tail + chunk[:cut])[-12:]
+                self._body(chunk[cut:])
+        self._seen_newline = self._seen_newline or '\n' in chunk
+        self._tail = tail
+
+    def _header(self, text: str) -> None:
+        self.header_chars += len(text)
+        if self.result['email'] is None or self.result['phone'] is None:
+            _scan(text, self.result, self.confidence, 1.0, self._tail)
+
+        # Names: label or name-only line near the top, then a "First Last" pair in the header
+        if self._line_name:
+            return
+        for line in text.splitlines():
+            if self._lines >= HEADER_LINES:
+                break
+            index = self._lines
+            self._lines += 1
+            candidate = _line_name(line[:MAX_LINE_CHARS])
+            if candidate:
+                name, score = candidate
+                self.result['name'] = name
+                self.confidence['name'] = score if index < 5 or score >= 0.95 else round(score - 0.15, 2)
+                self._line_name = True
+                return
+        if self.result['name'] is None:
+            match = FIRST_LAST_RE.search(text)
+            if match:
+                self.result['name'] = match.group(1)
+                self.confidence['name'] = 0.5
+
+    def _body(self, text: str) -> None:
+        """Text past the header is only searched for what the header did not provide"""
+        if self.result['email'] is None or self.result['phone'] is None:
+            _scan(text, self.result, self.confidence, 0.85, self._tail)
+        if self.result['name'] is None:
+            labeled = LABELED_NAME_RE.search(text)
+            if labeled:
+                self.result['name'] = re.sub(r'\s+', ' ', labeled.group(1)).strip()
+                self.confidence['name'] = 0.8
+
+    def info(self) -> Dict[str, Any]:
+        return dict(self.result, confidence=dict(self.confidence))
+
+
+def extract_contact_info(text: str) -> Dict[str, Any]:
+    """
+    Extract name, email and phone, returning
+    {"name", "email", "phone", "confidence": {"name": 0.85, ...}}.
+    Missing fields are None with a confidence of 0.
+    """
+    scanner = ContactScanner()
+    scanner.feed(text)
+    return scanner.info()
@@ -0,0 +1,243 @@
+"""
+Server-side Supabase access for jobs and candidates.
+
+- One pooled Supabase client per process: PostgREST calls share a single
+  httpx connection pool instead of opening a connection per request.
+- Keyset pagination: pages continue from the last row seen, not an OFFSET.
+  Jobs are ordered on (created_at DESC, id DESC) and candidates on
+  (final_score DESC, id), served by idx_jobs_created_at_id and
+  idx_interviews_job_score_id.
+- Narrow projections: list views never load the answers/scores JSONB.
+- ReadThroughCache: serialized pages with an ETag, invalidated on writes
+  by bumping a per-namespace version. With SharedVersions the versions live
+  in a SQLite file, so a write through any worker on the host invalidates
+  every worker's pages. Writes that bypass this API (e.g. the browser's
+  Supabase client) are only picked up when cached pages expire, so the
+  cache TTL bounds their staleness.
+"""
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from llm_cache import MemoryCache
+
+logger = logging.getLogger(__name__)
+
+JOB_COLUMNS = 'id,title,description,custom_questions,created_at'
+CANDIDATE_COLUMNS = 'id,student_id,final_score,status,summary,completed_at,students(name,email,phone)'
+
+
+class InvalidCursorError(ValueError):
+    """A pagination cursor could not be decoded"""
+
+
+def create_supabase_client(url: str, key: str, max_connections: int = 20,
+                           max_keepalive_connections: int = 10, timeout: float = 10.0):
+    """Create a Supabase client whose PostgREST calls share one bounded connection pool"""
+    import httpx
+    from supabase import ClientOptions, create_client
+
+    http_client = httpx.Client(
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections),
+        timeout=timeout,
+        follow_redirects=True,
+    )
+    return create_client(url, key, options=ClientOptions(httpx_client=http_client))
+
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, size: int, types: Optional[Sequence[tuple]] = None) -> list:
+    """Decode a cursor of `size` values, each an instance of the matching entry of `types` if given"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception:
+        raise InvalidCursorError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError('Invalid cursor')
+    for value, expected in zip(values, types or ()):
+        if (not isinstance(value, expected) or isinstance(value, bool)
+                or (isinstance(value, float) and not math.isfinite(value))):
+            raise InvalidCursorError('Invalid cursor')
+    return values
+
+
+def _quote(value: Any) -> str:
+    """Quote a value for a PostgREST or=() filter (timestamps contain reserved characters)"""
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+class JobStore:
+    """Jobs and candidate listings backed by Supabase"""
+
+    def __init__(self, client, page_size: int = 50, max_page_size: int = 200):
+        self.client = client
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+
+    def _limit(self, limit: Optional[int]) -> int:
+        return max(1, min(limit or self.page_size, self.max_page_size))
+
+    def list_jobs(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """One page of jobs, newest first"""
+        limit = self._limit(limit)
+        query = (
+            self.client.table('jobs')
+            .select(JOB_COLUMNS)
+            .order('created_at', desc=True)
+            .order('id', desc=True)
+            .limit(limit + 1)
+        )
+        if cursor:
+            created_at, job_id = decode_cursor(cursor, 2, (str, str))
+            query = query.or_(f'created_at.lt.{_quote(created_at)},'
+                              f'and(created_at.eq.{_quote(created_at)},id.lt.{_quote(job_id)})')
+        rows = query.execute().data or []
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1]['created_at'], rows[-1]['id']])
+        return {'jobs': rows, 'next_cursor': next_cursor}
+
+    def create_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        rows = self.client.table('jobs').insert(job).execute().data or []
+        return rows[0] if rows else job
+
+    def update_job(self, job_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        rows = self.client.table('jobs').update(changes).eq('id', job_id).execute().data or []
+        return rows[0] if rows else None
+
+    def list_candidates(self, job_id: str, limit: Optional[int] = None,
+                        cursor: Optional[str] = None, status: Optional[str] = None) -> Dict[str, Any]:
+        """One page of scored candidates for a job, best first"""
+        limit = self._limit(limit)
+        query = (
+            self.client.table('interviews')
+            .select(CANDIDATE_COLUMNS)
+            .eq('job_id', job_id)
+            .not_.is_('final_score', 'null')
+            .order('final_score', desc=True)
+            .order('id')
+            .limit(limit + 1)
+        )
+        if status:
+            query = query.eq('status', status)
+        if cursor:
+            score, interview_id = decode_cursor(cursor, 2, ((int, float), str))
+            query = query.or_(f'final_score.lt.{float(score)},'
+                              f'and(final_score.eq.{float(score)},id.gt.{_quote(interview_id)})')
+        rows = query.execute().data or []
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1]['final_score'], rows[-1]['id']])
+        return {'candidates': [flatten_candidate(row) for row in rows], 'next_cursor': next_cursor}
+
+
+def flatten_candidate(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge the embedded student into the interview row"""
+    student = row.get('students') or {}
+    return {
+        'id': row.get('id'),
+        'student_id': row.get('student_id'),
+        'name': student.get('name'),
+        'email': student.get('email'),
+        'phone': student.get('phone'),
+        'final_score': row.get('final_score'),
+        'status': row.get('status'),
+        'summary': row.get('summary'),
+        'completed_at': row.get('completed_at'),
+    }
+
+
+class SharedVersions:
+    """Namespace versions in a SQLite file, shared by every worker process on the host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads; the file is created on first use
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS read_cache_versions ('
+                         ' namespace TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str) -> int:
+        row = self._conn().execute('SELECT version FROM read_cache_versions WHERE namespace = ?',
+                                   (namespace,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, namespace: str) -> None:
+        self._conn().execute(
+            'INSERT INTO read_cache_versions (namespace, version) VALUES (?, 1)'
+            ' ON CONFLICT(namespace) DO UPDATE SET version = version + 1', (namespace,))
+
+
+class ReadThroughCache:
+    """
+    Cache serialized responses with an ETag. Writes call invalidate(namespace),
+    which bumps the namespace version so every older key is simply never read
+    again and ages out of the LRU. Versions are per process unless a
+    SharedVersions store is given; if it fails, the process falls back to its own.
+    """
+
+    def __init__(self, cache: Optional[MemoryCache] = None, versions: Optional[SharedVersions] = None):
+        self.cache = cache if cache is not None else MemoryCache(ttl_seconds=30, max_entries=512)
+        self.shared = versions
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _version(self, namespace: str) -> int:
+        if self.shared is not None:
+            try:
+                return self.shared.get(namespace)
+            except sqlite3.Error as e:
+                logger.error(f"Shared read cache versions unavailable, using per-process versions: {e}")
+                self.shared = None
+        with self._lock:
+            return self._versions.get(namespace, 0)
+
+    def _key(self, namespace: str, params: Dict[str, Any]) -> str:
+        return f'{namespace}:{self._version(namespace)}:' + json.dumps(params, sort_keys=True, default=str)
+
+    def fetch(self, namespace: str, params: Dict[str, Any], loader: Callable[[], Any]) -> Tuple[str, str, bool]:
+        """Return (body, etag, hit), calling loader() and caching its JSON on a miss"""
+        key = self._key(namespace, params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            etag, body = cached.split('\n', 1)
+            return body, etag, True
+        body = json.dumps(loader(), default=str)
+        etag = hashlib.blake2b(body.encode('utf-8'), digest_size=16).hexdigest()
+        self.cache.set(key, f'{etag}\n{body}')
+        return body, etag, False
+
+    def invalidate(self, namespace: str) -> None:
+        if self.shared is not None:
+            try:
+                self.shared.bump(namespace)
+                return
+            except sqlite3.Error as e:
+                logger.error(f"Shared read cache versions unavailable, using per-process versions: {e}")
+                self.shared = None
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
@@ -0,0 +1,449 @@
+"""
+Persistent email outbox drained by background workers.
+
+/api/send-email used to open a new SMTP connection, STARTTLS and log in for
+every message inside the request. Messages are now written to an SQLite
+outbox and the request returns immediately. Worker threads claim batches of
+due messages, send them over pooled, already-authenticated SMTP sessions
+(several messages per session) and retry transient failures with
+exponential backoff. Permanent rejections (5xx) are not retried.
+
+The outbox file is shared by every worker process, so a claim records its
+owner and time. Claims older than lease_timeout (their owner crashed or was
+killed mid-send) go back to the queue; live claims of sibling processes are
+left alone, so a restarting worker never sends their messages a second time.
+"""
+import base64
+import logging
+import os
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from email.header import Header
+from email.utils import formatdate, make_msgid, parseaddr
+from typing import Any, Callable, Dict, List, Optional
+
+import metrics
+import tracing
+
+logger = logging.getLogger(__name__)
+
+SMTP_SEND_SECONDS = metrics.histogram('swipe_smtp_send_seconds', 'SMTP send latency per message', ('outcome',))
+
+STATUS_QUEUED = 'queued'
+STATUS_SENDING = 'sending'
+STATUS_SENT = 'sent'
+STATUS_FAILED = 'failed'
+
+
+def is_permanent_error(error: BaseException) -> bool:
+    """5xx SMTP replies will not succeed on retry"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    code = getattr(error, 'smtp_code', None)
+    return isinstance(code, int) and code >= 500
+
+
+def _header_value(value: str) -> str:
+    value = ' '.join(value.splitlines())
+    return value if value.isascii() else Header(value, 'utf-8').encode()
+
+
+def msgid_domain(sender: str) -> str:
+    """Domain for Message-IDs: the sender's, which avoids make_msgid's per-call getfqdn() lookup"""
+    return parseaddr(sender)[1].rpartition('@')[2] or 'localhost'
+
+
+def build_message(sender: str, to_addr: str, subject: str, html: str,
+                  message_id: Optional[str] = None, date: Optional[str] = None) -> bytes:
+    """
+    Serialize an HTML email ready for sendmail(). The MIME framing never
+    changes, so it is written directly rather than building MIMEMultipart
+    objects and flattening them through email.generator for every message.
+    The outbox passes the Message-ID and Date fixed at enqueue time, so a
+    resent message keeps them and receivers can drop the duplicate.
+    """
+    headers = (
+        f'Content-Type: text/html; charset="utf-8"\r\n'
+        f'MIME-Version: 1.0\r\n'
+        f'Content-Transfer-Encoding: base64\r\n'
+        f'Message-ID: {message_id or make_msgid(domain=msgid_domain(sender))}\r\n'
+        f'Date: {date or formatdate(localtime=False)}\r\n'
+        f'From: {_header_value(sender)}\r\n'
+        f'To: {_header_value(to_addr)}\r\n'
+        f'Subject: {_header_value(subject)}\r\n\r\n'
+    )
+    return headers.encode('ascii') + base64.encodebytes(html.encode('utf-8')).replace(b'\n', b'\r\n')
+
+
+class SMTPPool:
+    """A small pool of logged-in SMTP sessions that are reused across messages"""
+
+    def __init__(self, host: str, port: int, user: Optional[str] = None, password: Optional[str] = None,
+                 starttls: bool = True, max_connections: int = 2, max_messages_per_session: int = 100,
+                 idle_check_seconds: float = 30.0, timeout: float = 30.0,
+                 factory: Optional[Callable[[], Any]] = None):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.max_messages_per_session = max_messages_per_session
+        self.idle_check_seconds = idle_check_seconds
+        self.timeout = timeout
+        self.factory = factory or (lambda: smtplib.SMTP(self.host, self.port, timeout=self.timeout))
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._idle: List[dict] = []
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _open(self) -> dict:
+        server = self.factory()
+        if self.starttls:
+            server.starttls()
+        if self.user and self.password:
+            server.login(self.user, self.password)
+        self.connections_opened += 1
+        return {'server': server, 'sent': 0, 'last_used': time.monotonic()}
+
+    def acquire(self) -> dict:
+        """Borrow a live session, opening one if none is idle"""
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    return self._open()
+                if time.monotonic() - conn['last_used'] < self.idle_check_seconds:
+                    return conn
+                try:
+                    # Servers drop idle sessions; check before reusing an old one
+                    if conn['server'].noop()[0] == 250:
+                        return conn
+                except Exception:
+                    pass
+                self._close(conn)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: dict, broken: bool = False) -> None:
+        conn['last_used'] = time.monotonic()
+        if broken or conn['sent'] >= self.max_messages_per_session:
+            self._close(conn)
+        else:
+            with self._lock:
+                self._idle.append(conn)
+        self._slots.release()
+
+    def send(self, conn: dict, sender: str, to_addr: str, message: bytes) -> None:
+        started = time.perf_counter()
+        try:
+            with tracing.span('smtp.send', bytes=len(message)):
+                conn['server'].sendmail(sender, [to_addr], message)
+        except Exception:
+            SMTP_SEND_SECONDS.observe(time.perf_counter() - started, 'error')
+            raise
+        SMTP_SEND_SECONDS.observe(time.perf_counter() - started, 'ok')
+        conn['sent'] += 1
+
+    @staticmethod
+    def _close(conn: dict) -> None:
+        try:
+            conn['server'].quit()
+        except Exception:
+            try:
+                conn['server'].close()
+            except Exception:
+                pass
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn)
+
+
+class EmailOutbox:
+    """SQLite-backed queue of outgoing emails with background delivery"""
+
+    def __init__(self, path: str, pool: Optional[SMTPPool] = None, sender: str = '', workers: int = 2,
+                 batch_size: int = 20, max_attempts: int = 5, backoff_base: float = 2.0,
+                 backoff_max: float = 300.0, poll_interval: float = 5.0, lease_timeout: float = 600.0):
+        self.path = path
+        self.pool = pool
+        self.sender = sender
+        self._msgid_domain = msgid_domain(sender)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        # Must exceed the time to send one batch (batch_size x SMTP timeout)
+        self.lease_timeout = lease_timeout
+        self.owner = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        self.requeued = 0
+        self._local = threading.local()
+        self._claim_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS email_outbox ('
+                ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+                ' to_addr TEXT NOT NULL,'
+                ' subject TEXT NOT NULL,'
+                ' html TEXT NOT NULL,'
+                ' status TEXT NOT NULL,'
+                ' attempts INTEGER NOT NULL DEFAULT 0,'
+                ' next_attempt_at REAL NOT NULL,'
+                ' last_error TEXT,'
+                ' created_at REAL NOT NULL,'
+                ' sent_at REAL,'
+                ' claimed_by TEXT,'
+                ' claimed_at REAL,'
+                ' message_id TEXT,'
+                ' date TEXT)'
+            )
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(email_outbox)')}
+            for column, kind in (('claimed_by', 'TEXT'), ('claimed_at', 'REAL'), ('message_id', 'TEXT'),
+                                 ('date', 'TEXT')):
+                if column not in columns:
+                    try:
+                        conn.execute(f'ALTER TABLE email_outbox ADD COLUMN {column} {kind}')
+                    except sqlite3.OperationalError:
+                        # A sibling worker added it first
+                        pass
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox(status, next_attempt_at)')
+        with self._transaction() as conn:
+            self._requeue_expired(conn, time.time())
+        self._threads = []
+        if pool is not None:
+            for i in range(workers):
+                thread = threading.Thread(target=self._run, name=f'email-outbox-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that also excludes other processes sharing the file"""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def enqueue(self, to_addr: str, subject: str, html: str) -> int:
+        """Store one message for delivery and wake a worker; returns the outbox id"""
+        return self.enqueue_many([(to_addr, subject, html)])[0]
+
+    def enqueue_many(self, messages: List[tuple], wake: bool = True) -> List[int]:
+        """Store (to_addr, subject, html) messages in one transaction"""
+        now = time.time()
+        date = formatdate(now, localtime=False)
+        ids = []
+        with self._transaction() as conn:
+            for to_addr, subject, html in messages:
+                cursor = conn.execute(
+                    'INSERT INTO email_outbox (to_addr, subject, html, status, next_attempt_at, created_at,'
+                    ' message_id, date) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (to_addr, subject, html, STATUS_QUEUED, now, now, make_msgid(domain=self._msgid_domain), date),
+                )
+                ids.append(cursor.lastrowid)
+        if wake:
+            self._wakeup.set()
+        return ids
+
+    def status(self, message_id: int) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            'SELECT id, to_addr, status, attempts, last_error, created_at, sent_at FROM email_outbox WHERE id = ?',
+            (message_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ('id', 'to', 'status', 'attempts', 'last_error', 'created_at', 'sent_at')
+        return dict(zip(keys, row))
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float) -> None:
+        """Return messages whose claim outlived the lease (the claiming process died) to the queue"""
+        cursor = conn.execute(
+            'UPDATE email_outbox SET status = ?, claimed_by = NULL, claimed_at = NULL'
+            ' WHERE status = ? AND (claimed_at IS NULL OR claimed_at < ?)',
+            (STATUS_QUEUED, STATUS_SENDING, now - self.lease_timeout),
+        )
+        if cursor.rowcount:
+            self.requeued += cursor.rowcount
+            logger.warning(f"[EmailOutbox] Re-queued {cursor.rowcount} messages with expired claims")
+
+    def _claim(self, ids: Optional[List[int]] = None) -> List[tuple]:
+        """Mark a batch of due messages (or the given queued ids) as sending by this outbox and return them"""
+        now = time.time()
+        with self._claim_lock, self._transaction() as conn:
+            if ids is None:
+                self._requeue_expired(conn, now)
+                rows = conn.execute(
+                    'SELECT id, to_addr, subject, html, attempts, message_id, date FROM email_outbox'
+                    ' WHERE status = ? AND next_attempt_at <= ? ORDER BY next_attempt_at, id LIMIT ?',
+                    (STATUS_QUEUED, now, self.batch_size),
+                ).fetchall()
+            else:
+                rows = []
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    rows += conn.execute(
+                        'SELECT id, to_addr, subject, html, attempts, message_id, date FROM email_outbox'
+                        f' WHERE status = ? AND id IN ({",".join("?" * len(chunk))}) ORDER BY id',
+                        [STATUS_QUEUED] + list(chunk),
+                    ).fetchall()
+            if rows:
+                conn.executemany('UPDATE email_outbox SET status = ?, claimed_by = ?, claimed_at = ? WHERE id = ?',
+                                 [(STATUS_SENDING, self.owner, now, row[0]) for row in rows])
+        return rows
+
+    def _next_due_in(self) -> float:
+        row = self._conn().execute(
+            'SELECT MIN(next_attempt_at) FROM email_outbox WHERE status = ?', (STATUS_QUEUED,)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return self.poll_interval
+        return min(self.poll_interval, max(0.0, row[0] - time.time()))
+
+    def _mark_sent(self, message_id: int) -> None:
+        self._conn().execute('UPDATE email_outbox SET status = ?, sent_at = ?, last_error = NULL WHERE id = ?',
+                             (STATUS_SENT, time.time(), message_id))
+        self.sent += 1
+
+    def _mark_failed(self, message_id: int, attempts: int, error: BaseException) -> None:
+        attempts += 1
+        if is_permanent_error(error) or attempts >= self.max_attempts:
+            self._conn().execute('UPDATE email_outbox SET status = ?, attempts = ?, last_error = ? WHERE id = ?',
+                                 (STATUS_FAILED, attempts, str(error)[:500], message_id))
+            self.failed += 1
+            logger.error(f"[EmailOutbox] Giving up on message {message_id} after {attempts} attempts: {error}")
+            return
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempts)))
+        self._conn().execute(
+            'UPDATE email_outbox SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ? WHERE id = ?',
+            (STATUS_QUEUED, attempts, str(error)[:500], time.time() + delay, message_id),
+        )
+        self.retried += 1
+        logger.warning(f"[EmailOutbox] Message {message_id} failed ({error}), retry in {delay:.1f}s")
+
+    def deliver(self, batch: List[tuple]) -> None:
+        """Send a claimed batch over one pooled SMTP session"""
+        pending = list(batch)
+        try:
+            conn = self.pool.acquire()
+        except Exception as e:
+            logger.error(f"[EmailOutbox] Could not open SMTP session: {e}")
+            for message_id, _, _, _, attempts, _, _ in pending:
+                self._mark_failed(message_id, attempts, e)
+            return
+        broken = False
+        try:
+            while pending:
+                message_id, to_addr, subject, html, attempts, header_id, date = pending[0]
+                try:
+                    # Rows queued before these columns existed get fresh headers
+                    self.pool.send(conn, self.sender, to_addr,
+                                   build_message(self.sender, to_addr, subject, html, header_id, date))
+                    pending.pop(0)
+                    self._mark_sent(message_id)
+                except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError) as e:
+                    # The session is gone; the rest of the batch is retried later
+                    broken = True
+                    for message_id, _, _, _, attempts, _, _ in pending:
+                        self._mark_failed(message_id, attempts, e)
+                    pending = []
+                except Exception as e:
+                    pending.pop(0)
+                    self._mark_failed(message_id, attempts, e)
+        finally:
+            self.pool.release(conn, broken=broken)
+
+    def send_now(self, ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Deliver already-queued messages in the calling thread over a single pooled
+        session and return their statuses. Anything that fails stays in the outbox
+        for the background workers to retry.
+        """
+        if self.pool is not None:
+            # Servers cap messages per session, so hand the pool session-sized chunks
+            step = max(1, self.pool.max_messages_per_session)
+            for start in range(0, len(ids), step):
+                batch = self._claim(ids[start:start + step])
+                if batch:
+                    self.deliver(batch)
+        return [self.status(message_id) for message_id in ids]
+
+    def _run(self) -> None:
+        while not self._closed:
+            try:
+                batch = self._claim()
+                if batch:
+                    self.deliver(batch)
+                    continue
+                self._wakeup.wait(self._next_due_in())
+                self._wakeup.clear()
+            except Exception as e:
+                logger.error(f"[EmailOutbox] Worker error: {e}")
+                time.sleep(self.poll_interval)
+
+    def drain(self, timeout: float = 10.0) -> bool:
+        """Wait until nothing is queued or sending (tests and shutdown)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            row = self._conn().execute(
+                'SELECT COUNT(*) FROM email_outbox WHERE status IN (?, ?)',
+                (STATUS_QUEUED, STATUS_SENDING),
+            ).fetchone()
+            if row[0] == 0:
+                return True
+            time.sleep(0.05)
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        counts = dict(self._conn().execute('SELECT status, COUNT(*) FROM email_outbox GROUP BY status').fetchall())
+        return {
+            'queued': counts.get(STATUS_QUEUED, 0),
+            'sending': counts.get(STATUS_SENDING, 0),
+            'sent_total': counts.get(STATUS_SENT, 0),
+            'failed_total': counts.get(STATUS_FAILED, 0),
+            'sent': self.sent,
+            'failed': self.failed,
+            'retried': self.retried,
+            'requeued': self.requeued,
+            'workers': len(self._threads),
+            'smtp_connections_opened': self.pool.connections_opened if self.pool else 0,
+        }
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        self._closed = True
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        if self.pool is not None:
+            self.pool.close()
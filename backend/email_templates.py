@@ -0,0 +1,99 @@
+"""
+Precompiled email templates.
+
+Every *.html file in the templates directory is one email. The first line is
+an HTML comment carrying the subject, the rest is the body:
+
+    <!-- subject: Congratulations! You have been shortlisted for {{ job_title }} -->
+    <!DOCTYPE html>
+    ...<h2>Dear {{ candidate_name }},</h2>...
+
+Files are read once and split into static and dynamic segments. The static
+strings (doctype, inline <style> block, boilerplate copy) are shared by every
+message; rendering only escapes the variables and joins the segments. Adding
+a template (interview invite, reminder, ...) means dropping a file into the
+directory, no code changes.
+"""
+import html
+import logging
+import os
+import re
+from typing import Any, Dict, List, Mapping, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'email')
+
+PLACEHOLDER_RE = re.compile(r'\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}')
+SUBJECT_RE = re.compile(r'\A\s*<!--\s*subject:\s*(.*?)\s*-->[ \t]*\r?\n?', re.IGNORECASE)
+
+
+class TemplateError(ValueError):
+    """A template is unknown, malformed or missing a variable"""
+
+
+class CompiledText:
+    """Text pre-split into alternating static segments and variable slots"""
+
+    __slots__ = ('parts', 'fields', 'slots')
+
+    def __init__(self, source: str):
+        pieces = PLACEHOLDER_RE.split(source)
+        # split() alternates static text (even indices) and variable names (odd indices)
+        self.parts: List[str] = pieces
+        self.fields: Tuple[str, ...] = tuple(pieces[1::2])
+        self.slots = tuple(range(1, len(pieces), 2))
+
+    def render(self, values: Mapping[str, str]) -> str:
+        """Fill the slots from already-escaped values"""
+        parts = self.parts.copy()
+        try:
+            for slot in self.slots:
+                parts[slot] = values[parts[slot]]
+        except KeyError as e:
+            raise TemplateError(f'Missing template variable: {e.args[0]}')
+        return ''.join(parts)
+
+
+class EmailTemplate:
+    def __init__(self, name: str, source: str):
+        match = SUBJECT_RE.match(source)
+        if not match:
+            raise TemplateError(f'Email template {name} has no <!-- subject: ... --> line')
+        self.name = name
+        self.subject = CompiledText(match.group(1))
+        self.body = CompiledText(source[match.end():])
+        self.variables = frozenset(self.subject.fields + self.body.fields)
+
+    def render(self, values: Mapping[str, Any]) -> Tuple[str, str]:
+        """Return (subject, html); variables are HTML-escaped in the body"""
+        values = {key: str(value) for key, value in values.items()}
+        # Each value is escaped once, however often the body uses it
+        return self.subject.render(values), self.body.render({key: html.escape(value) for key, value in values.items()})
+
+
+class EmailTemplates:
+    """All templates in a directory, compiled once"""
+
+    def __init__(self, directory: str = DEFAULT_TEMPLATE_DIR):
+        self.directory = directory
+        self.templates: Dict[str, EmailTemplate] = {}
+        for filename in sorted(os.listdir(directory)):
+            name, ext = os.path.splitext(filename)
+            if ext != '.html':
+                continue
+            with open(os.path.join(directory, filename), encoding='utf-8') as f:
+                self.templates[name] = EmailTemplate(name, f.read())
+        logger.info(f"[EmailTemplates] Loaded {len(self.templates)} templates from {directory}")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.templates
+
+    def names(self) -> List[str]:
+        return list(self.templates)
+
+    def render(self, name: str, **values: Any) -> Tuple[str, str]:
+        template = self.templates.get(name)
+        if template is None:
+            raise TemplateError(f'Unknown email template: {name}')
+        return template.render(values)
@@ -0,0 +1,68 @@
+"""
+Production server settings.
+
+Usage (from backend/):
+    gunicorn -c gunicorn.conf.py app:app
+
+Almost every request waits on Groq, SMTP or the resume parser pool, and the
+LLM calls already run on each worker's shared asyncio loop over pooled
+connections. A request thread therefore spends its time parked on a future,
+so gthread workers with many threads per process serve far more concurrent
+interviews than one thread per core; CPU-heavy resume parsing is already
+off the request threads in ResumeParsePool.
+
+The app is not preloaded: the async LLM loop thread, the email outbox
+workers and the parser process pool are started per worker after the fork.
+The app builds them on first use; post_worker_init starts the email outbox
+right away so mail queued by earlier workers is delivered without waiting
+for the next email request.
+On shutdown gunicorn stops accepting connections, lets in-flight requests
+finish within graceful_timeout, and worker_exit then drains in-flight LLM
+calls (see app.shutdown_app).
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', 5000)}")
+
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.getenv('GUNICORN_THREADS', 32))
+
+# Long enough for an LLM summary with retries, or a streamed evaluation
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# Keep idle client connections open; behind a load balancer set this above its idle timeout
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers periodically to cap memory growth; jitter avoids restarting all at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+preload_app = False
+# Heartbeat files on tmpfs so a slow disk cannot make the arbiter kill healthy workers
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+forwarded_allow_ips = os.getenv('FORWARDED_ALLOW_IPS', '127.0.0.1')
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+LLM_DRAIN_TIMEOUT = float(os.getenv('LLM_DRAIN_TIMEOUT', 20))
+
+
+def post_worker_init(worker):
+    try:
+        import app as app_module
+        app_module.get_email_outbox()
+    except Exception as e:
+        worker.log.error(f"Worker {worker.pid} could not start the email outbox: {e}")
+
+
+def worker_exit(server, worker):
+    try:
+        # Already imported by this worker; a worker that failed to boot raises here and is only logged
+        import app as app_module
+        app_module.shutdown_app(drain_timeout=LLM_DRAIN_TIMEOUT)
+    except Exception as e:
+        server.log.error(f"Worker {worker.pid} shutdown failed: {e}")
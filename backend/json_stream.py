@@ -0,0 +1,109 @@
+"""
+Incremental parser for streamed LLM JSON output.
+
+Prompts ask the model for {"questions": [...]} or {"evaluations": [...]}.
+When the completion is streamed token by token, StreamingArrayParser emits
+each element of the named array as soon as its closing brace arrives, so the
+first item can be shown long before the full completion has finished.
+"""
+import json
+import logging
+import re
+from typing import Any, Iterable, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingArrayParser:
+    """Emit the objects of `{"<key>": [ {...}, {...} ]}` as they complete"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self._key_pattern = re.compile(r'"' + re.escape(key) + r'"\s*:\s*\[')
+        self._text = ''
+        self._pos = 0            # next unscanned index in _text once inside the array
+        self._in_array = False
+        self._done = False
+        self._depth = 0          # nesting depth relative to the array
+        self._in_string = False
+        self._escaped = False
+        self._item_start = -1
+        self.emitted = 0
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume more completion text, returning any array items completed by it"""
+        if not chunk or self._done:
+            return []
+        self._text += chunk
+        items: List[Any] = []
+
+        if not self._in_array:
+            match = self._key_pattern.search(self._text)
+            if not match:
+                # Only a key split across chunks can still match; keep just enough text for that
+                self._text = self._text[-(len(self.key) + 64):]
+                return items
+            self._in_array = True
+            self._pos = match.end()
+            # Drop everything before the array; it is never needed again
+            self._text = self._text[self._pos:]
+            self._pos = 0
+
+        text = self._text
+        i = self._pos
+        length = len(text)
+        while i < length:
+            ch = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                if self._depth == 0 and ch == '{':
+                    self._item_start = i
+                self._depth += 1
+            elif ch in '}]':
+                if self._depth == 0:
+                    # Closing bracket of the array itself
+                    self._done = True
+                    break
+                self._depth -= 1
+                if self._depth == 0 and self._item_start >= 0:
+                    raw = text[self._item_start:i + 1]
+                    self._item_start = -1
+                    try:
+                        items.append(json.loads(raw))
+                        self.emitted += 1
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"[StreamingArrayParser] Skipping malformed {self.key} item: {e}")
+            i += 1
+
+        if self._item_start >= 0:
+            # Keep only the partial item so the buffer stays small
+            self._text = text[self._item_start:]
+            self._pos = i - self._item_start
+            self._item_start = 0
+        else:
+            self._text = ''
+            self._pos = 0
+        return items
+
+    @property
+    def done(self) -> bool:
+        """True once the closing bracket of the array has been seen"""
+        return self._done
+
+
+def iter_array_items(chunks: Iterable[str], key: str) -> Iterator[Any]:
+    """Yield array items from a stream of text chunks as soon as each one completes"""
+    parser = StreamingArrayParser(key)
+    for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+        if parser.done:
+            return
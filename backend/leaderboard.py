@@ -0,0 +1,204 @@
+"""
+Per-job candidate rankings.
+
+Interviewers rank candidates by final_score. Instead of loading every
+interview (with its answers/scores JSONB) and sorting client-side, a compact
+leaderboard of (job, candidate, score) entries is kept up to date as scores
+are finalized and answers top-K, rank-of-candidate and percentile queries.
+
+Two backends are provided:
+- MemoryLeaderboard: per-process sorted lists, used when Supabase is not configured
+- SupabaseLeaderboard: the job_leaderboard table from database/schema.sql,
+  indexed on (job_id, final_score DESC, student_id)
+Ties are broken by candidate id so ranks are stable.
+"""
+import bisect
+import logging
+import math
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_COLUMNS = 'student_id,interview_id,name,final_score,updated_at'
+
+
+class Leaderboard:
+    """Interface shared by all backends"""
+
+    backend = 'none'
+
+    def candidate_key(self, candidate: Dict[str, Any]) -> Optional[str]:
+        """Id the candidate is ranked under, or None if it cannot be determined"""
+        candidate_id = candidate.get('id') or candidate.get('email')
+        return str(candidate_id) if candidate_id else None
+
+    def record(self, job_id: str, candidate_id: str, final_score: float, name: Optional[str] = None,
+               interview_id: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    def top(self, job_id: str, k: int = 10) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def rank(self, job_id: str, candidate_id: str) -> Optional[Dict[str, Any]]:
+        """{"rank", "total", "percentile", "final_score"} or None if the candidate is not ranked"""
+        raise NotImplementedError
+
+    def score_at_percentile(self, job_id: str, percentile: float) -> Optional[float]:
+        """Lowest score that still places a candidate in the given percentile"""
+        raise NotImplementedError
+
+
+def percentile_of(rank: int, total: int) -> float:
+    """Share of ranked candidates placed below this rank, as 0-100"""
+    return round(100.0 * (total - rank) / total, 1) if total else 0.0
+
+
+def percentile_index(percentile: float, total: int) -> int:
+    """0-based position (best first) of the weakest candidate within the given percentile"""
+    percentile = min(max(percentile, 0.0), 100.0)
+    return max(0, min(total - 1, math.ceil(total * (100.0 - percentile) / 100.0) - 1))
+
+
+class MemoryLeaderboard(Leaderboard):
+    """Sorted per-job lists; O(log n) rank lookups and O(n) updates"""
+
+    backend = 'memory'
+
+    def __init__(self):
+        self._order: Dict[str, list] = {}
+        self._entries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, job_id, candidate_id, final_score, name=None, interview_id=None):
+        if not 0 <= float(final_score) <= 10:
+            # Same rule as the CHECK constraint on job_leaderboard.final_score
+            raise ValueError(f'final_score must be between 0 and 10, got {final_score}')
+        job_id, candidate_id = str(job_id), str(candidate_id)
+        with self._lock:
+            order = self._order.setdefault(job_id, [])
+            entries = self._entries.setdefault(job_id, {})
+            previous = entries.get(candidate_id)
+            if previous is not None:
+                del order[bisect.bisect_left(order, (-previous['final_score'], candidate_id))]
+            entries[candidate_id] = {
+                'student_id': candidate_id,
+                'interview_id': interview_id,
+                'name': name,
+                'final_score': round(float(final_score), 1),
+                'updated_at': datetime.now(timezone.utc).isoformat(),
+            }
+            bisect.insort(order, (-entries[candidate_id]['final_score'], candidate_id))
+
+    def top(self, job_id, k=10):
+        with self._lock:
+            entries = self._entries.get(str(job_id), {})
+            return [dict(entries[cid], rank=i + 1)
+                    for i, (_, cid) in enumerate(self._order.get(str(job_id), [])[:k])]
+
+    def rank(self, job_id, candidate_id):
+        job_id, candidate_id = str(job_id), str(candidate_id)
+        with self._lock:
+            entry = self._entries.get(job_id, {}).get(candidate_id)
+            if entry is None:
+                return None
+            order = self._order[job_id]
+            rank = bisect.bisect_left(order, (-entry['final_score'], candidate_id)) + 1
+            return {'rank': rank, 'total': len(order), 'percentile': percentile_of(rank, len(order)),
+                    'final_score': entry['final_score']}
+
+    def score_at_percentile(self, job_id, percentile):
+        with self._lock:
+            order = self._order.get(str(job_id), [])
+            if not order:
+                return None
+            return -order[percentile_index(percentile, len(order))][0]
+
+
+class SupabaseLeaderboard(Leaderboard):
+    """job_leaderboard table; every query is an index range scan or a count"""
+
+    backend = 'supabase'
+
+    def __init__(self, client):
+        self.client = client
+
+    def _table(self):
+        return self.client.table('job_leaderboard')
+
+    def candidate_key(self, candidate):
+        """job_leaderboard.student_id references students(id), so an email is resolved to the student's id"""
+        candidate_id = candidate.get('id')
+        if candidate_id:
+            try:
+                return str(uuid.UUID(str(candidate_id)))
+            except ValueError:
+                return None
+        email = candidate.get('email')
+        if not email:
+            return None
+        rows = self.client.table('students').select('id').eq('email', email).limit(1).execute().data
+        return str(rows[0]['id']) if rows else None
+
+    def record(self, job_id, candidate_id, final_score, name=None, interview_id=None):
+        row = {
+            'job_id': job_id,
+            'student_id': candidate_id,
+            'final_score': round(float(final_score), 1),
+            'updated_at': datetime.now(timezone.utc).isoformat(),
+        }
+        if name:
+            row['name'] = name
+        if interview_id:
+            row['interview_id'] = interview_id
+        self._table().upsert(row, on_conflict='job_id,student_id').execute()
+
+    def top(self, job_id, k=10):
+        rows = (
+            self._table().select(LEADERBOARD_COLUMNS)
+            .eq('job_id', job_id)
+            .order('final_score', desc=True)
+            .order('student_id')
+            .limit(k)
+            .execute().data or []
+        )
+        return [dict(row, rank=i + 1) for i, row in enumerate(rows)]
+
+    def _count(self, job_id, **filters) -> int:
+        query = self._table().select('student_id', count='exact', head=True).eq('job_id', job_id)
+        for op, (column, value) in filters.items():
+            query = getattr(query, op)(column, value)
+        return query.execute().count or 0
+
+    def rank(self, job_id, candidate_id):
+        rows = (
+            self._table().select('final_score')
+            .eq('job_id', job_id).eq('student_id', candidate_id)
+            .limit(1).execute().data or []
+        )
+        if not rows:
+            return None
+        score = float(rows[0]['final_score'])
+        higher = self._count(job_id, gt=('final_score', score))
+        # Ties are ordered by student_id, matching top()
+        tied_before = self._count(job_id, eq=('final_score', score), lt=('student_id', candidate_id))
+        total = self._count(job_id)
+        rank = higher + tied_before + 1
+        return {'rank': rank, 'total': total, 'percentile': percentile_of(rank, total), 'final_score': score}
+
+    def score_at_percentile(self, job_id, percentile):
+        total = self._count(job_id)
+        if not total:
+            return None
+        index = percentile_index(percentile, total)
+        rows = (
+            self._table().select('final_score')
+            .eq('job_id', job_id)
+            .order('final_score', desc=True)
+            .order('student_id')
+            .range(index, index)
+            .execute().data or []
+        )
+        return float(rows[0]['final_score']) if rows else None
@@ -0,0 +1,169 @@
+"""
+Asyncio-based Groq client with a bounded keep-alive connection pool.
+
+Flask views are synchronous, so the client runs its own event loop on a
+background thread and exposes blocking helpers that submit coroutines to it.
+All calls share one pooled HTTP client and one concurrency semaphore, which
+lets a single request fan out several prompts in parallel without opening a
+new connection per call or exceeding the configured concurrency.
+"""
+import asyncio
+import concurrent.futures
+import logging
+import queue
+import threading
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+from prompts import PromptInput, to_messages
+
+logger = logging.getLogger(__name__)
+
+# (prompt, max_tokens) pairs accepted by gather()
+PromptRequest = Tuple[PromptInput, int]
+
+
+class AsyncLLMClient:
+    """Pooled, concurrency-limited chat completion client"""
+
+    def __init__(self, api_key: Optional[str], model: str, temperature: float = 0.7,
+                 max_connections: int = 20, max_keepalive_connections: int = 10,
+                 keepalive_expiry: float = 30.0, max_concurrency: int = 8, timeout: float = 30.0,
+                 max_retries: int = 2):
+        self.api_key = api_key
+        self.model = model
+        self.temperature = temperature
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._client = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name='llm-async-loop', daemon=True)
+        self._thread.start()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def _get_client(self):
+        # Created lazily on the loop thread: httpx.AsyncClient binds to the running loop
+        if self._client is None:
+            import httpx
+            from groq import AsyncGroq
+
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                timeout=self.timeout,
+            )
+            self._client = AsyncGroq(api_key=self.api_key, http_client=http_client, max_retries=self.max_retries)
+        return self._client
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _request(self, prompt: PromptInput, max_tokens: int, model: Optional[str] = None) -> str:
+        response = await self._get_client().chat.completions.create(
+            messages=to_messages(prompt),
+            model=model or self.model,
+            max_tokens=max_tokens,
+            temperature=self.temperature,
+        )
+        return response.choices[0].message.content.strip()
+
+    async def _request_stream(self, prompt: PromptInput, max_tokens: int, model: Optional[str] = None):
+        stream = await self._get_client().chat.completions.create(
+            messages=to_messages(prompt),
+            model=model or self.model,
+            max_tokens=max_tokens,
+            temperature=self.temperature,
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def acomplete(self, prompt: PromptInput, max_tokens: int = 500, model: Optional[str] = None) -> str:
+        """Run one completion, waiting for a free concurrency slot first"""
+        async with self._get_semaphore():
+            return await self._request(prompt, max_tokens, model)
+
+    async def agather(self, requests: Sequence[PromptRequest]) -> List[Union[str, BaseException]]:
+        """Run several completions concurrently; failures are returned in place of results"""
+        return await asyncio.gather(
+            *(self.acomplete(prompt, max_tokens) for prompt, max_tokens in requests),
+            return_exceptions=True,
+        )
+
+    def run(self, coro, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the client's loop and block until it finishes"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return future.result(timeout)
+
+    def submit(self, prompt: PromptInput, max_tokens: int = 500,
+               model: Optional[str] = None) -> 'concurrent.futures.Future':
+        """Start a completion on the client's loop without waiting for it; cancelling the future cancels the call"""
+        return asyncio.run_coroutine_threadsafe(self.acomplete(prompt, max_tokens, model), self._loop)
+
+    def complete(self, prompt: PromptInput, max_tokens: int = 500) -> str:
+        """Blocking wrapper around acomplete()"""
+        return self.run(self.acomplete(prompt, max_tokens))
+
+    def gather(self, requests: Sequence[PromptRequest]) -> List[Union[str, BaseException]]:
+        """Blocking wrapper around agather()"""
+        return self.run(self.agather(list(requests)))
+
+    def stream(self, prompt: PromptInput, max_tokens: int = 500, model: Optional[str] = None) -> Iterator[str]:
+        """Blocking iterator over completion text deltas as they arrive"""
+        deltas: 'queue.Queue' = queue.Queue()
+        done = object()
+
+        async def _pump():
+            try:
+                async with self._get_semaphore():
+                    async for delta in self._request_stream(prompt, max_tokens, model):
+                        deltas.put(delta)
+            except BaseException as e:
+                deltas.put(e)
+            finally:
+                deltas.put(done)
+
+        future = asyncio.run_coroutine_threadsafe(_pump(), self._loop)
+        try:
+            while True:
+                item = deltas.get(timeout=self.timeout)
+                if item is done:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Consumer stopped early (e.g. client disconnected): stop the upstream request
+            future.cancel()
+
+    def close(self, drain_timeout: float = 0.0) -> None:
+        """Wait up to drain_timeout for in-flight calls, then close pooled connections and stop the event loop"""
+        async def _close():
+            current = asyncio.current_task()
+            in_flight = [task for task in asyncio.all_tasks() if task is not current]
+            if in_flight and drain_timeout > 0:
+                logger.info(f"Draining {len(in_flight)} in-flight LLM calls")
+                _, pending = await asyncio.wait(in_flight, timeout=drain_timeout)
+                if pending:
+                    logger.warning(f"Closing async LLM client with {len(pending)} calls still in flight")
+            if self._client is not None:
+                await self._client.close()
+        try:
+            self.run(_close(), timeout=drain_timeout + 5)
+        except Exception as e:
+            logger.warning(f"Error closing async LLM client: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
@@ -0,0 +1,216 @@
+"""
+Content-addressed response cache for LLM completions.
+
+Entries are keyed on a hash of everything that determines a completion
+(model, prompt, max_tokens, temperature), expire after a TTL and are evicted
+in least-recently-used order once the cache is full.
+
+Two backends are provided:
+- MemoryCache: per-process OrderedDict, fastest, lost on restart
+- SQLiteCache: on-disk file shared by every worker on the host and
+  surviving restarts
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(model: str, prompt: Any, max_tokens: int, temperature: float) -> str:
+    """Build a stable content hash for one completion request"""
+    payload = json.dumps(
+        {'model': model, 'prompt': prompt, 'max_tokens': max_tokens, 'temperature': temperature},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Base class with hit/miss accounting shared by all backends"""
+
+    backend = 'none'
+
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._set(key, value)
+
+    def delete(self, key: str) -> None:
+        self._delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'backend': self.backend,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0,
+            'entries': len(self),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+        }
+
+    def __bool__(self) -> bool:
+        # An empty cache is still a configured cache
+        return True
+
+    def _get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: str) -> None:
+        raise NotImplementedError
+
+    def _delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryCache(ResponseCache):
+    """In-process LRU cache with TTL"""
+
+    backend = 'memory'
+
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 1024):
+        super().__init__(ttl_seconds, max_entries)
+        self._data: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._data[key] = (value, time.time() + self.ttl_seconds)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class SQLiteCache(ResponseCache):
+    """On-disk LRU cache with TTL, safe to share between processes"""
+
+    backend = 'sqlite'
+
+    def __init__(self, path: str, ttl_seconds: float = 3600, max_entries: int = 1024, table: str = 'llm_cache'):
+        super().__init__(ttl_seconds, max_entries)
+        if not table.isidentifier():
+            raise ValueError(f'Invalid table name: {table}')
+        self.path = path
+        self.table = table
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.table} ('
+                ' key TEXT PRIMARY KEY,'
+                ' value TEXT NOT NULL,'
+                ' expires_at REAL NOT NULL,'
+                ' accessed_at REAL NOT NULL)'
+            )
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{self.table}_accessed ON {self.table}(accessed_at)')
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(f'SELECT value, expires_at FROM {self.table} WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at <= now:
+            conn.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+            return None
+        conn.execute(f'UPDATE {self.table} SET accessed_at = ? WHERE key = ?', (now, key))
+        return value
+
+    def _set(self, key: str, value: str) -> None:
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                f'INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, value, now + self.ttl_seconds, now),
+            )
+            conn.execute(f'DELETE FROM {self.table} WHERE expires_at <= ?', (now,))
+            conn.execute(
+                f'DELETE FROM {self.table} WHERE key IN ('
+                f' SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,),
+            )
+
+    def _delete(self, key: str) -> None:
+        self._conn().execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+
+    def __len__(self) -> int:
+        return self._conn().execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+
+
+def create_cache_from_env() -> Optional[ResponseCache]:
+    """Build the configured cache backend, or None when caching is disabled"""
+    backend = os.getenv('LLM_CACHE_BACKEND', 'memory').lower()
+    ttl_seconds = float(os.getenv('LLM_CACHE_TTL', 24 * 3600))
+    max_entries = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 1024))
+
+    if backend in ('', 'none', 'off'):
+        return None
+    if backend == 'sqlite':
+        path = os.getenv('LLM_CACHE_PATH', os.path.join(os.path.dirname(__file__), '.cache', 'llm_cache.sqlite3'))
+        try:
+            return SQLiteCache(path, ttl_seconds=ttl_seconds, max_entries=max_entries)
+        except Exception as e:
+            logger.error(f"Failed to open SQLite LLM cache at {path}, falling back to memory: {e}")
+    return MemoryCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
@@ -0,0 +1,329 @@
+"""
+Structured-output parsing for LLM completions.
+
+Models asked for "ONLY valid JSON" still wrap it in ```json fences, add a
+sentence before or after, leave trailing commas, answer with Python-style
+literals or get cut off by max_tokens. Instead of a bare json.loads() per
+endpoint, completions go through one parser that:
+
+1. tries json.loads on the stripped text (the common, fastest case)
+2. otherwise scans for balanced {...} / [...] candidates, skipping code
+   fences and prose, and decodes each with trailing commas removed, falling
+   back to ast.literal_eval and to closing a truncated object
+3. validates and coerces the result against the endpoint's schema
+4. only if all of that fails, asks the model once for a targeted repair
+
+OutputParser.stats() reports per-schema success rates and parse latency.
+"""
+import ast
+import json
+import logging
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+LLM_OUTPUT_PARSES = metrics.counter('swipe_llm_output_parses_total',
+                                    'LLM outputs by schema and outcome (clean, lenient, repaired, failed)',
+                                    ('schema', 'outcome'))
+
+# Candidate objects tried per completion before giving up
+MAX_CANDIDATES = 8
+
+_STRUCT_RE = re.compile(r'[\[\]{}"]')
+_STRING_BODY_RE = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+_TRAILING_COMMA_RE = re.compile(r'("(?:[^"\\]|\\.)*")|,(\s*[\]}])', re.DOTALL)
+_NUMBER_PREFIX_RE = re.compile(r'\s*(-?\d+(?:\.\d+)?)')
+_DECODER = json.JSONDecoder(strict=False)
+
+
+class OutputParseError(ValueError):
+    """A completion did not contain output matching the expected schema"""
+
+
+# --- Schemas -----------------------------------------------------------------
+
+class Number:
+    """int/float, also accepting numeric strings such as "7" or "7/10" """
+
+    def validate(self, value: Any, path: str) -> float:
+        if isinstance(value, bool):
+            raise OutputParseError(f'{path}: expected a number')
+        if isinstance(value, (int, float)):
+            return value
+        if isinstance(value, str):
+            match = _NUMBER_PREFIX_RE.match(value)
+            if match:
+                number = float(match.group(1))
+                return int(number) if number.is_integer() else number
+        raise OutputParseError(f'{path}: expected a number')
+
+
+class Text:
+    def __init__(self, allow_empty: bool = False):
+        self.allow_empty = allow_empty
+
+    def validate(self, value: Any, path: str) -> str:
+        if not isinstance(value, str) or not (self.allow_empty or value.strip()):
+            raise OutputParseError(f'{path}: expected a non-empty string')
+        return value
+
+
+class Array:
+    def __init__(self, item, length: Optional[int] = None, min_length: int = 0):
+        self.item = item
+        self.length = length
+        self.min_length = min_length
+
+    def validate(self, value: Any, path: str) -> list:
+        if not isinstance(value, list):
+            raise OutputParseError(f'{path}: expected an array')
+        if self.length is not None and len(value) != self.length:
+            raise OutputParseError(f'{path}: expected {self.length} items, got {len(value)}')
+        if len(value) < self.min_length:
+            raise OutputParseError(f'{path}: expected at least {self.min_length} items')
+        return [self.item.validate(item, f'{path}[{i}]') for i, item in enumerate(value)]
+
+
+class Object:
+    def __init__(self, required: Dict[str, Any], optional: Optional[Dict[str, Any]] = None):
+        self.required = required
+        self.optional = optional or {}
+
+    def validate(self, value: Any, path: str) -> dict:
+        if not isinstance(value, dict):
+            raise OutputParseError(f'{path}: expected an object')
+        result = dict(value)
+        for key, spec in self.required.items():
+            if key not in value:
+                raise OutputParseError(f'{path}.{key}: missing')
+            result[key] = spec.validate(value[key], f'{path}.{key}')
+        for key, spec in self.optional.items():
+            if value.get(key) is not None:
+                try:
+                    result[key] = spec.validate(value[key], f'{path}.{key}')
+                except OutputParseError:
+                    # A bad optional field is dropped rather than failing the whole output
+                    result.pop(key)
+        return result
+
+
+class OutputSchema:
+    """
+    Expected shape of one endpoint's output. `wrap` names the key to put a
+    bare top-level array under, for models that answer [...] instead of
+    {"key": [...]}. `example` is shown to the model when requesting a repair.
+    """
+
+    def __init__(self, name: str, spec: Object, example: str, wrap: Optional[str] = None):
+        self.name = name
+        self.spec = spec
+        self.example = example
+        self.wrap = wrap
+
+    def validate(self, value: Any) -> dict:
+        if self.wrap and isinstance(value, list):
+            value = {self.wrap: value}
+        return self.spec.validate(value, '$')
+
+
+SCORE_ITEM = Object({'score': Number()}, optional={'reason': Text()})
+
+SCHEMAS: Dict[str, OutputSchema] = {schema.name: schema for schema in (
+    OutputSchema('question', Object({'question': Text()}, optional={'difficulty': Text()}),
+                 '{"question": "...", "difficulty": "easy"}'),
+    OutputSchema('ideal_answer', Object({'ideal': Text()}), '{"ideal": "..."}'),
+    OutputSchema('question_batch',
+                 Object({'questions': Array(Object({'question': Text(), 'ideal_answer': Text()}), length=6)}),
+                 '{"questions": [{"question": "...", "ideal_answer": "..."}, ... 6 items]}', wrap='questions'),
+    OutputSchema('score', SCORE_ITEM, '{"score": 7, "reason": "..."}'),
+    OutputSchema('score_batch', Object({'scores': Array(SCORE_ITEM, min_length=1)}),
+                 '{"scores": [{"score": 7, "reason": "..."}, ...]}', wrap='scores'),
+    OutputSchema('evaluation', Object({'evaluations': Array(SCORE_ITEM, min_length=1)}),
+                 '{"evaluations": [{"score": 7, "reason": "..."}, ...]}', wrap='evaluations'),
+    OutputSchema('summary', Object({'summary': Text()}, optional={'final_score': Number()}),
+                 '{"final_score": 7.5, "summary": "..."}'),
+)}
+
+
+# --- Extraction --------------------------------------------------------------
+
+def _scan(text: str, start: int) -> Tuple[int, List[str]]:
+    """
+    Scan a JSON value starting at text[start] ('{' or '['). Returns (end, [])
+    for a balanced value, (-1, open_closers) if the text ends inside it, or
+    (-1, []) on mismatched brackets.
+    """
+    stack: List[str] = []
+    pos = start
+    while True:
+        match = _STRUCT_RE.search(text, pos)
+        if not match:
+            return -1, stack
+        ch, pos = match.group(), match.end()
+        if ch == '"':
+            string_end = _STRING_BODY_RE.match(text, pos)
+            if not string_end:
+                return -1, stack + ['"']
+            pos = string_end.end()
+        elif ch == '{':
+            stack.append('}')
+        elif ch == '[':
+            stack.append(']')
+        elif not stack or stack.pop() != ch:
+            return -1, []
+        elif not stack:
+            return pos, []
+
+
+def _strip_trailing_commas(text: str) -> str:
+    return _TRAILING_COMMA_RE.sub(lambda m: m.group(1) or m.group(2), text)
+
+
+def _decode(segment: str) -> Any:
+    """Decode one candidate, tolerating trailing commas and Python literals"""
+    try:
+        return _DECODER.decode(segment)
+    except (ValueError, RecursionError):
+        pass
+    try:
+        return _DECODER.decode(_strip_trailing_commas(segment))
+    except (ValueError, RecursionError):
+        pass
+    try:
+        return ast.literal_eval(segment)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        raise OutputParseError('Candidate is not valid JSON')
+
+
+def _close_truncated(segment: str, closers: List[str]) -> Optional[Any]:
+    """Complete an object cut off by max_tokens, dropping the unfinished last element"""
+    for _ in range(3):
+        try:
+            return _decode(segment + ''.join(reversed(closers)))
+        except OutputParseError:
+            pass
+        cut = segment.rfind(',')
+        if cut <= 0:
+            return None
+        segment = segment[:cut]
+        end, closers = _scan(segment, 0)
+        if end != -1 or not closers:
+            return None
+    return None
+
+
+def iter_candidates(text: str) -> Iterator[Any]:
+    """Yield decoded JSON values found in noisy text, in order of appearance"""
+    pos = 0
+    for _ in range(MAX_CANDIDATES):
+        brace, bracket = text.find('{', pos), text.find('[', pos)
+        starts = [i for i in (brace, bracket) if i != -1]
+        if not starts:
+            return
+        start = min(starts)
+        end, closers = _scan(text, start)
+        if end != -1:
+            try:
+                yield _decode(text[start:end])
+            except OutputParseError:
+                pass
+        elif closers and '"' not in closers:
+            value = _close_truncated(text[start:], closers)
+            if value is not None:
+                yield value
+        elif closers:
+            # Cut off inside a string: close it, then the open containers
+            value = _close_truncated(text[start:] + '"', closers[:-1])
+            if value is not None:
+                yield value
+        pos = start + 1
+
+
+def extract(text: str, schema: OutputSchema) -> Tuple[dict, bool]:
+    """Return (validated output, needed_lenient_parsing)"""
+    stripped = (text or '').strip()
+    errors: List[str] = []
+    try:
+        return schema.validate(_DECODER.decode(stripped)), False
+    except OutputParseError as e:
+        errors.append(str(e))
+    except (ValueError, RecursionError):
+        pass
+    for value in iter_candidates(stripped):
+        try:
+            return schema.validate(value), True
+        except OutputParseError as e:
+            errors.append(str(e))
+    raise OutputParseError(errors[0] if errors else 'No JSON found in output')
+
+
+# --- Parser with repair and stats --------------------------------------------
+
+class OutputParser:
+    """Parse completions against named schemas, optionally repairing once through the model"""
+
+    def __init__(self, schemas: Optional[Dict[str, OutputSchema]] = None):
+        self.schemas = schemas or SCHEMAS
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, schema: str, outcome: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stats.setdefault(schema, {'clean': 0, 'lenient': 0, 'repaired': 0, 'failed': 0,
+                                                    'parse_ms_total': 0.0, 'parse_ms_max': 0.0})
+            entry[outcome] += 1
+            entry['parse_ms_total'] += seconds * 1000
+            entry['parse_ms_max'] = max(entry['parse_ms_max'], seconds * 1000)
+        LLM_OUTPUT_PARSES.inc(schema, outcome)
+
+    def parse(self, text: str, schema: str,
+              repair: Optional[Callable[[str, OutputSchema, str], str]] = None) -> dict:
+        """
+        Parse `text` against the named schema. If it cannot be parsed and
+        `repair(text, schema, error)` is given, it is called once to obtain a
+        corrected completion. Raises OutputParseError if that fails too.
+        """
+        output_schema = self.schemas[schema]
+        started = time.perf_counter()
+        try:
+            result, lenient = extract(text, output_schema)
+            self._record(schema, 'lenient' if lenient else 'clean', time.perf_counter() - started)
+            return result
+        except OutputParseError as e:
+            error = e
+        elapsed = time.perf_counter() - started
+        if repair is None:
+            self._record(schema, 'failed', elapsed)
+            raise error
+
+        logger.warning(f"[LLMOutput] Requesting repair of {schema} output: {error}")
+        try:
+            repaired = repair(text, output_schema, str(error))
+            started = time.perf_counter()
+            result, _ = extract(repaired, output_schema)
+        except Exception as e:
+            self._record(schema, 'failed', elapsed)
+            raise OutputParseError(f'Repair failed: {e}') from e
+        self._record(schema, 'repaired', elapsed + time.perf_counter() - started)
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            report = {}
+            for schema, entry in self._stats.items():
+                total = entry['clean'] + entry['lenient'] + entry['repaired'] + entry['failed']
+                report[schema] = {
+                    'clean': entry['clean'],
+                    'lenient': entry['lenient'],
+                    'repaired': entry['repaired'],
+                    'failed': entry['failed'],
+                    'success_rate': round((total - entry['failed']) / total, 3) if total else None,
+                    'parse_ms_avg': round(entry['parse_ms_total'] / total, 3) if total else None,
+                    'parse_ms_max': round(entry['parse_ms_max'], 3),
+                }
+            return report
@@ -0,0 +1,473 @@
+"""
+Model routing for LLM calls.
+
+A route is one (client, model) pair: the primary Groq model, a fallback
+model, another provider behind the same client interface, or the local
+StubLLMClient. Each endpoint (the Prompt name) gets a policy with an ordered
+list of routes and a deadline:
+
+- the first route is called; if it has not answered after the recent p95
+  latency of that endpoint on that route, a hedged request goes to the next
+  route (or the same one) and whichever answers first wins, the other is
+  cancelled
+- a route that fails hands over to the next healthy one straight away
+- nothing runs past the deadline; LLMDeadlineExceeded is raised instead
+
+The caller is admitted by the RateLimitScheduler once per call. Every extra
+request the router makes is charged to the same scheduler: a hedge only goes
+out if budget is free right now, a failover waits for budget. A 429 pauses
+the scheduler and cools the route down instead of failing over onto it; with
+no other healthy route the error is raised so the caller backs off.
+
+LLMRouter exposes the same complete/gather/stream interface as
+AsyncLLMClient, so callers do not change. Every call records which route
+won and its latency in stats().
+"""
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import metrics
+from llm_async import AsyncLLMClient, PromptRequest
+from prompts import Prompt, PromptInput, prompt_tokens
+from rate_limiter import (PRIORITY_DEFAULT, RateLimitError, RateLimitScheduler, is_rate_limit_error,
+                          retry_after_seconds)
+
+logger = logging.getLogger(__name__)
+
+LLM_CALL_SECONDS = metrics.histogram('swipe_llm_call_seconds', 'Latency of answered LLM calls by endpoint and model',
+                                     ('endpoint', 'model'))
+LLM_TOKENS = metrics.counter('swipe_llm_tokens_total', 'Estimated LLM tokens by endpoint, model and direction',
+                             ('endpoint', 'model', 'kind'))
+LLM_ROUTER_EVENTS = metrics.counter('swipe_llm_router_events_total',
+                                    'Hedges, failovers, errors, 429s and missed deadlines by endpoint',
+                                    ('endpoint', 'event'))
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """No route answered before the endpoint's deadline"""
+
+
+class Route(NamedTuple):
+    name: str
+    client: AsyncLLMClient
+    model: Optional[str] = None
+
+
+class RoutePolicy(NamedTuple):
+    routes: Tuple[Route, ...]
+    deadline: float
+    hedge: bool = True
+
+
+class LatencyTracker:
+    """Recent successful latencies for one endpoint on one route"""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percentile: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < max(1, min_samples):
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+
+def endpoint_of(prompt: PromptInput) -> str:
+    return prompt.name if isinstance(prompt, Prompt) else 'other'
+
+
+class LLMRouter:
+    """Per-endpoint routing with hedging, failover and deadlines"""
+
+    def __init__(self, routes: Sequence[Route], policies: Optional[Dict[str, RoutePolicy]] = None,
+                 deadline: float = 20.0, hedge: bool = True, hedge_percentile: float = 95,
+                 hedge_min_delay: float = 0.3, hedge_initial_delay: Optional[float] = 2.0,
+                 min_samples: int = 20, hedge_initial_delays: Optional[Dict[str, Optional[float]]] = None,
+                 scheduler: Optional[RateLimitScheduler] = None, rate_limit_cooldown: float = 5.0):
+        if not routes:
+            raise ValueError('LLMRouter needs at least one route')
+        self.routes = list(routes)
+        self.default_policy = RoutePolicy(tuple(self.routes), deadline, hedge)
+        self.policies = policies or {}
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        # Used until an endpoint has min_samples latencies on a route; None means no hedging until then
+        self.hedge_initial_delay = hedge_initial_delay
+        self.hedge_initial_delays = hedge_initial_delays or {}
+        self.min_samples = min_samples
+        # Charged for every hedge and failover; None when calls are not rate limited
+        self.scheduler = scheduler
+        # How long a route that returned 429 without Retry-After is skipped
+        self.rate_limit_cooldown = rate_limit_cooldown
+        # Attempts are coordinated on the primary client's event loop
+        self._loop_client = self.routes[0].client
+        self._latency: Dict[Tuple[str, str], LatencyTracker] = {}
+        self._cooldown: Dict[str, float] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> Optional[str]:
+        return self.routes[0].model or self.routes[0].client.model
+
+    def policy_for(self, prompt: PromptInput) -> RoutePolicy:
+        return self.policies.get(endpoint_of(prompt), self.default_policy)
+
+    def model_for(self, prompt: PromptInput) -> str:
+        """Model the endpoint's primary route uses (part of response cache keys)"""
+        route = self.policy_for(prompt).routes[0]
+        return route.model or route.client.model
+
+    @staticmethod
+    def _route_model(route: Route) -> str:
+        return route.model or route.client.model
+
+    def _tracker(self, endpoint: str, route: Route) -> LatencyTracker:
+        # Per endpoint: a 100-token score and a 2000-token question batch have very different latencies
+        with self._lock:
+            return self._latency.setdefault((endpoint, route.name), LatencyTracker())
+
+    def hedge_delay(self, endpoint: str, route: Route) -> Optional[float]:
+        p = self._tracker(endpoint, route).percentile(self.hedge_percentile, self.min_samples)
+        if p is None:
+            return self.hedge_initial_delays.get(endpoint, self.hedge_initial_delay)
+        return max(self.hedge_min_delay, p)
+
+    def healthy(self, route: Route) -> bool:
+        """False while the route is cooling down after a 429"""
+        with self._lock:
+            return self._cooldown.get(route.name, 0.0) <= time.monotonic()
+
+    def _next_healthy(self, policy: RoutePolicy, start: int) -> Optional[int]:
+        for index in range(start, len(policy.routes)):
+            if self.healthy(policy.routes[index]):
+                return index
+        return None
+
+    def _rate_limited(self, endpoint: str, route: Route, error: BaseException) -> None:
+        """
+        Back off after a 429: pause the scheduler and skip the route until it recovers.
+        This is the only place a routed 429 pauses the scheduler; callers pass penalize=False.
+        """
+        delay = retry_after_seconds(error) or self.rate_limit_cooldown
+        with self._lock:
+            self._cooldown[route.name] = time.monotonic() + delay
+        if self.scheduler is not None:
+            self.scheduler.penalize(delay)
+        self._record(endpoint, 'rate_limited')
+
+    def _charge(self, prompt: PromptInput, max_tokens: int) -> bool:
+        """Take budget for an optional extra request (a hedge) only if it is free right now"""
+        return self.scheduler is None or self.scheduler.try_acquire(prompt_tokens(prompt) + max_tokens)
+
+    async def _admit(self, prompt: PromptInput, max_tokens: int, priority: int, timeout: float) -> None:
+        """Wait for budget for a required extra request (a failover) without blocking the event loop"""
+        if self.scheduler is None:
+            return
+        acquire = functools.partial(self.scheduler.acquire, prompt_tokens(prompt) + max_tokens, priority,
+                                    max(0.0, timeout))
+        await asyncio.get_running_loop().run_in_executor(None, acquire)
+
+    def _record(self, endpoint: str, outcome: str, route: Optional[Route] = None,
+                seconds: Optional[float] = None) -> None:
+        with self._lock:
+            entry = self._stats.setdefault(endpoint, {'calls': 0, 'wins': {}, 'hedges': 0, 'hedge_wins': 0,
+                                                      'hedges_skipped': 0, 'failovers': 0, 'errors': 0,
+                                                      'rate_limited': 0, 'deadline_exceeded': 0,
+                                                      'latency_ms_total': 0.0})
+            if outcome == 'win':
+                entry['calls'] += 1
+                entry['wins'][route.name] = entry['wins'].get(route.name, 0) + 1
+                entry['latency_ms_total'] += seconds * 1000
+            elif outcome in ('hedge_wins', 'hedges', 'hedges_skipped', 'failovers', 'errors', 'rate_limited',
+                             'deadline_exceeded'):
+                entry[outcome] += 1
+        if outcome == 'win':
+            self._tracker(endpoint, route).add(seconds)
+            LLM_CALL_SECONDS.observe(seconds, endpoint, self._route_model(route))
+        else:
+            LLM_ROUTER_EVENTS.inc(endpoint, outcome)
+
+    def _record_tokens(self, endpoint: str, route: Route, prompt: PromptInput, completion_chars: int) -> None:
+        model = self._route_model(route)
+        LLM_TOKENS.inc(endpoint, model, 'prompt', amount=prompt_tokens(prompt))
+        # Same ~4 characters per token estimate as rate_limiter.estimate_tokens
+        LLM_TOKENS.inc(endpoint, model, 'completion', amount=max(1, completion_chars // 4))
+
+    async def _attempt(self, route: Route, prompt: PromptInput, max_tokens: int,
+                       admit_timeout: Optional[float] = None, priority: int = PRIORITY_DEFAULT) -> str:
+        if admit_timeout is not None:
+            await self._admit(prompt, max_tokens, priority, admit_timeout)
+        return await asyncio.wrap_future(route.client.submit(prompt, max_tokens, route.model))
+
+    async def acomplete(self, prompt: PromptInput, max_tokens: int = 500, priority: int = PRIORITY_DEFAULT) -> str:
+        """Run one completion through the endpoint's routes; the caller has already been admitted once"""
+        endpoint = endpoint_of(prompt)
+        policy = self.policy_for(prompt)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + policy.deadline
+        pending: Dict[asyncio.Future, Tuple[Route, float, bool]] = {}
+        next_route = 0
+        hedged = False
+        last_error: Optional[BaseException] = None
+
+        def launch(index: int, hedge: bool = False, admit: bool = False) -> None:
+            nonlocal next_route
+            route = policy.routes[index]
+            next_route = max(next_route, index + 1)
+            admit_timeout = deadline - loop.time() if admit else None
+            task = asyncio.ensure_future(self._attempt(route, prompt, max_tokens, admit_timeout, priority))
+            pending[task] = (route, loop.time(), hedge)
+
+        launch(self._next_healthy(policy, 0) or 0)
+        try:
+            while pending:
+                now = loop.time()
+                if now >= deadline:
+                    break
+                wake_at = deadline
+                hedge_at = None
+                if policy.hedge and not hedged and len(pending) == 1:
+                    route, route_started, _ = next(iter(pending.values()))
+                    delay = self.hedge_delay(endpoint, route)
+                    if delay is not None:
+                        hedge_at = route_started + delay
+                        wake_at = min(wake_at, hedge_at)
+                done, _ = await asyncio.wait(list(pending), timeout=max(0.0, wake_at - now),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if hedge_at is not None and loop.time() >= hedge_at:
+                        hedged = True
+                        # The next healthy route, or the same one again when it is the last
+                        target = self._next_healthy(policy, next_route)
+                        if target is None and self.healthy(policy.routes[-1]):
+                            target = len(policy.routes) - 1
+                        if target is not None and self._charge(prompt, max_tokens):
+                            self._record(endpoint, 'hedges')
+                            launch(target, hedge=True)
+                        else:
+                            self._record(endpoint, 'hedges_skipped')
+                    continue
+                for task in done:
+                    route, route_started, is_hedge = pending.pop(task)
+                    if task.exception() is None:
+                        self._record(endpoint, 'win', route, loop.time() - route_started)
+                        self._record_tokens(endpoint, route, prompt, len(task.result()))
+                        if is_hedge:
+                            self._record(endpoint, 'hedge_wins')
+                        logger.debug(f"[LLMRouter] {endpoint} answered by {route.name} "
+                                     f"in {(loop.time() - started) * 1000:.0f}ms")
+                        return task.result()
+                    last_error = task.exception()
+                    if is_rate_limit_error(last_error):
+                        self._rate_limited(endpoint, route, last_error)
+                    elif not isinstance(last_error, RateLimitError):
+                        self._record(endpoint, 'errors')
+                    logger.warning(f"[LLMRouter] {endpoint} failed on {route.name}: {last_error}")
+                if not pending:
+                    target = self._next_healthy(policy, next_route)
+                    if target is not None:
+                        self._record(endpoint, 'failovers')
+                        launch(target, admit=True)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if pending or last_error is None:
+            self._record(endpoint, 'deadline_exceeded')
+            raise LLMDeadlineExceeded(f'{endpoint}: no answer within {policy.deadline:.1f}s')
+        raise last_error
+
+    async def agather(self, requests: Sequence[PromptRequest],
+                      priority: int = PRIORITY_DEFAULT) -> List[Union[str, BaseException]]:
+        return await asyncio.gather(*(self.acomplete(prompt, max_tokens, priority) for prompt, max_tokens in requests),
+                                    return_exceptions=True)
+
+    def complete(self, prompt: PromptInput, max_tokens: int = 500, priority: int = PRIORITY_DEFAULT) -> str:
+        return self._loop_client.run(self.acomplete(prompt, max_tokens, priority))
+
+    def gather(self, requests: Sequence[PromptRequest],
+               priority: int = PRIORITY_DEFAULT) -> List[Union[str, BaseException]]:
+        return self._loop_client.run(self.agather(list(requests), priority))
+
+    def stream(self, prompt: PromptInput, max_tokens: int = 500, priority: int = PRIORITY_DEFAULT) -> Iterator[str]:
+        """Stream from the first route that starts answering; routes are not switched mid-stream"""
+        endpoint = endpoint_of(prompt)
+        policy = self.policy_for(prompt)
+        last_error: Optional[BaseException] = None
+        index = self._next_healthy(policy, 0) or 0
+        first = True
+        while index is not None:
+            route = policy.routes[index]
+            if not first:
+                self._record(endpoint, 'failovers')
+                if self.scheduler is not None:
+                    self.scheduler.acquire(prompt_tokens(prompt) + max_tokens, priority, policy.deadline)
+            first = False
+            started = time.monotonic()
+            yielded = 0
+            try:
+                for delta in route.client.stream(prompt, max_tokens, route.model):
+                    yielded += len(delta) or 1
+                    yield delta
+            except Exception as e:
+                if yielded:
+                    self._record(endpoint, 'errors')
+                    raise
+                if is_rate_limit_error(e):
+                    self._rate_limited(endpoint, route, e)
+                else:
+                    self._record(endpoint, 'errors')
+                last_error = e
+                logger.warning(f"[LLMRouter] {endpoint} stream failed on {route.name}: {e}")
+                index = self._next_healthy(policy, index + 1)
+                continue
+            self._record(endpoint, 'win', route, time.monotonic() - started)
+            self._record_tokens(endpoint, route, prompt, yielded)
+            return
+        raise last_error
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = {
+                endpoint: dict({k: v for k, v in entry.items() if k != 'latency_ms_total'},
+                               wins=dict(entry['wins']),
+                               latency_ms_avg=round(entry['latency_ms_total'] / entry['calls'], 1) if entry['calls'] else None)
+                for endpoint, entry in self._stats.items()
+            }
+            keys = list(self._latency)
+        for endpoint, name in keys:
+            tracker = self._latency[(endpoint, name)]
+            p50, p95 = tracker.percentile(50), tracker.percentile(95)
+            entry = endpoints.setdefault(endpoint, {}).setdefault('latency', {})
+            entry[name] = {'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+                           'p95_ms': round(p95 * 1000, 1) if p95 is not None else None}
+        return {'endpoints': endpoints}
+
+    def close(self, drain_timeout: float = 0.0) -> None:
+        # The primary client's loop runs the routing tasks, so draining it first lets hedges and failovers finish
+        closed = set()
+        for route in self.routes:
+            if id(route.client) not in closed:
+                closed.add(id(route.client))
+                route.client.close(drain_timeout)
+
+
+class StubLLMClient(AsyncLLMClient):
+    """
+    Local deterministic stand-in for a provider: answers every known prompt
+    type with schema-valid JSON derived from a hash of the prompt, after an
+    optional artificial latency. Used by tests and with LLM_PROVIDER=stub.
+    """
+
+    def __init__(self, latency: float = 0.0, fail: bool = False, **kwargs):
+        kwargs.setdefault('model', 'stub')
+        super().__init__(api_key=None, **kwargs)
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+
+    def respond(self, prompt: PromptInput) -> str:
+        endpoint = endpoint_of(prompt)
+        user = prompt.user if isinstance(prompt, Prompt) else prompt
+        seed = int(hashlib.blake2b(user.encode('utf-8'), digest_size=4).hexdigest(), 16)
+        if endpoint == 'question':
+            return json.dumps({'question': f'Stub question {seed % 1000}: explain a core concept of this role.',
+                               'difficulty': 'medium'})
+        if endpoint == 'ideal_answer':
+            return json.dumps({'ideal': 'A stub ideal answer covering the key concepts with a practical example.'})
+        if endpoint == 'question_batch':
+            return json.dumps({'questions': [{'question': f'Stub question {i + 1} ({seed % 1000})',
+                                              'ideal_answer': 'A stub ideal answer.'} for i in range(6)]})
+        if endpoint == 'score':
+            return json.dumps({'score': 1 + seed % 10, 'reason': 'Stub score'})
+        if endpoint in ('score_batch', 'evaluation'):
+            count = len(re.findall(r'^(?:---\n)?(?:Answer|Question) \d+', user, re.MULTILINE)) or 1
+            items = [{'score': 1 + (seed + i) % 10, 'reason': 'Stub score'} for i in range(count)]
+            return json.dumps({'scores' if endpoint == 'score_batch' else 'evaluations': items})
+        if endpoint == 'summary':
+            match = re.search(r'Average Score: ([\d.]+)', user)
+            return json.dumps({'final_score': float(match.group(1)) if match else 5.0,
+                               'summary': 'Stub summary of the interview performance.'})
+        if endpoint == 'repair':
+            return user.rsplit('Output to fix:\n', 1)[-1]
+        return 'stub response'
+
+    async def _request(self, prompt, max_tokens, model=None):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError(f'{self.model} unavailable')
+        return self.respond(prompt)
+
+    async def _request_stream(self, prompt, max_tokens, model=None):
+        text = await self._request(prompt, max_tokens, model)
+        for start in range(0, len(text), 16):
+            yield text[start:start + 16]
+
+
+def _env_float(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value not in (None, '') else default
+
+
+ENDPOINTS = ('question', 'ideal_answer', 'question_batch', 'score', 'score_batch', 'evaluation', 'summary', 'repair')
+
+
+def create_router_from_env(routes: Sequence[Route], scheduler: Optional[RateLimitScheduler] = None) -> LLMRouter:
+    """
+    Build a router from LLM_* settings:
+    LLM_DEADLINE, LLM_HEDGE, LLM_HEDGE_PERCENTILE, LLM_HEDGE_MIN_DELAY,
+    LLM_HEDGE_INITIAL_DELAY, LLM_RATE_LIMIT_COOLDOWN, and per endpoint
+    LLM_DEADLINE_<ENDPOINT>, LLM_MODEL_<ENDPOINT> (model for the primary route),
+    LLM_HEDGE_<ENDPOINT> and LLM_HEDGE_INITIAL_DELAY_<ENDPOINT>.
+    """
+    def flag(name: str, default: bool) -> bool:
+        value = os.getenv(name)
+        return default if value in (None, '') else value.lower() in ('1', 'true', 'yes')
+
+    deadline = _env_float('LLM_DEADLINE', 20.0)
+    hedge = flag('LLM_HEDGE', True)
+    policies = {}
+    initial_delays = {}
+    for endpoint in ENDPOINTS:
+        suffix = endpoint.upper()
+        if os.getenv(f'LLM_HEDGE_INITIAL_DELAY_{suffix}') not in (None, ''):
+            initial_delays[endpoint] = _env_float(f'LLM_HEDGE_INITIAL_DELAY_{suffix}', None)
+        model = os.getenv(f'LLM_MODEL_{suffix}')
+        endpoint_deadline = _env_float(f'LLM_DEADLINE_{suffix}', deadline)
+        endpoint_hedge = flag(f'LLM_HEDGE_{suffix}', hedge)
+        if model or endpoint_deadline != deadline or endpoint_hedge != hedge:
+            primary = routes[0]
+            if model:
+                primary = Route(f'{primary.name}:{model}', primary.client, model)
+            policies[endpoint] = RoutePolicy((primary, *routes[1:]), endpoint_deadline, endpoint_hedge)
+    return LLMRouter(
+        routes,
+        policies,
+        deadline=deadline,
+        hedge=hedge,
+        hedge_percentile=_env_float('LLM_HEDGE_PERCENTILE', 95),
+        hedge_min_delay=_env_float('LLM_HEDGE_MIN_DELAY', 0.3),
+        hedge_initial_delay=_env_float('LLM_HEDGE_INITIAL_DELAY', 2.0),
+        hedge_initial_delays=initial_delays,
+        scheduler=scheduler,
+        rate_limit_cooldown=_env_float('LLM_RATE_LIMIT_COOLDOWN', 5.0),
+    )
@@ -0,0 +1,356 @@
+"""
+Prompt assembly for every LLM endpoint.
+
+Each prompt is split into two chat messages:
+- a system message with the static instructions, grading rubric, examples
+  and output format. These strings are built once at import time and are
+  byte-for-byte identical across requests, so provider-side prefix caching
+  can reuse them.
+- a user message with only the per-request content (job, questions,
+  answers), assembled with join() instead of repeated concatenation.
+
+PromptStats keeps per-endpoint input token estimates so the cost of each
+prompt can be watched in /api/stats, and clip() bounds user-supplied fields.
+"""
+import os
+import threading
+from typing import Any, Dict, List, NamedTuple, Union
+
+from rate_limiter import estimate_tokens
+
+# Longest candidate answer / job description sent to the model, in characters
+MAX_FIELD_CHARS = int(os.getenv('PROMPT_MAX_FIELD_CHARS', 6000))
+
+
+class Prompt(NamedTuple):
+    name: str
+    system: str
+    user: str
+
+    def messages(self) -> List[Dict[str, str]]:
+        return [{'role': 'system', 'content': self.system}, {'role': 'user', 'content': self.user}]
+
+
+PromptInput = Union[str, Prompt]
+
+
+def to_messages(prompt: PromptInput) -> List[Dict[str, str]]:
+    """Chat messages for a Prompt or a plain single-message prompt string"""
+    if isinstance(prompt, Prompt):
+        return prompt.messages()
+    return [{'role': 'user', 'content': prompt}]
+
+
+def prompt_tokens(prompt: PromptInput) -> int:
+    """Estimated input tokens for a prompt"""
+    if isinstance(prompt, Prompt):
+        return estimate_tokens(prompt.system) + estimate_tokens(prompt.user)
+    return estimate_tokens(prompt)
+
+
+def clip(text: Any, limit: int = MAX_FIELD_CHARS) -> str:
+    """Bound a user-supplied field so one oversized answer cannot blow up the prompt"""
+    text = '' if text is None else str(text)
+    return text if len(text) <= limit else text[:limit] + ' [truncated]'
+
+
+class PromptStats:
+    """Per-endpoint counts of prompts sent and their estimated input tokens"""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, prompt: PromptInput) -> None:
+        if isinstance(prompt, Prompt):
+            name, system, user = prompt.name, estimate_tokens(prompt.system), estimate_tokens(prompt.user)
+        else:
+            name, system, user = 'other', 0, estimate_tokens(prompt)
+        with self._lock:
+            entry = self._stats.setdefault(name, {'calls': 0, 'system_tokens': 0, 'user_tokens': 0,
+                                                  'max_prompt_tokens': 0})
+            entry['calls'] += 1
+            entry['system_tokens'] += system
+            entry['user_tokens'] += user
+            entry['max_prompt_tokens'] = max(entry['max_prompt_tokens'], system + user)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                name: dict(entry, avg_prompt_tokens=round((entry['system_tokens'] + entry['user_tokens']) / entry['calls']),
+                           system_share=round(entry['system_tokens'] / max(1, entry['system_tokens'] + entry['user_tokens']), 2))
+                for name, entry in self._stats.items()
+            }
+
+
+def _lines(*parts: str) -> str:
+    return '\n'.join(parts)
+
+
+# --- Question generation -----------------------------------------------------
+
+DIFFICULTY_GUIDELINES = _lines(
+    'DIFFICULTY GUIDELINES:',
+    '- EASY: Basic concepts, definitions, "what is" or "explain briefly"',
+    '- MEDIUM: Practical application, "how would you", comparisons, use cases',
+    '- HARD: System design, architecture, complex problem-solving, trade-offs',
+)
+
+QUESTION_BATCH_SYSTEM = _lines(
+    'You write technical interview questions for the position described by the user.',
+    '',
+    'Generate EXACTLY 6 questions with the following difficulties:',
+    '1. EASY question (20 seconds to answer)',
+    '2. EASY question (20 seconds to answer)',
+    '3. MEDIUM question (60 seconds to answer)',
+    '4. MEDIUM question (60 seconds to answer)',
+    '5. HARD question (120 seconds to answer)',
+    '6. HARD question (120 seconds to answer)',
+    '',
+    'For EACH question, also provide an ideal answer (40-200 words).',
+    '',
+    DIFFICULTY_GUIDELINES,
+    '',
+    'IMPORTANT: Questions must be specific to the given role, not generic programming questions.',
+    '',
+    'Output ONLY valid JSON in this EXACT format:',
+    '{',
+    '  "questions": [',
+    *['    {"question": "...", "ideal_answer": "..."},'] * 5,
+    '    {"question": "...", "ideal_answer": "..."}',
+    '  ]',
+    '}',
+)
+
+
+def build_batch_prompt(job_context: str, job_description: str, custom_questions=None) -> Prompt:
+    """Prompt that generates a full 6-question interview in one call"""
+    parts = [f'Position: {job_context}', f'Job Description: {clip(job_description)}']
+    if custom_questions:
+        parts.append('The hiring team listed these topics they care about; cover them where relevant:')
+        parts.extend(f'- {q}' for q in custom_questions)
+    return Prompt('question_batch', QUESTION_BATCH_SYSTEM, '\n'.join(parts))
+
+
+QUESTION_TIME_GUIDANCE = {
+    'easy': '20 seconds - should be answerable with basic knowledge',
+    'medium': '60 seconds - requires explanation and examples',
+    'hard': '120 seconds - needs detailed analysis and design thinking'
+}
+
+QUESTION_SYSTEM = _lines(
+    'You write ONE technical interview question for the position and difficulty given by the user.',
+    '',
+    'REQUIREMENTS:',
+    '- Must be answerable within the time limit',
+    '- Should test practical knowledge, not memorization',
+    '- Clear and unambiguous wording',
+    '',
+    DIFFICULTY_GUIDELINES,
+    '',
+    'EXAMPLES:',
+    'Easy: "What is the purpose of the virtual DOM in React?"',
+    'Medium: "How would you optimize performance in a React application with large lists?"',
+    'Hard: "Design a real-time collaborative editing system using React. Explain your architecture, '
+    'state management approach, and how you\'d handle conflicts."',
+    '',
+    'Generate a question that is:',
+    '1. Specific and focused',
+    '2. Answerable in the given time',
+    '3. Tests understanding, not just recall',
+    '4. Relevant to real-world work in the given role',
+    '',
+    'Output ONLY valid JSON: {"question":"<your question here>","difficulty":"<difficulty>"}',
+)
+
+
+def build_question_prompt(difficulty: str, job_context: str) -> Prompt:
+    """Prompt for a single question of the given difficulty"""
+    return Prompt('question', QUESTION_SYSTEM, '\n'.join((
+        f'Position: {job_context}',
+        f"Difficulty: {difficulty.upper()} ({QUESTION_TIME_GUIDANCE.get(difficulty, '')})",
+        f'Use "{difficulty}" as the difficulty value.',
+    )))
+
+
+IDEAL_SYSTEM = _lines(
+    'Provide a clear, concise ideal answer for the interview question given by the user.',
+    'The answer should be 40-200 words, technically accurate, and demonstrate best practices.',
+    'Output JSON: {"ideal":"..."}',
+)
+
+
+def build_ideal_prompt(question: str) -> Prompt:
+    """Prompt for the ideal answer to a question"""
+    return Prompt('ideal_answer', IDEAL_SYSTEM, f'Question: "{question}"')
+
+
+# --- Answer scoring ----------------------------------------------------------
+
+SCORE_CRITERIA = _lines(
+    'Score the candidate answer from 1-10 based on:',
+    '- Technical accuracy',
+    '- Completeness',
+    '- Understanding of concepts',
+    '- Practical application',
+)
+
+SCORE_SYSTEM = _lines(
+    'Compare the ideal answer and candidate answer for the question given by the user.',
+    '',
+    SCORE_CRITERIA,
+    '',
+    'Provide a JSON response: {"score": 7, "reason": "Brief explanation of the score"}',
+)
+
+SCORE_BATCH_SYSTEM = _lines(
+    'Compare the ideal answer and candidate answer for each question given by the user. '
+    'Each one is independent; score it on its own merits.',
+    '',
+    SCORE_CRITERIA,
+    '',
+    'Provide ONLY a JSON response with one score per answer, in the same order as the answers:',
+    '{"scores": [{"score": 7, "reason": "Brief explanation of the score"}, ...]}',
+)
+
+
+def _score_item(item: Dict[str, Any]) -> str:
+    return (f'Question: "{item["question"]}"\n\n'
+            f'Ideal Answer: "{item["ideal"]}"\n\n'
+            f'Candidate Answer: "{clip(item["candidate_answer"])}"')
+
+
+def build_score_prompt(question: str, ideal: str, candidate_answer: str) -> Prompt:
+    """Prompt that scores a single answer"""
+    return Prompt('score', SCORE_SYSTEM,
+                  _score_item({'question': question, 'ideal': ideal, 'candidate_answer': candidate_answer}))
+
+
+def build_score_batch_prompt(items: List[Dict[str, Any]]) -> Prompt:
+    """Prompt that scores several independent answers in one call"""
+    parts = [f'Score these {len(items)} answers and return exactly {len(items)} scores.']
+    for i, item in enumerate(items):
+        parts.append(f'---\nAnswer {i + 1}\n{_score_item(item)}')
+    parts.append('---')
+    return Prompt('score_batch', SCORE_BATCH_SYSTEM, '\n'.join(parts))
+
+
+# --- Interview evaluation ----------------------------------------------------
+
+EVALUATION_SYSTEM = _lines(
+    'You are a professional technical interviewer evaluating candidates for the position named by the user. '
+    'Your role is to grade answers with STRICT and FAIR judgment.',
+    '',
+    'GRADING CRITERIA:',
+    '1. **Correctness (40%)**: Is the answer technically accurate?',
+    '2. **Completeness (30%)**: Does it cover all key points?',
+    '3. **Depth (20%)**: Shows understanding beyond surface level?',
+    '4. **Clarity (10%)**: Is it well-articulated?',
+    '',
+    'GRADING RULES:',
+    '- Blank/empty answers = 0 points (NO EXCEPTIONS)',
+    '- Irrelevant or nonsensical answers = 0-1 points',
+    '- Partially correct but incomplete = 2-4 points',
+    '- Correct but lacks depth = 5-6 points',
+    '- Good answer with minor gaps = 7-8 points',
+    '- Excellent comprehensive answer = 9-10 points',
+    '- DO NOT give high scores for long answers without substance',
+    '- DO NOT be lenient - this is a professional evaluation',
+    '',
+    'EXAMPLES:',
+    'Example 1 - Easy Question: "What is React?"',
+    '- Candidate: "React is a JavaScript library for building user interfaces" → Score: 6/10 (Correct but too brief)',
+    '- Candidate: "React is a JavaScript library for building UIs, uses virtual DOM for efficient updates, '
+    'component-based architecture" → Score: 9/10 (Comprehensive)',
+    '- Candidate: "It\'s a framework for making websites" → Score: 3/10 (Partially correct, technically inaccurate)',
+    '',
+    'Example 2 - Medium Question: "Explain useEffect hook"',
+    '- Candidate: "useEffect is for side effects" → Score: 4/10 (Too vague)',
+    '- Candidate: "useEffect handles side effects like API calls, runs after render, cleanup with return function, '
+    'dependency array controls when it runs" → Score: 9/10 (Excellent)',
+    '- Candidate: "" → Score: 0/10 (Blank)',
+    '',
+    'Example 3 - Hard Question: "Design scalable state management"',
+    '- Candidate: "Use Redux" → Score: 2/10 (Oversimplified)',
+    '- Candidate: "Implement Redux Toolkit with normalized state, use RTK Query for server state, Context for local '
+    'UI state, proper selectors with memoization" → Score: 9/10 (Comprehensive design)',
+    '',
+    'Provide ONLY a valid JSON array with this exact format, one evaluation per question in order:',
+    '{"evaluations": [',
+    '    {"score": <number 0-10>, "reason": "<brief 10-15 word explanation>"},',
+    '    ...',
+    ']}',
+    '',
+    'Be STRICT. Most candidates should score 4-7. Only exceptional answers deserve 8-10.',
+)
+
+
+def build_evaluation_prompt(questions: List[Dict[str, Any]], job_title: str) -> Prompt:
+    """Prompt that grades all interview answers in one call"""
+    parts = [f'Position: {job_title}', 'NOW EVALUATE THESE ANSWERS:']
+    for i, q in enumerate(questions):
+        parts.append(
+            f"---\nQuestion {i + 1} (Difficulty: {q.get('difficulty', 'medium').upper()}):\n{q.get('question', '')}\n\n"
+            f"Expected Answer:\n{q.get('ideal_answer', '')}\n\n"
+            f"Candidate's Answer:\n{clip(q.get('candidate_answer', ''))}"
+        )
+    return Prompt('evaluation', EVALUATION_SYSTEM, '\n'.join(parts))
+
+
+# --- Final summary -----------------------------------------------------------
+
+SUMMARY_SYSTEM = _lines(
+    'You are a professional technical interviewer. Based on the interview performance given by the user, '
+    'provide a final assessment.',
+    '',
+    'IMPORTANT: Provide ONLY a valid JSON response with NO additional text before or after.',
+    '',
+    'Requirements:',
+    '1. Write a 2-3 sentence professional summary that:',
+    '   - Reflects the actual average score',
+    "   - Is honest about performance (don't be overly positive for low scores)",
+    '   - Mentions specific strengths if score >= 6',
+    '   - Mentions areas for improvement if score < 6',
+    '   - Is constructive and professional',
+    '',
+    '2. Output ONLY this JSON (no markdown, no code blocks, no extra text), '
+    'with final_score equal to the average score:',
+    '{"final_score": <average score>, "summary": "your summary here"}',
+)
+
+
+def build_summary_prompt(answers: List[Dict[str, Any]], candidate_name: str, job_title: str,
+                         final_score: float, performance_level: str) -> Prompt:
+    """Prompt for the final interview summary"""
+    parts = [
+        f'Candidate: {candidate_name}',
+        f'Job Position: {job_title}',
+        f'Average Score: {final_score:.1f}/10',
+        f'Performance Level: {performance_level}',
+        '',
+        'Interview Answers:',
+    ]
+    parts.extend(
+        f"Q{i + 1}: {ans.get('question', '')}\nAnswer: {clip(ans.get('candidate_answer', ''))}\nScore: {ans.get('score', 0)}/10\n"
+        for i, ans in enumerate(answers)
+    )
+    return Prompt('summary', SUMMARY_SYSTEM, '\n'.join(parts))
+
+
+# --- Output repair -----------------------------------------------------------
+
+REPAIR_SYSTEM = _lines(
+    'You fix malformed JSON produced by another model.',
+    'Return ONLY the corrected JSON matching the expected format given by the user: no markdown, no code blocks, '
+    'no extra text. Keep the original content; do not invent new values unless a required field is missing.',
+)
+
+
+def build_repair_prompt(output: str, example: str, error: str) -> Prompt:
+    """Prompt asking the model to fix one completion that failed to parse"""
+    return Prompt('repair', REPAIR_SYSTEM, '\n'.join((
+        f'Expected format: {example}',
+        f'Problem: {error}',
+        'Output to fix:',
+        clip(output),
+    )))
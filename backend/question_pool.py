@@ -0,0 +1,220 @@
+"""
+Per-job pools of pre-generated interview questions.
+
+Generating a batch of questions takes several seconds on Groq, so instead of
+generating on demand when a candidate starts an interview, batches are
+generated in the background as soon as a job is known (created, updated or
+first requested) and stored per difficulty. Interviews then draw a randomized
+set from the pool and the pool is refilled asynchronously when it runs low.
+
+Pool keys can come from client-supplied job text, so the store is bounded:
+at most max_jobs pools are kept (least recently used evicted first), pools
+unused for ttl_seconds are dropped, and at most max_pending_refills refills
+are queued or running at once; other pools wait for their next draw.
+"""
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+# Signature: (job_context, job_description, custom_questions) -> list of
+# {"question", "ideal_answer", "difficulty"} dicts
+BatchGenerator = Callable[[str, str, List[str]], List[Dict[str, Any]]]
+
+
+def job_fingerprint(job_context: str, job_description: str, custom_questions: Optional[List[str]] = None) -> str:
+    """Hash of the job fields that influence generated questions"""
+    payload = json.dumps([job_context or '', job_description or '', list(custom_questions or [])], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class _JobPool:
+    def __init__(self, fingerprint: str, job_context: str, job_description: str, custom_questions: List[str]):
+        self.fingerprint = fingerprint
+        self.job_context = job_context
+        self.job_description = job_description
+        self.custom_questions = custom_questions
+        self.items: Dict[str, List[Dict[str, Any]]] = {d: [] for d in DIFFICULTIES}
+        self.refilling = False
+        self.last_used = time.monotonic()
+
+
+class QuestionPool:
+    """Thread-safe store of pre-generated questions, refilled by background workers"""
+
+    def __init__(self, generate_batch: BatchGenerator, target_per_difficulty: int = 12,
+                 low_watermark: int = 4, max_workers: int = 2, max_batches_per_refill: int = 6,
+                 max_jobs: int = 200, ttl_seconds: float = 24 * 3600, max_pending_refills: int = 8):
+        self.generate_batch = generate_batch
+        self.target_per_difficulty = target_per_difficulty
+        self.low_watermark = low_watermark
+        self.max_batches_per_refill = max_batches_per_refill
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self.max_pending_refills = max_pending_refills
+        # Least recently used first
+        self._pools: 'OrderedDict[str, _JobPool]' = OrderedDict()
+        self._refills = 0
+        self.evicted = 0
+        self.refills_deferred = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='question-pool')
+        self.served = 0
+        self.exhausted = 0
+        self._closed = False
+
+    def warm(self, key: str, job_context: str, job_description: str = '',
+             custom_questions: Optional[List[str]] = None, replace: bool = True) -> None:
+        """
+        Register a job and schedule background generation if its pool is missing, stale or low.
+        With replace=False an existing pool is kept even if the job fields differ.
+        """
+        custom_questions = list(custom_questions or [])
+        fingerprint = job_fingerprint(job_context, job_description, custom_questions)
+        with self._lock:
+            pool = self._get(key)
+            if pool is None or (replace and pool.fingerprint != fingerprint):
+                # New job, or the job changed: previously generated questions no longer apply
+                pool = _JobPool(fingerprint, job_context, job_description, custom_questions)
+                self._pools[key] = pool
+                self._pools.move_to_end(key)
+                self._evict()
+        self._schedule_refill(key)
+
+    def _get(self, key: str) -> Optional[_JobPool]:
+        """Live pool for key, marked as recently used; expired pools are dropped. Caller holds the lock"""
+        pool = self._pools.get(key)
+        if pool is None:
+            return None
+        now = time.monotonic()
+        if now - pool.last_used > self.ttl_seconds:
+            del self._pools[key]
+            self.evicted += 1
+            return None
+        pool.last_used = now
+        self._pools.move_to_end(key)
+        return pool
+
+    def _evict(self) -> None:
+        """Drop expired pools, then the least recently used ones beyond max_jobs. Caller holds the lock"""
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._pools:
+            key, pool = next(iter(self._pools.items()))
+            if len(self._pools) <= self.max_jobs and pool.last_used >= cutoff:
+                break
+            # A running refill notices the pool is gone and stops
+            del self._pools[key]
+            self.evicted += 1
+
+    def matches(self, key: str, fingerprint: str) -> bool:
+        """True when a live pool for key was generated from the job fields with this fingerprint"""
+        with self._lock:
+            pool = self._pools.get(key)
+            return pool is not None and pool.fingerprint == fingerprint
+
+    def draw(self, key: str, difficulties: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Take a randomized question set matching the requested difficulties.
+        Returns None when the pool cannot satisfy the request yet.
+        """
+        needed: Dict[str, int] = {}
+        for difficulty in difficulties:
+            needed[difficulty] = needed.get(difficulty, 0) + 1
+
+        with self._lock:
+            pool = self._get(key)
+            if pool is None:
+                return None
+            if any(len(pool.items.get(d, [])) < n for d, n in needed.items()):
+                self.exhausted += 1
+                selection = None
+            else:
+                picked: Dict[str, List[Dict[str, Any]]] = {}
+                for difficulty, n in needed.items():
+                    bucket = pool.items[difficulty]
+                    random.shuffle(bucket)
+                    picked[difficulty] = [bucket.pop() for _ in range(n)]
+                selection = [picked[d].pop() for d in difficulties]
+                self.served += 1
+
+        self._schedule_refill(key)
+        return selection
+
+    def _needs_refill(self, pool: _JobPool) -> bool:
+        return any(len(pool.items[d]) < self.low_watermark for d in DIFFICULTIES)
+
+    def _schedule_refill(self, key: str) -> None:
+        if self._closed:
+            return
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None or pool.refilling or not self._needs_refill(pool):
+                return
+            if self._refills >= self.max_pending_refills:
+                # Every refill is up to max_batches_per_refill LLM calls; retry on the next draw or warm-up
+                self.refills_deferred += 1
+                return
+            pool.refilling = True
+            self._refills += 1
+        self._executor.submit(self._refill, key, pool)
+
+    def _refill(self, key: str, pool: _JobPool) -> None:
+        failed = False
+        try:
+            for _ in range(self.max_batches_per_refill):
+                with self._lock:
+                    if self._pools.get(key) is not pool:
+                        return  # job was replaced while we were working
+                    if all(len(pool.items[d]) >= self.target_per_difficulty for d in DIFFICULTIES):
+                        return
+                try:
+                    batch = self.generate_batch(pool.job_context, pool.job_description, pool.custom_questions)
+                except Exception as e:
+                    logger.error(f"[QuestionPool] Batch generation failed for {key}: {e}")
+                    failed = True
+                    return
+                with self._lock:
+                    if self._pools.get(key) is not pool:
+                        return
+                    for item in batch:
+                        bucket = pool.items.get(item.get('difficulty'))
+                        if bucket is not None and len(bucket) < self.target_per_difficulty:
+                            bucket.append(item)
+                logger.info(f"[QuestionPool] Added batch for {key}: " + ', '.join(
+                    f"{d}={len(pool.items[d])}" for d in DIFFICULTIES))
+        finally:
+            with self._lock:
+                pool.refilling = False
+                self._refills -= 1
+            # Draws that raced with the end of this refill skipped scheduling; catch up now.
+            # After a failure, wait for the next draw or warm-up instead of retrying in a loop.
+            if not failed:
+                self._schedule_refill(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'jobs': len(self._pools),
+                'served': self.served,
+                'exhausted': self.exhausted,
+                'evicted': self.evicted,
+                'refills_running': self._refills,
+                'refills_deferred': self.refills_deferred,
+                'available': {
+                    key: {d: len(pool.items[d]) for d in DIFFICULTIES}
+                    for key, pool in self._pools.items()
+                },
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._closed = True
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,271 @@
+"""
+Client-side rate limiting and prioritization for Groq calls.
+
+Groq enforces requests-per-minute and tokens-per-minute limits and answers
+with HTTP 429 once they are exceeded. RateLimitScheduler keeps us under
+those limits with two token buckets, admits waiting callers in priority
+order (live interview grading before question-pool warm-up), bounds the
+wait queue, gives every caller a deadline, and retries 429s with jittered
+exponential backoff.
+"""
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Priority classes: lower values are admitted first
+PRIORITY_INTERACTIVE = 0   # a candidate is waiting on the result (grading, summaries)
+PRIORITY_DEFAULT = 1       # on-demand question generation
+PRIORITY_BACKGROUND = 2    # question-pool warm-up and other prefetching
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: 'interactive',
+    PRIORITY_DEFAULT: 'default',
+    PRIORITY_BACKGROUND: 'background',
+}
+
+DEFAULT_TIMEOUTS = {
+    PRIORITY_INTERACTIVE: 30.0,
+    PRIORITY_DEFAULT: 30.0,
+    PRIORITY_BACKGROUND: 300.0,
+}
+
+
+LLM_QUEUE_DEPTH = metrics.gauge('swipe_llm_queue_depth', 'Callers waiting for an LLM slot by priority', ('priority',))
+LLM_QUEUE_WAIT_SECONDS = metrics.histogram('swipe_llm_queue_wait_seconds', 'Time admitted LLM calls waited for a slot',
+                                           ('priority',))
+LLM_SCHEDULER_EVENTS = metrics.counter('swipe_llm_scheduler_events_total',
+                                       'Rejected and timed-out callers, 429 retries and 429 backoffs',
+                                       ('event',))
+
+
+class RateLimitError(Exception):
+    """Base class for calls rejected by the local scheduler"""
+
+
+class QueueFullError(RateLimitError):
+    """Too many callers are already waiting"""
+
+
+class DeadlineExceededError(RateLimitError):
+    """The caller's deadline passed before it could be admitted"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)"""
+    return max(1, len(text) // 4)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True for provider 429 responses"""
+    return getattr(error, 'status_code', None) == 429
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Read the Retry-After header from a provider error, if present"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Classic token bucket; a capacity of 0 disables the limit"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (0 if available now)"""
+        if self.capacity <= 0:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        if self.capacity <= 0:
+            return
+        self._refill(now)
+        self.available -= min(amount, self.capacity)
+
+
+class RateLimitScheduler:
+    """Admit LLM calls under RPM/TPM limits, highest priority first"""
+
+    def __init__(self, requests_per_minute: float = 30, tokens_per_minute: float = 0,
+                 max_queue: int = 100, max_retries: int = 3, backoff_base: float = 0.5,
+                 backoff_max: float = 20.0, timeouts: Optional[Dict[int, float]] = None):
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self._cond = threading.Condition()
+        self._waiters: list = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        # Metrics
+        self.admitted = 0
+        self.rejected = 0
+        self.deadline_exceeded = 0
+        self.retries = 0
+        self.throttled = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def acquire(self, tokens: int = 0, priority: int = PRIORITY_DEFAULT,
+                timeout: Optional[float] = None, requests: int = 1) -> float:
+        """
+        Block until `requests` calls using `tokens` tokens may be sent.
+        Returns the time spent waiting; raises QueueFullError or DeadlineExceededError.
+        """
+        if timeout is None:
+            timeout = self.timeouts.get(priority, DEFAULT_TIMEOUTS[PRIORITY_DEFAULT])
+        enqueued = time.monotonic()
+        deadline = enqueued + timeout
+        priority_name = PRIORITY_NAMES.get(priority, str(priority))
+        with self._cond:
+            if len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                LLM_SCHEDULER_EVENTS.inc('rejected')
+                raise QueueFullError(f'LLM queue is full ({self.max_queue} waiting)')
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            LLM_QUEUE_DEPTH.inc(priority_name)
+            # A new head may have arrived: let the current head re-check
+            self._cond.notify_all()
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    if self._waiters[0] == entry:
+                        wait = max(
+                            self._requests.time_until(requests, now),
+                            self._tokens.time_until(tokens, now),
+                            self._paused_until - now,
+                        )
+                        if wait <= 0:
+                            self._requests.take(requests, now)
+                            self._tokens.take(tokens, now)
+                            break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self.deadline_exceeded += 1
+                        LLM_SCHEDULER_EVENTS.inc('deadline_exceeded')
+                        raise DeadlineExceededError(f'Waited {timeout:.1f}s for an LLM slot ({priority_name})')
+                    self._cond.wait(remaining if wait is None else min(wait, remaining))
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                LLM_QUEUE_DEPTH.inc(priority_name, amount=-1)
+                self._cond.notify_all()
+
+            waited = time.monotonic() - enqueued
+            LLM_QUEUE_WAIT_SECONDS.observe(waited, priority_name)
+            self.admitted += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            return waited
+
+    def try_acquire(self, tokens: int = 0, requests: int = 1) -> bool:
+        """Take budget only if it is free right now and nobody is waiting (optional extra calls, e.g. hedges)"""
+        with self._cond:
+            now = time.monotonic()
+            if (self._waiters or self._paused_until > now or self._requests.time_until(requests, now) > 0
+                    or self._tokens.time_until(tokens, now) > 0):
+                return False
+            self._requests.take(requests, now)
+            self._tokens.take(tokens, now)
+            self.admitted += 1
+            return True
+
+    def penalize(self, seconds: float) -> None:
+        """Stop admitting calls for `seconds`, e.g. after the provider returned 429"""
+        LLM_SCHEDULER_EVENTS.inc('throttled')
+        with self._cond:
+            self.throttled += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def paused_for(self) -> float:
+        """Seconds left on the current penalize() pause"""
+        with self._cond:
+            return max(0.0, self._paused_until - time.monotonic())
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def call(self, fn: Callable[[], Any], tokens: int = 0, priority: int = PRIORITY_DEFAULT,
+             timeout: Optional[float] = None, penalize: bool = True) -> Any:
+        """
+        Run fn() once admitted, retrying provider 429s until the deadline.
+        A 429 pauses admission for its Retry-After (or a jittered backoff) unless penalize=False,
+        for fn that already paused this scheduler itself (LLMRouter does).
+        """
+        if timeout is None:
+            timeout = self.timeouts.get(priority, DEFAULT_TIMEOUTS[PRIORITY_DEFAULT])
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while True:
+            self.acquire(tokens, priority, timeout=max(0.0, deadline - time.monotonic()))
+            try:
+                return fn()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt >= self.max_retries:
+                    raise
+                delay = retry_after_seconds(e) or self.backoff(attempt)
+                if penalize:
+                    self.penalize(delay)
+                # The retry is admitted only once the pause is over; give up now if that is past the deadline
+                if time.monotonic() + max(delay, self.paused_for()) >= deadline:
+                    raise
+                self.retries += 1
+                LLM_SCHEDULER_EVENTS.inc('retries')
+                attempt += 1
+                logger.warning(f"[RateLimit] Groq returned 429, retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _ in self._waiters:
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                depth[name] = depth.get(name, 0) + 1
+            return {
+                'queue_depth': len(self._waiters),
+                'queue_depth_by_priority': depth,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'deadline_exceeded': self.deadline_exceeded,
+                'retries': self.retries,
+                'throttled': self.throttled,
+                'wait_seconds_avg': round(self.wait_seconds_total / self.admitted, 4) if self.admitted else 0.0,
+                'wait_seconds_max': round(self.wait_seconds_max, 4),
+                'requests_per_minute': self._requests.capacity,
+                'tokens_per_minute': self._tokens.capacity,
+            }
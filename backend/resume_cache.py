@@ -0,0 +1,106 @@
+"""
+Content-addressed cache for parsed resumes.
+
+Candidates often upload the same file several times (retries, refreshes,
+applying to more than one job). Results are keyed on a BLAKE2b digest of the
+file bytes, computed while the upload is spooled, so a repeat upload skips
+PDF/DOCX extraction entirely. A size-bounded in-memory LRU is always used;
+an SQLite tier can be added to share entries between workers and restarts.
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from llm_cache import MemoryCache, ResponseCache, SQLiteCache
+from resume_parser import MAX_CHARS
+
+logger = logging.getLogger(__name__)
+
+
+def new_hasher():
+    """Hasher for resume file bytes"""
+    return hashlib.blake2b(digest_size=32)
+
+
+def file_digest(path: str, chunk_size: int = 64 * 1024) -> str:
+    """BLAKE2b digest of a file on disk"""
+    hasher = new_hasher()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class ResumeCache:
+    """Memory LRU in front of an optional on-disk tier, mapping file digests to (text, extracted_info)"""
+
+    def __init__(self, memory: MemoryCache, disk: Optional[ResponseCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    @staticmethod
+    def _key(digest: str, fields_only: bool) -> str:
+        # MAX_CHARS is part of the key so changing the cap does not serve stale truncations
+        return f"{digest}:{'fields' if fields_only else 'full'}:{MAX_CHARS}"
+
+    def _lookup(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def get(self, digest: str, fields_only: bool = False) -> Optional[Tuple[str, dict]]:
+        """Return a cached parse; a full parse also satisfies a fields_only request"""
+        keys = [self._key(digest, False)]
+        if fields_only:
+            keys.append(self._key(digest, True))
+        for key in keys:
+            value = self._lookup(key)
+            if value is not None:
+                entry = json.loads(value)
+                return entry['text'], entry['extracted_info']
+        return None
+
+    def set(self, digest: str, text: str, extracted_info: dict, fields_only: bool = False) -> None:
+        value = json.dumps({'text': text, 'extracted_info': extracted_info}, ensure_ascii=False)
+        key = self._key(digest, fields_only)
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except Exception as e:
+                logger.error(f"Failed to write resume cache entry to disk: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {'memory': self.memory.stats()}
+        if self.disk is not None:
+            stats['disk'] = self.disk.stats()
+        return stats
+
+    def __bool__(self) -> bool:
+        return True
+
+
+def create_resume_cache_from_env() -> Optional[ResumeCache]:
+    """Build the resume cache from RESUME_CACHE_* settings, or None when disabled"""
+    backend = os.getenv('RESUME_CACHE_BACKEND', 'memory').lower()
+    ttl_seconds = float(os.getenv('RESUME_CACHE_TTL', 7 * 24 * 3600))
+    max_entries = int(os.getenv('RESUME_CACHE_MAX_ENTRIES', 256))
+
+    if backend in ('', 'none', 'off'):
+        return None
+    memory = MemoryCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+    disk = None
+    if backend == 'sqlite':
+        path = os.getenv('RESUME_CACHE_PATH', os.path.join(os.path.dirname(__file__), '.cache', 'resume_cache.sqlite3'))
+        try:
+            disk = SQLiteCache(path, ttl_seconds=ttl_seconds,
+                               max_entries=int(os.getenv('RESUME_CACHE_DISK_MAX_ENTRIES', 10000)),
+                               table='resume_cache')
+        except Exception as e:
+            logger.error(f"Failed to open SQLite resume cache at {path}, using memory only: {e}")
+    return ResumeCache(memory, disk)
@@ -0,0 +1,183 @@
+"""
+Bounded-memory resume text extraction.
+
+Uploads are spooled to a temporary file in fixed-size chunks instead of being
+held in memory, and PDF/DOCX text is produced page by page (or paragraph by
+paragraph) through generators. Callers join the chunks once, stop early when
+they have what they need, and are protected by page and character caps.
+
+PyPDF2 and python-docx are imported on first use, so importing this module
+(and the app) does not pay for them until a resume is actually parsed.
+"""
+import logging
+import os
+import tempfile
+from typing import IO, Iterable, Iterator, Tuple
+
+from contact_extractor import ContactScanner, extract_contact_info
+
+logger = logging.getLogger(__name__)
+
+MAX_FILE_BYTES = 10 * 1024 * 1024  # 10MB
+MAX_PAGES = int(os.getenv('RESUME_MAX_PAGES', 50))
+MAX_CHARS = int(os.getenv('RESUME_MAX_CHARS', 200000))
+SPOOL_CHUNK_BYTES = 64 * 1024
+
+ALLOWED_EXTENSIONS = {'.pdf', '.docx'}
+
+
+class FileTooLargeError(ValueError):
+    """The upload exceeded MAX_FILE_BYTES"""
+
+
+def spool_upload(stream: IO[bytes], max_bytes: int = MAX_FILE_BYTES, suffix: str = '', hasher=None) -> str:
+    """
+    Copy an upload stream to a temporary file in fixed-size chunks, enforcing the size
+    limit while copying. Returns the file path; the caller is responsible for deleting it.
+    If a hashlib object is given it is updated with every chunk.
+    """
+    fd, path = tempfile.mkstemp(prefix='resume-', suffix=suffix)
+    size = 0
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = stream.read(SPOOL_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise FileTooLargeError(f'File exceeds {max_bytes} bytes')
+                if hasher is not None:
+                    hasher.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def iter_pdf_chunks(source, max_pages: int = MAX_PAGES) -> Iterator[str]:
+    """Yield the text of each PDF page, up to max_pages"""
+    import PyPDF2
+    pdf_reader = PyPDF2.PdfReader(source)
+    for index, page in enumerate(pdf_reader.pages):
+        if index >= max_pages:
+            logger.info(f"PDF has more than {max_pages} pages, ignoring the rest")
+            return
+        yield (page.extract_text() or '') + "\n"
+
+
+def iter_docx_chunks(source, max_paragraphs: int = MAX_PAGES * 100) -> Iterator[str]:
+    """Yield the text of each DOCX paragraph, up to max_paragraphs"""
+    from docx import Document
+    doc = Document(source)
+    for index, paragraph in enumerate(doc.paragraphs):
+        if index >= max_paragraphs:
+            logger.info(f"DOCX has more than {max_paragraphs} paragraphs, ignoring the rest")
+            return
+        yield paragraph.text + "\n"
+
+
+def iter_resume_chunks(source, file_ext: str) -> Iterator[str]:
+    """Yield text chunks for a PDF or DOCX file"""
+    if file_ext == '.pdf':
+        return iter_pdf_chunks(source)
+    if file_ext == '.docx':
+        return iter_docx_chunks(source)
+    raise ValueError(f'Unsupported file type: {file_ext}')
+
+
+def join_chunks(chunks: Iterable[str], max_chars: int = MAX_CHARS) -> Tuple[str, bool]:
+    """Join text chunks once, stopping at max_chars. Returns (text, truncated)"""
+    parts = []
+    total = 0
+    for chunk in chunks:
+        if total + len(chunk) > max_chars:
+            parts.append(chunk[:max_chars - total])
+            return ''.join(parts), True
+        parts.append(chunk)
+        total += len(chunk)
+    return ''.join(parts), False
+
+
+def extract_text_from_pdf(file, max_chars: int = MAX_CHARS) -> str:
+    """Extract text from PDF file"""
+    try:
+        return join_chunks(iter_pdf_chunks(file), max_chars)[0]
+    except Exception as e:
+        logger.error(f"Error extracting text from PDF: {e}")
+        raise e
+
+
+def extract_text_from_docx(file, max_chars: int = MAX_CHARS) -> str:
+    """Extract text from DOCX file"""
+    try:
+        return join_chunks(iter_docx_chunks(file), max_chars)[0]
+    except Exception as e:
+        logger.error(f"Error extracting text from DOCX: {e}")
+        raise e
+
+
+def extract_contact_info_early(chunks: Iterable[str], max_chars: int = MAX_CHARS) -> Tuple[str, dict]:
+    """
+    Read chunks only until name, email and phone have all been found.
+    Each chunk is scanned once, so the work is linear in the text read.
+    Returns the text read so far and the extracted fields.
+    """
+    parts = []
+    total = 0
+    scanner = ContactScanner()
+    for chunk in chunks:
+        chunk = chunk[:max_chars - total]
+        parts.append(chunk)
+        total += len(chunk)
+        try:
+            scanner.feed(chunk)
+        except Exception as e:
+            logger.error(f"Error extracting info from text: {e}")
+            break
+        if scanner.complete or total >= max_chars:
+            break
+    return ''.join(parts), scanner.info()
+
+
+def extract_info_from_text(text):
+    """Extract name, email, and phone from text, with a confidence score per field"""
+    try:
+        return extract_contact_info(text)
+    except Exception as e:
+        logger.error(f"Error extracting info from text: {e}")
+        return {
+            'name': None,
+            'email': None,
+            'phone': None
+        }
+
+
+def parse_resume_document(path: str, file_ext: str, fields_only: bool = False) -> Tuple[str, dict, int]:
+    """Extract (text, extracted_info, pages_read) from a spooled resume file; pages_read is 0 for DOCX"""
+    pages = 0
+
+    def counted(chunks: Iterable[str]) -> Iterator[str]:
+        nonlocal pages
+        for chunk in chunks:
+            pages += 1
+            yield chunk
+
+    with open(path, 'rb') as source:
+        chunks = iter_resume_chunks(source, file_ext)
+        if file_ext == '.pdf':
+            chunks = counted(chunks)
+        if fields_only:
+            text, info = extract_contact_info_early(chunks)
+            return text, info, pages
+        text, truncated = join_chunks(chunks)
+    if truncated:
+        logger.info(f"Resume text truncated to {MAX_CHARS} characters")
+    return text, extract_info_from_text(text), pages
+
+
+def parse_resume_file(path: str, file_ext: str, fields_only: bool = False) -> Tuple[str, dict]:
+    """Extract (text, extracted_info) from a spooled resume file"""
+    text, info, _ = parse_resume_document(path, file_ext, fields_only)
+    return text, info
@@ -0,0 +1,164 @@
+"""
+Process-pool offload for CPU-bound resume parsing.
+
+PyPDF2 extraction is pure Python and holds the GIL for its whole run, so
+parsing inside the request thread stalls every other request on the worker.
+ResumeParsePool runs resume_parser.parse_resume_document in worker processes with:
+- a per-task timeout; on timeout the workers are killed and the pool rebuilt,
+  so a pathological PDF cannot pin a CPU forever. Other parses lost with those
+  workers are retried once on the new pool instead of failing with it
+- worker recycling after a fixed number of tasks to cap memory growth
+- bounded admission: callers beyond max_pending get PoolBusyError right away,
+  unless they pass `wait` (bulk ingest) and a slot frees up in time
+"""
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+
+import metrics
+import tracing
+from resume_parser import parse_resume_document
+
+logger = logging.getLogger(__name__)
+
+RESUME_PARSE_SECONDS = metrics.histogram('swipe_resume_parse_seconds',
+                                         'Resume parse duration by file type and pages read',
+                                         ('file_type', 'pages'))
+
+
+def page_bucket(pages: int) -> str:
+    """Bounded label for a page count (DOCX has no pages and reports n/a)"""
+    if pages <= 0:
+        return 'n/a'
+    if pages <= 2:
+        return str(pages)
+    if pages <= 5:
+        return '3-5'
+    if pages <= 10:
+        return '6-10'
+    return '11+'
+
+
+class PoolBusyError(RuntimeError):
+    """Too many resumes are already queued for parsing"""
+
+
+class ParseTimeoutError(RuntimeError):
+    """Parsing one resume exceeded the task timeout"""
+
+
+class ResumeParsePool:
+    """Bounded process pool for parse_resume_document; max_workers=0 parses inline"""
+
+    def __init__(self, max_workers: int = 2, max_tasks_per_child: int = 50,
+                 task_timeout: float = 20.0, max_pending: int = 16):
+        self.max_workers = max_workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.task_timeout = task_timeout
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.retried = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Worker recycling is not supported with fork; spawn also avoids
+                # inheriting the parent's threads and sockets
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    max_tasks_per_child=self.max_tasks_per_child,
+                )
+            return self._executor
+
+    def _restart(self, executor: ProcessPoolExecutor) -> None:
+        """Kill the workers of a pool whose task hung and start fresh on next use"""
+        with self._lock:
+            if self._executor is not executor:
+                return  # another thread already restarted it
+            self._executor = None
+            self.restarts += 1
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def parse(self, path: str, file_ext: str, fields_only: bool = False,
+              wait: Optional[float] = 0) -> Tuple[str, dict]:
+        """
+        Parse a spooled resume file in a worker process, returning (text, extracted_info).
+        When the pool is full, wait up to `wait` seconds for a slot (None waits indefinitely).
+        """
+        if not (self._slots.acquire(timeout=wait) if wait != 0 else self._slots.acquire(blocking=False)):
+            self.rejected += 1
+            raise PoolBusyError(f'{self.max_pending} resumes already being parsed')
+        try:
+            started = time.perf_counter()
+            with tracing.span('resume.parse', file_type=file_ext, fields_only=fields_only) as span:
+                if self.max_workers <= 0:
+                    text, info, pages = parse_resume_document(path, file_ext, fields_only)
+                else:
+                    text, info, pages = self._run(path, file_ext, fields_only)
+                if span:
+                    span.set(pages=pages, chars=len(text))
+            RESUME_PARSE_SECONDS.observe(time.perf_counter() - started, file_ext.lstrip('.'), page_bucket(pages))
+            self.completed += 1
+            return text, info
+        finally:
+            self._slots.release()
+
+    def _run(self, path: str, file_ext: str, fields_only: bool) -> Tuple[str, dict, int]:
+        for attempt in range(2):
+            executor = self._get_executor()
+            try:
+                future = executor.submit(parse_resume_document, path, file_ext, fields_only)
+            except RuntimeError as e:
+                # Broken by a crashed worker, or shut down by a concurrent restart since _get_executor
+                if isinstance(e, BrokenProcessPool):
+                    self._restart(executor)
+                elif self._executor is executor:
+                    raise
+                if attempt:
+                    raise
+                continue
+            try:
+                return future.result(timeout=self.task_timeout)
+            except FutureTimeoutError:
+                self.timeouts += 1
+                logger.error(f"Resume parsing exceeded {self.task_timeout}s, restarting parser pool")
+                self._restart(executor)
+                raise ParseTimeoutError(f'Parsing took longer than {self.task_timeout}s')
+            except (CancelledError, BrokenProcessPool) as e:
+                # Cancelled or killed along with another resume that timed out, or the pool was
+                # already shut down for that reason; a no-op restart unless this pool broke by itself
+                self._restart(executor)
+                if attempt:
+                    raise
+                self.retried += 1
+                logger.warning(f"Parser pool was restarted under this resume ({e.__class__.__name__}), retrying once")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts,
+            'restarts': self.restarts,
+            'retried': self.retried,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,106 @@
+"""
+Micro-batching for answer scoring.
+
+Concurrent /api/score requests are collected for a short window (or until a
+size limit is reached) and graded together with a single multi-answer LLM
+call. Each waiting request then receives its own grade from the batch
+result. This trades a few milliseconds of added latency for far fewer Groq
+requests under load.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Signature: list of {"question", "ideal", "candidate_answer"} -> list of
+# {"score", "reason"} in the same order (shorter lists mark missing grades)
+BatchGrader = Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]
+
+
+class ScoreBatcher:
+    """Coalesce individual score requests into batched grading calls"""
+
+    def __init__(self, grade_batch: BatchGrader, max_batch_size: int = 16,
+                 max_wait_ms: float = 50, max_in_flight: int = 4):
+        self.grade_batch = grade_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='score-batch')
+        self._closed = False
+        self.batches = 0
+        self.items = 0
+        self._thread = threading.Thread(target=self._collect, name='score-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Dict[str, Any]) -> Future:
+        """Queue one answer for grading; the future resolves to {"score", "reason"}"""
+        if self._closed:
+            raise RuntimeError('ScoreBatcher is shut down')
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def score(self, item: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Grade one answer, blocking until its batch has been graded"""
+        return self.submit(item).result(timeout)
+
+    def _collect(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    self._queue.put(None)  # let the outer loop exit after this batch
+                    break
+                batch.append(entry)
+            self.batches += 1
+            self.items += len(batch)
+            # Grade on a separate thread so the next window starts collecting immediately
+            self._executor.submit(self._grade, batch)
+
+    def _grade(self, batch: List[tuple]) -> None:
+        items = [item for item, _ in batch]
+        try:
+            grades = self.grade_batch(items)
+        except Exception as e:
+            logger.error(f"[ScoreBatcher] Grading batch of {len(items)} failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for i, (_, future) in enumerate(batch):
+            if i < len(grades) and grades[i] is not None:
+                future.set_result(grades[i])
+            else:
+                future.set_exception(ValueError(f'No grade returned for item {i + 1} of {len(batch)}'))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+            'queued': self._queue.qsize(),
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._executor.shutdown(wait=wait)
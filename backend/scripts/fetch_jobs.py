@@ -1,7 +1,27 @@
+"""
+Export the jobs table page by page.
+
+Usage:
+    python backend/scripts/fetch_jobs.py                                  # compact listing
+    python backend/scripts/fetch_jobs.py --format ndjson -o jobs.ndjson
+    python backend/scripts/fetch_jobs.py --format csv -o jobs.csv --since 2024-06-01T00:00:00Z
+    python backend/scripts/fetch_jobs.py --format parquet -o jobs.parquet --state-file .jobs_export_state
+
+Rows are fetched with keyset pagination on (created_at, id) and written as
+each page arrives, so memory use does not grow with the size of the table.
+With --state-file the (created_at, id) of the last exported job is remembered
+and the next run resumes right after it with the same keyset, so jobs sharing
+that created_at are neither skipped nor exported twice. Paging relies on the
+idx_jobs_created_at_id index from database/schema.sql.
+"""
+import argparse
+import csv
+import json
 import os
 import sys
 import logging
-from typing import Any, Dict, List
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,6 +31,8 @@ except Exception as e:
     print("[Error] Failed to import supabase client. Did you run 'pip install -r backend/requirements.txt'?", file=sys.stderr)
     raise e
 
+COLUMNS = ["id", "title", "description", "custom_questions", "created_at", "updated_at"]
+
 
 def mask_token(token: str) -> str:
     if not token:
@@ -21,7 +43,8 @@ def mask_token(token: str) -> str:
 
 
 def setup_logger() -> logging.Logger:
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    # Logs go to stderr so exports written to stdout stay clean
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", stream=sys.stderr)
     return logging.getLogger("fetch_jobs")
 
 
@@ -42,7 +65,6 @@ def get_supabase_client(logger: logging.Logger) -> Client:
     )
 
     if not url or not key:
-        print(url, key)
         logger.error("SUPABASE_URL or SUPABASE_KEY missing in environment")
         raise RuntimeError("Missing SUPABASE_URL or SUPABASE_KEY")
 
@@ -55,46 +77,201 @@ def get_supabase_client(logger: logging.Logger) -> Client:
         raise e
 
 
-def fetch_all_jobs(client: Client, logger: logging.Logger) -> List[Dict[str, Any]]:
-    logger.info("[Query] Fetching jobs from 'jobs' table")
-    try:
-        resp = (
+def _quote(value: Any) -> str:
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def iter_job_pages(client: Client, logger: logging.Logger, page_size: int = 500,
+                   since: Optional[str] = None,
+                   after: Optional[Tuple[str, str]] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Yield pages of jobs ordered by (created_at, id), oldest first, starting after the `after` keyset"""
+    last: Optional[Dict[str, Any]] = {"created_at": after[0], "id": after[1]} if after else None
+    while True:
+        query = (
             client.table("jobs")
-            .select("*")
-            .order("created_at", desc=True)
-            .execute()
+            .select(",".join(COLUMNS))
+            .order("created_at")
+            .order("id")
+            .limit(page_size)
         )
-        data = getattr(resp, "data", []) or []
-        logger.info("[Query] Success", extra={"count": len(data)})
-        return data
-    except Exception:
-        logger.exception("[Query] Error while fetching jobs")
-        raise
+        if since:
+            query = query.gt("created_at", since)
+        if last is not None:
+            created_at, job_id = _quote(last["created_at"]), _quote(last["id"])
+            query = query.or_(f"created_at.gt.{created_at},and(created_at.eq.{created_at},id.gt.{job_id})")
+        try:
+            rows = getattr(query.execute(), "data", []) or []
+        except Exception:
+            logger.exception("[Query] Error while fetching jobs")
+            raise
+        if rows:
+            yield rows
+            last = rows[-1]
+        if len(rows) < page_size:
+            return
+
+
+def iter_jobs(client: Client, logger: logging.Logger, page_size: int = 500,
+              since: Optional[str] = None, after: Optional[Tuple[str, str]] = None) -> Iterator[Dict[str, Any]]:
+    """Yield jobs one at a time without holding more than one page in memory"""
+    for page in iter_job_pages(client, logger, page_size, since, after):
+        yield from page
+
+
+class TableWriter:
+    """Compact human-readable listing (the script's original output)"""
+
+    def __init__(self, out):
+        self.out = out
+        self.count = 0
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self.count += 1
+        self.out.write(f"{self.count}. id={row.get('id')}, title={row.get('title')}, created_at={row.get('created_at')}\n")
+
+    def close(self) -> None:
+        self.out.write(f"Total jobs: {self.count}\n" if self.count else "No jobs found.\n")
+
+
+class NDJSONWriter:
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self.out.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def close(self) -> None:
+        self.out.flush()
+
+
+class CSVWriter:
+    def __init__(self, out):
+        self.out = out
+        self.writer = csv.DictWriter(out, fieldnames=COLUMNS, extrasaction="ignore")
+        self.writer.writeheader()
 
+    def write(self, row: Dict[str, Any]) -> None:
+        row = dict(row, custom_questions=json.dumps(row.get("custom_questions") or [], ensure_ascii=False))
+        self.writer.writerow(row)
 
-def main() -> None:
+    def close(self) -> None:
+        self.out.flush()
+
+
+class ParquetWriter:
+    """Buffers one row group at a time; requires pyarrow"""
+
+    def __init__(self, path: str, row_group_size: int = 5000):
+        try:
+            import pyarrow as pa  # type: ignore
+            import pyarrow.parquet as pq  # type: ignore
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+        self.pa = pa
+        self.schema = pa.schema([(name, pa.string()) for name in COLUMNS])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.row_group_size = row_group_size
+        self.buffer: List[Dict[str, Any]] = []
+
+    def write(self, row: Dict[str, Any]) -> None:
+        row = dict(row, custom_questions=json.dumps(row.get("custom_questions") or [], ensure_ascii=False))
+        self.buffer.append(row)
+        if len(self.buffer) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self.buffer:
+            columns = {name: [None if r.get(name) is None else str(r.get(name)) for r in self.buffer] for name in COLUMNS}
+            self.writer.write_table(self.pa.table(columns, schema=self.schema))
+            self.buffer = []
+
+    def close(self) -> None:
+        self._flush()
+        self.writer.close()
+
+
+def open_writer(fmt: str, output: Optional[str]):
+    """Return (writer, file handle to close or None)"""
+    if fmt == "parquet":
+        if not output:
+            raise RuntimeError("--format parquet needs --output")
+        return ParquetWriter(output), None
+    out = open(output, "w", encoding="utf-8", newline="") if output else sys.stdout
+    writer = {"table": TableWriter, "ndjson": NDJSONWriter, "csv": CSVWriter}[fmt](out)
+    return writer, (out if output else None)
+
+
+def read_state(path: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(created_at, id) of the last exported job, or None"""
+    if not (path and os.path.exists(path)):
+        return None
+    with open(path, encoding="utf-8") as f:
+        text = f.read().strip()
+    if not text:
+        return None
+    try:
+        state = json.loads(text)
+        return state["created_at"], state["id"]
+    except (ValueError, TypeError, KeyError):
+        # Older state files hold only created_at: re-export that timestamp rather than skip jobs
+        return text, ""
+
+
+def write_state(path: str, created_at: str, job_id: str) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"created_at": created_at, "id": job_id}, f)
+    os.replace(tmp, path)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export the jobs table")
+    parser.add_argument("--format", choices=["table", "ndjson", "csv", "parquet"], default="table")
+    parser.add_argument("--output", "-o", help="output file (default: stdout)")
+    parser.add_argument("--page-size", type=int, default=500, help="rows per request (default: 500)")
+    parser.add_argument("--since", help="only export jobs created after this ISO timestamp")
+    parser.add_argument("--state-file", help="remember the last exported (created_at, id) here and resume after it")
+    parser.add_argument("--progress-every", type=float, default=5.0, help="seconds between progress lines")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
     logger = setup_logger()
+    handle = None
     try:
         client = get_supabase_client(logger)
-        jobs = fetch_all_jobs(client, logger)
+        after = read_state(args.state_file)
+        if after:
+            logger.info(f"[Export] Resuming after job {after[1] or '(any)'} created at {after[0]}")
+        elif args.since:
+            logger.info(f"[Export] Incremental export of jobs created after {args.since}")
+        writer, handle = open_writer(args.format, args.output)
 
-        if not jobs:
-            print("No jobs found.")
-            return
+        started = last_report = time.monotonic()
+        count = 0
+        last = None
+        for row in iter_jobs(client, logger, args.page_size, args.since, after):
+            writer.write(row)
+            count += 1
+            last = row
+            now = time.monotonic()
+            if now - last_report >= args.progress_every:
+                logger.info(f"[Export] {count} rows, {count / (now - started):.0f} rows/s")
+                last_report = now
+        writer.close()
 
-        print(f"Total jobs: {len(jobs)}")
-        # Print a compact view
-        for idx, job in enumerate(jobs, start=1):
-            job_id = job.get("id")
-            title = job.get("title")
-            created = job.get("created_at")
-            print(f"{idx}. id={job_id}, title={title}, created_at={created}")
+        elapsed = max(time.monotonic() - started, 1e-9)
+        logger.info(f"[Export] Done: {count} rows in {elapsed:.2f}s ({count / elapsed:.0f} rows/s)")
+        if args.state_file and last:
+            write_state(args.state_file, last["created_at"], last["id"])
     except Exception as e:
         print(f"[Fatal] {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if handle is not None:
+            handle.close()
 
 
 if __name__ == "__main__":
     main()
-
-
@@ -0,0 +1,87 @@
+"""
+Bulk-ingest a ZIP archive or directory of resumes.
+
+Usage:
+    python backend/scripts/ingest_resumes.py resumes.zip > results.ndjson
+    python backend/scripts/ingest_resumes.py ./resumes --workers 8 --upsert
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import zipfile
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_ingest import (StudentUpserter, ingest, iter_directory_files, iter_zip_files,  # noqa: E402
+                         make_workdir, remove_workdir)
+from resume_pool import ResumeParsePool  # noqa: E402
+
+
+def setup_logger() -> logging.Logger:
+    # Logs go to stderr so stdout stays valid NDJSON
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", stream=sys.stderr)
+    return logging.getLogger("ingest_resumes")
+
+
+def get_supabase_client(logger: logging.Logger):
+    url = os.getenv("SUPABASE_URL", "")
+    key = os.getenv("SUPABASE_KEY", "")
+    if not url or not key:
+        logger.error("SUPABASE_URL or SUPABASE_KEY missing in environment")
+        raise RuntimeError("Missing SUPABASE_URL or SUPABASE_KEY")
+    from supabase import create_client  # type: ignore
+    return create_client(url, key)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Parse a ZIP or directory of PDF/DOCX resumes into NDJSON")
+    parser.add_argument("source", help="ZIP archive or directory of resumes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="parser processes (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=20.0, help="per-file parse timeout in seconds")
+    parser.add_argument("--output", "-o", help="write NDJSON here instead of stdout")
+    parser.add_argument("--include-text", action="store_true", help="include extracted text in each line")
+    parser.add_argument("--upsert", action="store_true", help="upsert parsed candidates into the students table")
+    parser.add_argument("--batch-size", type=int, default=500, help="rows per students upsert (default: 500)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    logger = setup_logger()
+    workdir = None
+    pool = ResumeParsePool(max_workers=args.workers, task_timeout=args.timeout, max_pending=max(1, args.workers) * 2)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        upserter = StudentUpserter(get_supabase_client(logger), batch_size=args.batch_size) if args.upsert else None
+
+        if os.path.isdir(args.source):
+            files = iter_directory_files(args.source)
+        elif zipfile.is_zipfile(args.source):
+            workdir = make_workdir()
+            files = iter_zip_files(args.source, workdir, max_files=sys.maxsize)
+        else:
+            raise RuntimeError(f"{args.source} is neither a directory nor a ZIP archive")
+
+        for result in ingest(files, pool.parse, max_workers=max(1, args.workers), upserter=upserter,
+                             include_text=args.include_text, cleanup=workdir is not None):
+            out.write(json.dumps(result) + "\n")
+            if "summary" in result:
+                logger.info(f"[Done] {result['summary']}")
+    except Exception as e:
+        print(f"[Fatal] {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        pool.shutdown()
+        if workdir:
+            remove_workdir(workdir)
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
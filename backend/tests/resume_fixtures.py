@@ -0,0 +1,59 @@
+"""Helpers that build small synthetic PDF and DOCX resumes for tests"""
+import io
+from docx import Document
+
+
+def make_pdf(pages):
+    """Build a minimal PDF with one line of Helvetica text per entry in `pages` (a list of line lists)"""
+    objects = []
+    page_ids = []
+    font_id = 3
+    next_id = 4
+    for lines in pages:
+        content = ['BT /F1 11 Tf 50 750 Td 14 TL']
+        for line in lines:
+            escaped = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            content.append(f'({escaped}) Tj T*')
+        content.append('ET')
+        stream = '\n'.join(content).encode('latin-1')
+        content_id, page_id = next_id, next_id + 1
+        next_id += 2
+        objects.append((content_id, b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream'))
+        objects.append((page_id, (
+            '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            f'/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>'
+        ).encode()))
+        page_ids.append(page_id)
+
+    kids = ' '.join(f'{pid} 0 R' for pid in page_ids)
+    objects = [
+        (1, b'<< /Type /Catalog /Pages 2 0 R >>'),
+        (2, f'<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>'.encode()),
+        (font_id, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>'),
+    ] + objects
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = {}
+    for obj_id, body in sorted(objects):
+        offsets[obj_id] = out.tell()
+        out.write(b'%d 0 obj\n' % obj_id + body + b'\nendobj\n')
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    for obj_id in sorted(offsets):
+        out.write(b'%010d 00000 n \n' % offsets[obj_id])
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def make_docx(paragraphs):
+    """Build a DOCX file with one paragraph per entry"""
+    doc = Document()
+    for text in paragraphs:
+        doc.add_paragraph(text)
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+SAMPLE_HEADER = ['Jane Smith', 'jane.smith@example.com', '+1 415-555-0123']
@@ -1,7 +1,13 @@
 import pytest
 import json
 import io
+import zipfile
 from app import app
+import app as app_module
+from email_outbox import EmailOutbox, SMTPPool
+from leaderboard import MemoryLeaderboard
+from question_pool import QuestionPool, job_fingerprint
+from resume_fixtures import make_pdf, SAMPLE_HEADER
 
 @pytest.fixture
 def client():
@@ -53,6 +59,66 @@ def test_score_answer(client):
     assert isinstance(data['score'], int)
     assert 1 <= data['score'] <= 10
 
+def test_evaluate_answers_stream(client):
+    """Test streaming evaluation emits one event per question"""
+    payload = {
+        'questions': [
+            {'question': 'What is React?', 'ideal_answer': 'A UI library', 'candidate_answer': '', 'difficulty': 'easy'},
+            {'question': 'Explain useEffect', 'ideal_answer': 'Side effects', 'candidate_answer': 'It runs side effects after render', 'difficulty': 'medium'}
+        ],
+        'job_title': 'Frontend Developer'
+    }
+    
+    response = client.post('/api/evaluate-answers/stream',
+                          data=json.dumps(payload),
+                          content_type='application/json')
+    
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    assert body.count('event: evaluation') == 2
+    assert body.rstrip().endswith('data: {"count": 2}')
+
+def test_generate_stream_requires_json(client):
+    """Test streaming generation rejects an empty request"""
+    response = client.post('/api/generate/stream')
+    assert response.status_code == 400
+
+def test_generate_stream_parses_cached_completion_leniently(client, monkeypatch):
+    """Test that a cached batch in a fenced form is served through the shared output parser"""
+    questions = [{'question': f'Q{i}', 'ideal_answer': f'A{i}'} for i in range(6)]
+    cached = 'Here you go:\n```json\n' + json.dumps({'questions': questions}) + '\n```'
+    monkeypatch.setattr(app_module, 'llm_client', object())
+    monkeypatch.setattr(app_module, 'get_question_pool', lambda: None)
+    monkeypatch.setattr(app_module, '_cache_lookup', lambda prompt, max_tokens, use_cache: ('key', cached))
+    response = client.post('/api/generate/stream', json={'job_context': 'Backend developer'})
+    body = response.get_data(as_text=True)
+    assert body.count('event: question') == 6
+    assert '"source": "cache"' in body
+
+def test_pooled_questions_match_the_requested_job_fields():
+    """Test that a request only draws from a pool generated for its own job fields and cannot seed another job"""
+    batches = []
+
+    def generate(job_context, job_description, custom_questions):
+        batches.append((job_context, tuple(custom_questions)))
+        return [{'question': f'{job_context} {custom_questions}', 'ideal_answer': 'ideal', 'difficulty': d}
+                for d in app_module.BATCH_DIFFICULTIES]
+
+    pool = QuestionPool(generate, target_per_difficulty=2, low_watermark=1, max_workers=1)
+    draw = app_module.draw_pooled_questions
+    difficulties = app_module.BATCH_DIFFICULTIES
+    pool.warm('job-1', 'Backend', 'APIs', ['Why us?'])
+    pool.shutdown(wait=True)
+
+    assert draw(pool, 'job-1', 'Injected', 'APIs', ['Why us?'], difficulties) is None
+    assert draw(pool, 'job-1', 'Backend', 'APIs', ['Other?'], difficulties) is None
+    assert pool.matches('job-1', job_fingerprint('Backend', 'APIs', ['Why us?']))
+    assert {q['question'] for q in draw(pool, 'job-1', 'Backend', 'APIs', ['Why us?'], difficulties)} == \
+        {"Backend ['Why us?']"}
+    # Misses warmed pools keyed by each request's own fields, not job-1
+    assert pool.stats()['jobs'] == 3
+
 def test_generate_summary(client):
     """Test summary generation endpoint"""
     payload = {
@@ -74,8 +140,9 @@ def test_generate_summary(client):
     assert 'summary' in data
     assert isinstance(data['final_score'], (int, float))
 
-def test_send_email(client):
-    """Test email sending endpoint"""
+def test_send_email(client, monkeypatch, tmp_path):
+    """Test that the email endpoint queues the message and returns immediately"""
+    monkeypatch.setattr(app_module, 'email_outbox', EmailOutbox(str(tmp_path / 'outbox.sqlite3')))
     payload = {
         'to': 'test@example.com',
         'subject': 'Interview Result',
@@ -88,9 +155,75 @@ def test_send_email(client):
                           data=json.dumps(payload),
                           content_type='application/json')
     
+    assert response.status_code == 202
+    data = json.loads(response.data)
+    assert data['status'] == 'queued'
+    status = json.loads(client.get(f"/api/send-email/{data['id']}").data)
+    assert status['status'] == 'queued' and status['to'] == 'test@example.com'
+
+def test_send_email_with_file_template(client, monkeypatch, tmp_path):
+    """Test that templates with extra variables are validated before queueing"""
+    monkeypatch.setattr(app_module, 'email_outbox', EmailOutbox(str(tmp_path / 'outbox.sqlite3')))
+    payload = {'to': 'test@example.com', 'template': 'interview_invite',
+               'candidate_name': 'John Doe', 'job_title': 'Fullstack Developer'}
+    response = client.post('/api/send-email', data=json.dumps(payload), content_type='application/json')
+    assert response.status_code == 400 and 'Missing template variable' in json.loads(response.data)['error']
+
+    payload['variables'] = {'interview_link': 'https://example.com/i/1', 'deadline': 'Friday'}
+    response = client.post('/api/send-email', data=json.dumps(payload), content_type='application/json')
+    assert response.status_code == 202
+
+def test_bulk_notifications_follow_ranking(client, monkeypatch, tmp_path):
+    """Test that a ranking rule shortlists the top candidates and rejects the rest in one call"""
+    sent = []
+
+    class RecordingSMTP:
+        def login(self, user, password):
+            pass
+
+        def noop(self):
+            return (250, b'OK')
+
+        def sendmail(self, sender, to_addrs, msg):
+            sent.append(to_addrs[0])
+
+        def quit(self):
+            pass
+
+    pool = SMTPPool('localhost', 25, 'user', 'pass', starttls=False, factory=RecordingSMTP)
+    monkeypatch.setattr(app_module, 'email_outbox', EmailOutbox(str(tmp_path / 'outbox.sqlite3'), pool, workers=0))
+    board = MemoryLeaderboard()
+    for email, score in [('a@example.com', 9.0), ('b@example.com', 7.5), ('c@example.com', 4.0)]:
+        board.record('bulk-job', email, score, name=email[0].upper())
+    monkeypatch.setattr(app_module, 'leaderboard', board)
+
+    payload = {'job': {'id': 'bulk-job', 'title': 'Developer'}, 'shortlist_top': 2, 'reject_rest': True}
+    response = client.post('/api/notifications/bulk', data=json.dumps(payload), content_type='application/json')
+
     assert response.status_code == 200
     data = json.loads(response.data)
-    assert data['status'] == 'success'
+    assert [(r['email'], r['template'], r['status']) for r in data['results']] == [
+        ('a@example.com', 'shortlist', 'sent'),
+        ('b@example.com', 'shortlist', 'sent'),
+        ('c@example.com', 'reject', 'sent'),
+    ]
+    assert data['summary']['sent'] == 3 and len(sent) == 3
+    assert pool.connections_opened == 1
+
+def test_bulk_notifications_report_invalid_recipients(client, monkeypatch, tmp_path):
+    """Test that bad recipients are reported without blocking the rest of the batch"""
+    monkeypatch.setattr(app_module, 'email_outbox', EmailOutbox(str(tmp_path / 'outbox.sqlite3'), workers=0))
+    payload = {
+        'job': {'title': 'Developer'},
+        'recipients': [
+            {'email': 'ok@example.com', 'name': 'Ok', 'template': 'reject'},
+            {'email': 'not-an-email', 'name': 'Bad', 'template': 'shortlist'},
+        ]
+    }
+    response = client.post('/api/notifications/bulk', data=json.dumps(payload), content_type='application/json')
+    data = json.loads(response.data)
+    assert [r['status'] for r in data['results']] == ['queued', 'invalid']
+    assert data['summary'] == dict(data['summary'], total=2, queued=1, invalid=1)
 
 def test_create_job(client):
     """Test job creation endpoint"""
@@ -109,6 +242,22 @@ def test_create_job(client):
     assert data['title'] == 'Test Developer'
     assert 'id' in data
 
+def test_update_job(client):
+    """Test job update endpoint"""
+    payload = {
+        'title': 'Test Developer',
+        'description': 'An updated position',
+        'custom_questions': ['How do you test React components?']
+    }
+    
+    response = client.put('/api/jobs/1',
+                         data=json.dumps(payload),
+                         content_type='application/json')
+    
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['custom_questions'] == payload['custom_questions']
+
 def test_get_jobs(client):
     """Test getting all jobs"""
     response = client.get('/api/jobs')
@@ -139,3 +288,153 @@ def test_parse_resume_invalid_file_type(client):
     assert response.status_code == 400
     data = json.loads(response.data)
     assert 'error' in data
+
+def test_get_stats(client):
+    """Test runtime statistics endpoint"""
+    response = client.get('/api/stats')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert 'llm_cache' in data
+
+def test_parse_resume_pdf(client):
+    """Test parse resume endpoint with a PDF file"""
+    data = {'file': (io.BytesIO(make_pdf([SAMPLE_HEADER])), 'resume.pdf')}
+    response = client.post('/api/parse-resume', data=data, content_type='multipart/form-data')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['success'] is True
+    assert data['extracted_info']['email'] == 'jane.smith@example.com'
+
+def test_parse_resumes_bulk_zip(client):
+    """Test bulk resume parsing streams one NDJSON line per file plus a summary"""
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zf:
+        zf.writestr('resumes/jane.pdf', make_pdf([SAMPLE_HEADER]))
+        zf.writestr('resumes/empty.pdf', b'')
+    archive.seek(0)
+    response = client.post('/api/parse-resumes/bulk', data={'file': (archive, 'resumes.zip')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert lines[-1]['summary']['files'] == 2
+    results = {line['file']: line for line in lines[:-1]}
+    assert results['resumes/jane.pdf']['extracted_info']['email'] == 'jane.smith@example.com'
+    assert results['resumes/empty.pdf']['status'] == 'error'
+
+def test_parse_resume_repeat_upload_is_cached(client, monkeypatch):
+    """Test that re-uploading the same resume is served from the cache without parsing"""
+    pdf = make_pdf([SAMPLE_HEADER, ['Cache test']])
+    first = client.post('/api/parse-resume', data={'file': (io.BytesIO(pdf), 'resume.pdf')},
+                        content_type='multipart/form-data')
+    assert first.headers['X-Resume-Cache'] == 'miss'
+
+    def fail_parse(*args, **kwargs):
+        raise AssertionError('cached resume was parsed again')
+
+    monkeypatch.setattr(app_module.resume_pool, 'parse', fail_parse)
+    second = client.post('/api/parse-resume', data={'file': (io.BytesIO(pdf), 'again.pdf')},
+                         content_type='multipart/form-data')
+    assert second.status_code == 200
+    assert second.headers['X-Resume-Cache'] == 'hit'
+    assert json.loads(second.data) == json.loads(first.data)
+
+def test_get_jobs_etag_and_invalidation(client, monkeypatch):
+    """Test that job listings are served with an ETag and refreshed after a write"""
+    class FakeStore:
+        def __init__(self):
+            self.jobs = [{'id': 'a', 'title': 'Backend Developer'}]
+
+        def list_jobs(self, limit=None, cursor=None):
+            return {'jobs': list(self.jobs), 'next_cursor': None}
+
+        def create_job(self, job):
+            job = dict(job, id='b')
+            self.jobs.insert(0, job)
+            return job
+
+    monkeypatch.setattr(app_module, 'job_store', FakeStore())
+    first = client.get('/api/jobs')
+    assert first.status_code == 200 and first.headers['X-Read-Cache'] == 'miss'
+    etag = first.headers['ETag']
+    assert client.get('/api/jobs', headers={'If-None-Match': etag}).status_code == 304
+
+    client.post('/api/jobs', data=json.dumps({'title': 'Data Engineer'}), content_type='application/json')
+    refreshed = client.get('/api/jobs', headers={'If-None-Match': etag})
+    assert refreshed.status_code == 200 and refreshed.headers['X-Read-Cache'] == 'miss'
+    assert len(json.loads(refreshed.data)['jobs']) == 2
+
+def test_summary_updates_leaderboard(client):
+    """Test that finalizing a summary records the score on the job leaderboard"""
+    for email, score in [('a@example.com', 9), ('b@example.com', 6)]:
+        payload = {
+            'answers': [{'question': 'Q', 'candidate_answer': 'A', 'score': score}],
+            'candidate': {'name': email[0].upper(), 'email': email},
+            'job': {'id': 'leaderboard-job', 'title': 'Developer'}
+        }
+        response = client.post('/api/summary', data=json.dumps(payload), content_type='application/json')
+        assert response.status_code == 200
+
+    top = json.loads(client.get('/api/leaderboard/leaderboard-job?k=5&percentile=50').data)
+    assert [entry['student_id'] for entry in top['top']] == ['a@example.com', 'b@example.com']
+    assert top['score_at_percentile'] == 9.0
+    rank = json.loads(client.get('/api/leaderboard/leaderboard-job/candidates/b@example.com').data)
+    assert rank['rank'] == 2 and rank['total'] == 2
+    assert client.get('/api/leaderboard/leaderboard-job/candidates/nobody').status_code == 404
+
+def test_summary_clamps_llm_score_before_ranking(client, monkeypatch):
+    """Test that an out-of-range model score is clamped to 0-10 in the response and on the leaderboard"""
+    board = MemoryLeaderboard()
+    monkeypatch.setattr(app_module, 'leaderboard', board)
+    monkeypatch.setattr(app_module, 'llm_client', object())
+    monkeypatch.setattr(app_module, 'call_groq_api',
+                        lambda *args, **kwargs: json.dumps({'final_score': 12, 'summary': 'Great'}))
+    payload = {
+        'answers': [{'question': 'Q', 'candidate_answer': 'A', 'score': 9}],
+        'candidate': {'name': 'A', 'email': 'a@example.com'},
+        'job': {'id': 'clamp-job', 'title': 'Developer'}
+    }
+    response = client.post('/api/summary', json=payload)
+    assert json.loads(response.data)['final_score'] == 10.0
+    assert board.rank('clamp-job', 'a@example.com')['final_score'] == 10.0
+
+def test_metrics_report_requests_and_mock_fallbacks(client, monkeypatch):
+    """Test that /api/metrics exposes request latency and mock-fallback counts"""
+    monkeypatch.setattr(app_module, 'llm_client', None)
+    before = app_module.MOCK_FALLBACKS.value('score', 'llm_unconfigured')
+    client.post('/api/score', json={'question': 'q', 'ideal': 'i', 'candidate_answer': 'a'})
+    assert app_module.MOCK_FALLBACKS.value('score', 'llm_unconfigured') == before + 1
+    
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    text = response.get_data(as_text=True)
+    assert 'swipe_http_request_seconds_count{route="/api/score",method="POST",status="200"}' in text
+    assert 'swipe_mock_fallbacks_total{endpoint="score",reason="llm_unconfigured"}' in text
+    assert '# TYPE swipe_llm_call_seconds histogram' in text
+
+def test_request_id_is_echoed_and_traced(client, monkeypatch):
+    """Test that requests carry an X-Request-ID and spans land in the request's trace"""
+    traces = []
+    
+    class Exporter:
+        def export(self, trace):
+            traces.append(trace)
+    
+    monkeypatch.setattr(app_module.tracer, 'exporter', Exporter())
+    monkeypatch.setattr(app_module.tracer, 'sample_rate', 1.0)
+    response = client.post('/api/evaluate-answers/stream', json={'questions': [{'question': 'q', 'candidate_answer': 'a'}]},
+                           headers={'X-Request-ID': 'interview-42-q1'})
+    response.get_data()
+    assert response.headers['X-Request-ID'] == 'interview-42-q1'
+    assert len(traces) == 1 and traces[0].request_id == 'interview-42-q1'
+    assert traces[0].root.attributes['status'] == 200
+
+def test_create_app_builds_independent_apps():
+    """Test that create_app returns a fresh app serving the API routes"""
+    other = app_module.create_app()
+    assert other is not app
+    with other.test_client() as other_client:
+        response = other_client.get('/api/health')
+    assert response.status_code == 200
+    assert response.headers['X-Request-ID']
@@ -0,0 +1,77 @@
+import io
+import os
+import zipfile
+import pytest
+from bulk_ingest import StudentUpserter, ingest, iter_directory_files, iter_zip_files
+from resume_parser import parse_resume_file
+from resume_fixtures import make_pdf, make_docx, SAMPLE_HEADER
+
+class FakeTable:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def upsert(self, rows, on_conflict=None):
+        self.calls.append((rows, on_conflict))
+        return self
+
+    def execute(self):
+        return self
+
+class FakeSupabase:
+    def __init__(self):
+        self.calls = []
+
+    def table(self, name):
+        assert name == 'students'
+        return FakeTable(self.calls)
+
+@pytest.fixture
+def resume_dir(tmp_path):
+    (tmp_path / 'a.pdf').write_bytes(make_pdf([SAMPLE_HEADER]))
+    (tmp_path / 'b.docx').write_bytes(make_docx(['John Doe', 'john.doe@example.com']))
+    (tmp_path / 'broken.pdf').write_bytes(b'not a pdf')
+    (tmp_path / 'notes.txt').write_text('ignored')
+    return tmp_path
+
+def test_ingest_directory_reports_every_file(resume_dir):
+    """Test that each supported file yields one result and failures do not stop the batch"""
+    results = list(ingest(iter_directory_files(str(resume_dir)), parse_resume_file, max_workers=2))
+    summary = results.pop()['summary']
+    by_file = {r['file']: r for r in results}
+    assert set(by_file) == {'a.pdf', 'b.docx', 'broken.pdf'}
+    assert by_file['a.pdf']['extracted_info']['email'] == 'jane.smith@example.com'
+    assert by_file['b.docx']['status'] == 'ok'
+    assert by_file['broken.pdf']['status'] == 'error'
+    assert summary['files'] == 3 and summary['ok'] == 2 and summary['error'] == 1
+
+def test_iter_zip_files_ignores_member_paths(resume_dir, tmp_path_factory):
+    """Test that ZIP members are extracted under generated names inside the work directory"""
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zf:
+        zf.writestr('../../evil.pdf', (resume_dir / 'a.pdf').read_bytes())
+        zf.writestr('__MACOSX/._a.pdf', b'junk')
+        zf.writestr('readme.md', b'ignored')
+    zip_path = resume_dir / 'upload.zip'
+    zip_path.write_bytes(archive.getvalue())
+    workdir = tmp_path_factory.mktemp('work')
+
+    files = list(iter_zip_files(str(zip_path), str(workdir)))
+    assert len(files) == 1
+    name, path, ext = files[0]
+    assert name == '../../evil.pdf' and ext == '.pdf'
+    assert os.path.dirname(path) == str(workdir)
+
+def test_upserter_batches_and_dedupes():
+    """Test that candidates are upserted in batches keyed on email, skipping incomplete rows"""
+    client = FakeSupabase()
+    upserter = StudentUpserter(client, batch_size=2)
+    assert upserter.add({'name': 'Jane Smith', 'email': 'Jane@Example.com', 'phone': '+1 415-555-0123'})
+    assert upserter.add({'name': 'Jane S', 'email': 'jane@example.com', 'phone': None})
+    assert not upserter.add({'name': None, 'email': 'x@example.com', 'phone': None})
+    assert upserter.add({'name': 'John Doe', 'email': 'john@example.com', 'phone': None})
+    upserter.flush()
+    assert [len(rows) for rows, _ in client.calls] == [2]
+    rows, on_conflict = client.calls[0]
+    assert on_conflict == 'email'
+    assert rows[0] == {'name': 'Jane S', 'email': 'jane@example.com', 'phone': None}
+    assert upserter.stats() == {'upserted': 2, 'skipped': 1, 'failed': 0}
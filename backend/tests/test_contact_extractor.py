@@ -0,0 +1,45 @@
+import time
+from contact_extractor import ContactScanner, extract_contact_info, HEADER_CHARS
+
+def test_extracts_header_fields_with_confidence():
+    """Test the common layout: name line, email and phone at the top"""
+    info = extract_contact_info('Jane Smith\njane.smith@example.com | +1 415-555-0123\n\nExperience\n...')
+    assert info['name'] == 'Jane Smith'
+    assert info['email'] == 'jane.smith@example.com'
+    assert info['phone'] == '+1 415-555-0123'
+    assert all(0.8 <= score <= 1 for score in info['confidence'].values())
+
+def test_labels_and_headings():
+    """Test that labeled fields win and section headings are not taken as names"""
+    text = "CURRICULUM VITAE\nName: John O'Neil\nPhone: (415) 555-0123\nEmail: j@x.io"
+    info = extract_contact_info(text)
+    assert info['name'] == "John O'Neil"
+    assert info['confidence']['name'] == 0.95
+    assert info['phone'] == '(415) 555-0123'
+    assert info['confidence']['phone'] > 0.9
+
+def test_full_text_fallback_has_lower_confidence():
+    """Test that fields missing from the header are found further down"""
+    text = 'Skills\n' + 'Python and Flask.\n' * (HEADER_CHARS // 10) + 'Reach me at ann@lee.org'
+    info = extract_contact_info(text)
+    assert info['email'] == 'ann@lee.org'
+    assert info['confidence']['email'] < 0.95
+    assert info['name'] is None and info['phone'] is None
+    assert info['confidence']['name'] == 0.0
+
+def test_pathological_input_is_fast():
+    """Test that inputs which made the old patterns backtrack are handled quickly"""
+    start = time.perf_counter()
+    extract_contact_info(('a' * 60 + ' ') * 2000)
+    extract_contact_info('x' * 20000 + '@' + 'y' * 20000)
+    assert time.perf_counter() - start < 0.5
+
+def test_scanner_matches_whole_text_extraction():
+    """Test that feeding lines one at a time gives the same fields as extracting the whole text"""
+    text = ('Resume\n' + 'Built services in Python.\n' * (HEADER_CHARS // 20)
+            + 'Name: Ann Lee\nPhone: +1 415-555-0123\nann@lee.org\n')
+    scanner = ContactScanner()
+    for line in text.splitlines(keepends=True):
+        scanner.feed(line)
+    assert scanner.complete
+    assert scanner.info() == extract_contact_info(text)
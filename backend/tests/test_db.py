@@ -0,0 +1,101 @@
+import base64
+import pytest
+from db import JobStore, ReadThroughCache, SharedVersions, InvalidCursorError, decode_cursor, encode_cursor
+
+class FakeQuery:
+    """Records PostgREST builder calls and returns canned rows"""
+
+    def __init__(self, rows, calls):
+        self.rows = rows
+        self.calls = calls
+
+    def __getattr__(self, name):
+        if name == 'not_':
+            self.calls.append(('not_',))
+            return self
+
+        def method(*args, **kwargs):
+            self.calls.append((name,) + args)
+            return self
+        return method
+
+    def execute(self):
+        return type('Response', (), {'data': self.rows})()
+
+class FakeClient:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def table(self, name):
+        self.calls.append(('table', name))
+        return FakeQuery(self.rows, self.calls)
+
+def interview(i, score):
+    return {'id': f'id-{i}', 'student_id': f's-{i}', 'final_score': score, 'status': 'completed',
+            'summary': None, 'completed_at': None, 'students': {'name': f'C{i}', 'email': f'c{i}@x.io', 'phone': None}}
+
+def test_candidates_keyset_page():
+    """Test the projection, keyset ordering and cursor of a candidates page"""
+    client = FakeClient([interview(1, 9.5), interview(2, 8.0), interview(3, 8.0)])
+    page = JobStore(client).list_candidates('job-1', limit=2)
+    select = next(call for call in client.calls if call[0] == 'select')
+    assert 'answers' not in select[1] and 'students(name,email,phone)' in select[1]
+    assert ('order', 'final_score') in [call[:2] for call in client.calls]
+    assert [c['name'] for c in page['candidates']] == ['C1', 'C2']
+    assert decode_cursor(page['next_cursor'], 2) == [8.0, 'id-2']
+
+    client.calls.clear()
+    client.rows = [interview(3, 8.0)]
+    page = JobStore(client).list_candidates('job-1', limit=2, cursor=page['next_cursor'])
+    assert ('or_', 'final_score.lt.8.0,and(final_score.eq.8.0,id.gt."id-2")') in client.calls
+    assert page['next_cursor'] is None
+
+def test_invalid_cursor():
+    """Test that a malformed cursor is rejected"""
+    with pytest.raises(InvalidCursorError):
+        JobStore(FakeClient([])).list_jobs(cursor='not-a-cursor')
+
+def test_tampered_cursor_values_are_rejected():
+    """Test that well-formed cursors with values of the wrong type are rejected, not passed to the query"""
+    store = JobStore(FakeClient([]))
+    for values in (['high', 'id-2'], [None, 'id-2'], [True, 'id-2'], [8.0, 7]):
+        with pytest.raises(InvalidCursorError):
+            store.list_candidates('job-1', cursor=encode_cursor(values))
+    with pytest.raises(InvalidCursorError):
+        store.list_candidates('job-1', cursor=base64.urlsafe_b64encode(b'[1e9999, "id-2"]').decode())
+    with pytest.raises(InvalidCursorError):
+        store.list_jobs(cursor=encode_cursor([{'a': 1}, 'id-2']))
+
+def test_read_through_cache_etag_and_invalidation():
+    """Test that pages are cached with a stable ETag until the namespace is invalidated"""
+    cache = ReadThroughCache()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return {'jobs': [{'id': len(loads)}]}
+
+    body, etag, hit = cache.fetch('jobs', {'limit': 10}, loader)
+    assert not hit
+    assert cache.fetch('jobs', {'limit': 10}, loader) == (body, etag, True)
+    cache.invalidate('jobs')
+    new_body, new_etag, hit = cache.fetch('jobs', {'limit': 10}, loader)
+    assert not hit and new_etag != etag and len(loads) == 2
+
+def test_shared_versions_invalidate_every_worker(tmp_path):
+    """Test that an invalidation in one worker's cache makes the other workers reload"""
+    path = str(tmp_path / 'versions.sqlite3')
+    first, second = ReadThroughCache(versions=SharedVersions(path)), ReadThroughCache(versions=SharedVersions(path))
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return {'jobs': len(loads)}
+
+    for cache in (first, second):
+        cache.fetch('jobs', {}, loader)
+        assert cache.fetch('jobs', {}, loader)[2]
+    first.invalidate('jobs')
+    assert not second.fetch('jobs', {}, loader)[2]
+    assert len(loads) == 3
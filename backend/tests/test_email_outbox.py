@@ -0,0 +1,159 @@
+import email.header
+import email.utils
+import smtplib
+import sqlite3
+import pytest
+from email_outbox import EmailOutbox, SMTPPool, build_message
+
+class FakeSMTP:
+    """Records messages; fail_with is a list of exceptions raised by successive sends"""
+
+    instances = []
+
+    def __init__(self, fail_with=None):
+        self.messages = []
+        self.fail_with = fail_with if fail_with is not None else []
+        self.logged_in = False
+        FakeSMTP.instances.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        self.logged_in = True
+
+    def noop(self):
+        return (250, b'OK')
+
+    def sendmail(self, sender, to_addrs, msg):
+        if self.fail_with:
+            raise self.fail_with.pop(0)
+        self.messages.append(email.message_from_bytes(msg))
+
+    def quit(self):
+        pass
+
+def make_outbox(tmp_path, failures=None, **kwargs):
+    FakeSMTP.instances = []
+    pool = SMTPPool('localhost', 25, 'user', 'pass', factory=lambda: FakeSMTP(failures))
+    return EmailOutbox(str(tmp_path / 'outbox.sqlite3'), pool, sender='hr@example.com',
+                       backoff_base=0.01, poll_interval=0.05, **kwargs)
+
+def test_batch_is_sent_over_one_session(tmp_path):
+    """Test that queued messages share one authenticated SMTP session"""
+    outbox = make_outbox(tmp_path, workers=1)
+    try:
+        ids = outbox.enqueue_many([(f'c{i}@example.com', 'Hi', '<p>hi</p>') for i in range(5)])
+        assert outbox.drain(5)
+        assert [outbox.status(i)['status'] for i in ids] == ['sent'] * 5
+        assert outbox.stats()['smtp_connections_opened'] == 1
+        assert FakeSMTP.instances[0].logged_in
+        assert FakeSMTP.instances[0].messages[0]['From'] == 'hr@example.com'
+    finally:
+        outbox.shutdown()
+
+def test_build_message_round_trips():
+    """Test that the hand-written MIME framing parses back to the same message"""
+    raw = build_message('hr@example.com', 'jane@example.com', 'Résultat\r\nBcc: x@example.com', '<p>🎉 Hi</p>')
+    msg = email.message_from_bytes(raw)
+    assert msg['To'] == 'jane@example.com' and msg['Bcc'] is None
+    assert str(email.header.make_header(email.header.decode_header(msg['Subject']))) == 'Résultat Bcc: x@example.com'
+    assert msg.get_payload(decode=True).decode('utf-8') == '<p>🎉 Hi</p>'
+    assert msg['Message-ID'].endswith('@example.com>') and email.utils.parsedate_to_datetime(msg['Date'])
+
+def test_resent_message_keeps_message_id_and_date(tmp_path):
+    """Test that Message-ID and Date are fixed at enqueue time and reused when a message is retried"""
+    outbox = make_outbox(tmp_path, failures=[smtplib.SMTPServerDisconnected('gone')], workers=1)
+    try:
+        outbox.enqueue('a@example.com', 'Hi', '<p>hi</p>')
+        assert outbox.drain(5)
+    finally:
+        outbox.shutdown()
+    sent = [m for smtp in FakeSMTP.instances for m in smtp.messages]
+    assert len(sent) == 1
+    row = outbox._conn().execute('SELECT message_id, date FROM email_outbox').fetchone()
+    assert (sent[0]['Message-ID'], sent[0]['Date']) == row
+
+def test_transient_failure_is_retried(tmp_path):
+    """Test that a dropped connection is retried with backoff on a new session"""
+    outbox = make_outbox(tmp_path, failures=[smtplib.SMTPServerDisconnected('gone')], workers=1)
+    try:
+        message_id = outbox.enqueue('a@example.com', 'Hi', '<p>hi</p>')
+        assert outbox.drain(5)
+        status = outbox.status(message_id)
+        assert status['status'] == 'sent' and status['attempts'] == 1
+        assert outbox.stats()['retried'] == 1
+    finally:
+        outbox.shutdown()
+
+def test_permanent_failure_is_not_retried(tmp_path):
+    """Test that a 5xx rejection fails the message without retries"""
+    refused = smtplib.SMTPRecipientsRefused({'bad@example.com': (550, b'No such user')})
+    outbox = make_outbox(tmp_path, failures=[refused], workers=1)
+    try:
+        message_id = outbox.enqueue('bad@example.com', 'Hi', '<p>hi</p>')
+        assert outbox.drain(5)
+        assert outbox.status(message_id)['status'] == 'failed'
+        assert outbox.stats()['retried'] == 0
+    finally:
+        outbox.shutdown()
+
+def test_send_now_delivers_in_session_sized_chunks(tmp_path):
+    """Test that send_now delivers immediately, opening a session per chunk"""
+    outbox = make_outbox(tmp_path, workers=0)
+    outbox.pool.max_messages_per_session = 2
+    ids = outbox.enqueue_many([(f'c{i}@example.com', 'Hi', '<p>hi</p>') for i in range(5)], wake=False)
+    statuses = outbox.send_now(ids)
+    assert [status['status'] for status in statuses] == ['sent'] * 5
+    assert sum(len(smtp.messages) for smtp in FakeSMTP.instances) == 5
+    assert outbox.stats()['smtp_connections_opened'] == 3
+
+def test_claimed_messages_are_requeued_after_restart(tmp_path):
+    """Test that messages left in 'sending' by a crash are delivered after restart"""
+    path = str(tmp_path / 'outbox.sqlite3')
+    message_id = EmailOutbox(path).enqueue('a@example.com', 'Hi', '<p>hi</p>')
+    sqlite3.connect(path, isolation_level=None).execute("UPDATE email_outbox SET status = 'sending'")
+    assert EmailOutbox(path).status(message_id)['status'] == 'queued'
+
+def test_restart_leaves_live_claims_of_other_workers_alone(tmp_path):
+    """Test that a worker starting on a shared outbox only re-queues claims whose lease expired"""
+    path = str(tmp_path / 'outbox.sqlite3')
+    first = EmailOutbox(path, workers=0)
+    message_id = first.enqueue('a@example.com', 'Hi', '<p>hi</p>')
+    assert [row[0] for row in first._claim()] == [message_id]
+
+    second = EmailOutbox(path, workers=0, lease_timeout=60)
+    assert second.status(message_id)['status'] == 'sending'
+    assert second._claim() == []
+
+    sqlite3.connect(path, isolation_level=None).execute('UPDATE email_outbox SET claimed_at = claimed_at - 120')
+    assert [row[0] for row in second._claim()] == [message_id]
+    assert second.stats()['requeued'] == 1
+
+def test_delivery_to_local_smtp_server(tmp_path):
+    """Test delivery end to end against an aiosmtpd stand-in"""
+    pytest.importorskip('aiosmtpd')
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.handlers import Sink
+
+    class Handler(Sink):
+        def __init__(self):
+            self.received = []
+
+        async def handle_DATA(self, server, session, envelope):
+            self.received.append(envelope.rcpt_tos)
+            return '250 OK'
+
+    handler = Handler()
+    controller = Controller(handler, hostname='127.0.0.1', port=0)
+    controller.start()
+    try:
+        pool = SMTPPool('127.0.0.1', controller.server.sockets[0].getsockname()[1], starttls=False)
+        outbox = EmailOutbox(str(tmp_path / 'outbox.sqlite3'), pool, sender='hr@example.com', workers=1)
+        outbox.enqueue_many([(f'c{i}@example.com', 'Hi', '<p>hi</p>') for i in range(3)])
+        assert outbox.drain(10)
+        outbox.shutdown()
+        assert len(handler.received) == 3
+        assert pool.connections_opened == 1
+    finally:
+        controller.stop()
@@ -0,0 +1,38 @@
+import pytest
+from email_templates import CompiledText, EmailTemplates, TemplateError, DEFAULT_TEMPLATE_DIR
+
+def test_bundled_templates_render():
+    """Test that every bundled template renders with its declared variables"""
+    templates = EmailTemplates(DEFAULT_TEMPLATE_DIR)
+    assert {'shortlist', 'reject', 'interview_invite', 'reminder'} <= set(templates.names())
+    subject, html = templates.render('shortlist', candidate_name='Jane Doe', job_title='Data Engineer')
+    assert subject == 'Congratulations! You have been shortlisted for Data Engineer'
+    assert 'Dear Jane Doe,' in html and '.container { max-width: 600px;' in html
+    assert not html.startswith('<!--')
+
+def test_variables_are_escaped_in_body_only():
+    """Test that candidate-supplied values cannot inject HTML"""
+    templates = EmailTemplates(DEFAULT_TEMPLATE_DIR)
+    subject, html = templates.render('reject', candidate_name='<b>Eve</b>', job_title='R&D')
+    assert '&lt;b&gt;Eve&lt;/b&gt;' in html and 'R&amp;D' in html
+    assert subject == 'Interview Results Update - R&D'
+
+def test_new_template_is_picked_up_from_directory(tmp_path):
+    """Test that a template file added to the directory is usable without code changes"""
+    (tmp_path / 'offer.html').write_text('<!-- subject: Offer for {{ job_title }} -->\n<p>Hi {{candidate_name}}, {{ salary }}</p>')
+    (tmp_path / 'notes.txt').write_text('ignored')
+    templates = EmailTemplates(str(tmp_path))
+    assert templates.names() == ['offer']
+    assert templates.render('offer', candidate_name='Jo', job_title='CTO', salary='100k') == ('Offer for CTO', '<p>Hi Jo, 100k</p>')
+    with pytest.raises(TemplateError, match='salary'):
+        templates.render('offer', candidate_name='Jo', job_title='CTO')
+    with pytest.raises(TemplateError):
+        templates.render('missing', candidate_name='Jo', job_title='CTO')
+
+def test_static_segments_are_shared():
+    """Test that rendering reuses the compiled static segments"""
+    text = CompiledText('<style>a { b }</style>{{ x }}!')
+    assert text.fields == ('x',)
+    first, second = text.render({'x': '1'}), text.render({'x': '2'})
+    assert (first, second) == ('<style>a { b }</style>1!', '<style>a { b }</style>2!')
+    assert text.parts[1] == 'x'
@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+import logging
+import os
+import re
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+import fetch_jobs
+
+LOGGER = logging.getLogger('test_fetch_jobs')
+
+def make_job(i, created_at):
+    return {'id': f'job-{i:02d}', 'title': f'Job {i}', 'description': 'Python, "quotes", commas',
+            'custom_questions': ['Why us?'] if i % 2 else [], 'created_at': created_at,
+            'updated_at': created_at}
+
+class FakeJobsQuery:
+    """Evaluates the PostgREST filters iter_job_pages builds against an in-memory table"""
+
+    def __init__(self, store):
+        self.store = store
+        self.filters = []
+        self.page_size = None
+
+    def select(self, columns):
+        return self
+
+    def order(self, column):
+        return self
+
+    def limit(self, n):
+        self.page_size = n
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda r: r[column] > value)
+        return self
+
+    def or_(self, expression):
+        created_at, same_created_at, job_id = (json.loads(v) for v in re.findall(r'\.(?:gt|eq)\.("[^"]*")', expression))
+        self.filters.append(lambda r: r['created_at'] > created_at
+                            or (r['created_at'] == same_created_at and r['id'] > job_id))
+        return self
+
+    def execute(self):
+        rows = sorted((r for r in self.store.rows if all(f(r) for f in self.filters)),
+                      key=lambda r: (r['created_at'], r['id']))
+        self.store.pages += 1
+        return type('Response', (), {'data': [dict(r) for r in rows[:self.page_size]]})()
+
+class FakeStore:
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.pages = 0
+
+    def table(self, name):
+        assert name == 'jobs'
+        return FakeJobsQuery(self)
+
+# Three jobs share a created_at so the keyset has to break ties on id
+JOBS = [make_job(1, '2024-06-01T00:00:00Z'), make_job(2, '2024-06-02T00:00:00Z'),
+        make_job(3, '2024-06-02T00:00:00Z'), make_job(4, '2024-06-02T00:00:00Z'),
+        make_job(5, '2024-06-03T00:00:00Z')]
+
+def test_pages_follow_the_keyset_across_ties():
+    """Test that every job is exported exactly once, in order, across page boundaries"""
+    store = FakeStore(reversed(JOBS))
+    pages = list(fetch_jobs.iter_job_pages(store, LOGGER, page_size=2))
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [row['id'] for page in pages for row in page] == [job['id'] for job in JOBS]
+
+def test_since_filter_and_empty_pages():
+    """Test that --since skips older jobs and an empty or exactly full last page ends the export"""
+    assert [r['id'] for r in fetch_jobs.iter_jobs(FakeStore(JOBS), LOGGER, 2, since='2024-06-01T00:00:00Z')] == \
+        ['job-02', 'job-03', 'job-04', 'job-05']
+    assert list(fetch_jobs.iter_job_pages(FakeStore([]), LOGGER, page_size=2)) == []
+
+    store = FakeStore(JOBS[:4])
+    assert len(list(fetch_jobs.iter_job_pages(store, LOGGER, page_size=2))) == 2
+    assert store.pages == 3  # the last request returns nothing
+
+    out = io.StringIO()
+    writer = fetch_jobs.TableWriter(out)
+    writer.close()
+    assert out.getvalue() == 'No jobs found.\n'
+
+def test_state_file_resumes_after_newest_export(tmp_path, monkeypatch):
+    """Test that a second run with the same state file exports only jobs created since the first"""
+    store = FakeStore(JOBS[:3])
+    monkeypatch.setattr(fetch_jobs, 'get_supabase_client', lambda logger: store)
+    state = str(tmp_path / 'state')
+    first, second = str(tmp_path / 'first.ndjson'), str(tmp_path / 'second.ndjson')
+
+    fetch_jobs.main(['--format', 'ndjson', '-o', first, '--state-file', state, '--page-size', '2'])
+    assert fetch_jobs.read_state(state) == ('2024-06-02T00:00:00Z', 'job-03')
+
+    # job-04 shares the saved created_at and must still be exported
+    store.rows = JOBS
+    fetch_jobs.main(['--format', 'ndjson', '-o', second, '--state-file', state, '--page-size', '2'])
+    with open(second, encoding='utf-8') as f:
+        assert [json.loads(line)['id'] for line in f] == ['job-04', 'job-05']
+    assert fetch_jobs.read_state(state) == ('2024-06-03T00:00:00Z', 'job-05')
+
+def test_legacy_state_file_does_not_skip_jobs(tmp_path):
+    """Test that a created_at-only state file resumes at that timestamp instead of after it"""
+    state = tmp_path / 'state'
+    state.write_text('2024-06-02T00:00:00Z')
+    after = fetch_jobs.read_state(str(state))
+    assert [r['id'] for r in fetch_jobs.iter_jobs(FakeStore(JOBS), LOGGER, 2, after=after)] == \
+        ['job-02', 'job-03', 'job-04', 'job-05']
+
+def write_rows(fmt, path):
+    writer, handle = fetch_jobs.open_writer(fmt, path)
+    for row in JOBS:
+        writer.write(row)
+    writer.close()
+    if handle is not None:
+        handle.close()
+
+def test_ndjson_and_csv_round_trip(tmp_path):
+    """Test that NDJSON and CSV exports read back to the exported rows"""
+    ndjson_path, csv_path = str(tmp_path / 'jobs.ndjson'), str(tmp_path / 'jobs.csv')
+    write_rows('ndjson', ndjson_path)
+    with open(ndjson_path, encoding='utf-8') as f:
+        assert [json.loads(line) for line in f] == JOBS
+
+    write_rows('csv', csv_path)
+    with open(csv_path, encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [dict(row, custom_questions=json.loads(row['custom_questions'])) for row in rows] == JOBS
+
+def test_parquet_round_trip(tmp_path):
+    """Test that the Parquet export reads back to the exported rows, as strings"""
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = str(tmp_path / 'jobs.parquet')
+    write_rows('parquet', path)
+    rows = pq.read_table(path).to_pylist()
+    assert [dict(row, custom_questions=json.loads(row['custom_questions'])) for row in rows] == JOBS
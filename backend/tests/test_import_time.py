@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Generous enough for slow CI machines; a cold import is ~250ms locally
+IMPORT_BUDGET_MS = float(os.getenv('IMPORT_BUDGET_MS', 1500))
+LAZY_MODULES = ('groq', 'httpx', 'PyPDF2', 'docx')
+
+
+def import_profile():
+    """Map each module imported by `import app` to its cumulative import time in microseconds"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            cwd=BACKEND, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_defers_heavy_dependencies():
+    """Test that importing the app loads no LLM, HTTP or document parsing libraries"""
+    times = import_profile()
+    assert 'app' in times
+    assert [name for name in LAZY_MODULES if name in times] == []
+
+
+def test_import_within_budget():
+    """Test that importing the app stays within the cold-start budget"""
+    times = import_profile()
+    assert times['app'] / 1000 < IMPORT_BUDGET_MS
+
+
+def test_import_and_health_check_start_no_background_work(tmp_path):
+    """Test that importing the app and serving /api/health start no threads and open no SQLite files"""
+    script = ("import threading, app\n"
+              "assert app.app.test_client().get('/api/health').status_code == 200\n"
+              "print(sorted(t.name for t in threading.enumerate()))")
+    env = dict(os.environ, LLM_PROVIDER='stub', SMTP_HOST='localhost', SMTP_PORT='25',
+               LLM_CACHE_BACKEND='sqlite', LLM_CACHE_PATH=str(tmp_path / 'llm.sqlite3'),
+               RESUME_CACHE_BACKEND='sqlite', RESUME_CACHE_PATH=str(tmp_path / 'resume.sqlite3'),
+               EMAIL_OUTBOX_PATH=str(tmp_path / 'outbox.sqlite3'), TRACE_EXPORTER='off')
+    result = subprocess.run([sys.executable, '-c', script], cwd=BACKEND, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "['MainThread']"
+    assert list(tmp_path.iterdir()) == []
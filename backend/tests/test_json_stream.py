@@ -0,0 +1,32 @@
+import json
+from json_stream import StreamingArrayParser, iter_array_items
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+def test_items_are_emitted_as_soon_as_they_complete():
+    """Test that each object is returned by the feed() call that completes it"""
+    parser = StreamingArrayParser('questions')
+    assert parser.feed('{"questions": [{"question": "What is') == []
+    assert parser.feed(' React?", "ideal_answer": "A library"}, {"quest') == [
+        {'question': 'What is React?', 'ideal_answer': 'A library'}
+    ]
+    assert parser.feed('ion": "b"}]}') == [{'question': 'b'}]
+    assert parser.done
+
+def test_handles_any_chunking_and_tricky_strings():
+    """Test braces, brackets and escaped quotes inside strings at every chunk size"""
+    payload = {'evaluations': [
+        {'score': 7, 'reason': 'Uses {braces} and [brackets]'},
+        {'score': 3, 'reason': 'Said "hi" \\ then left', 'tags': [{'a': 1}]},
+        {'score': 0, 'reason': ''},
+    ]}
+    text = 'Here you go:\n```json\n' + json.dumps(payload) + '\n```'
+    for size in (1, 2, 3, 7, 64):
+        items = list(iter_array_items(chunked(text, size), 'evaluations'))
+        assert items == payload['evaluations']
+
+def test_ignores_other_keys_and_malformed_items():
+    """Test that only the named array is parsed and bad items are skipped"""
+    text = '{"notes": [{"x": 1}], "questions": [{"question": "a"}, {bad}, {"question": "c"}]}'
+    assert list(iter_array_items(chunked(text, 5), 'questions')) == [{'question': 'a'}, {'question': 'c'}]
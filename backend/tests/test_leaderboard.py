@@ -0,0 +1,88 @@
+import pytest
+from leaderboard import MemoryLeaderboard, SupabaseLeaderboard
+
+def test_memory_top_and_rank_with_ties():
+    """Test ordering by score with ties broken by candidate id"""
+    board = MemoryLeaderboard()
+    for candidate, score in [('c', 7.0), ('a', 9.0), ('b', 7.0), ('d', 4.5)]:
+        board.record('job-1', candidate, score)
+    assert [(e['student_id'], e['rank']) for e in board.top('job-1', 3)] == [('a', 1), ('b', 2), ('c', 3)]
+    assert board.rank('job-1', 'c') == {'rank': 3, 'total': 4, 'percentile': 25.0, 'final_score': 7.0}
+    assert board.rank('job-1', 'zzz') is None
+    assert board.top('other-job') == []
+
+def test_memory_rescore_moves_candidate():
+    """Test that recording a new score replaces the old entry"""
+    board = MemoryLeaderboard()
+    board.record('job-1', 'a', 9.0)
+    board.record('job-1', 'b', 8.0)
+    board.record('job-1', 'a', 5.0)
+    assert [e['student_id'] for e in board.top('job-1')] == ['b', 'a']
+    assert board.rank('job-1', 'a')['total'] == 2
+
+def test_memory_rejects_scores_outside_the_table_check():
+    """Test that the memory backend rejects scores the job_leaderboard CHECK constraint would"""
+    board = MemoryLeaderboard()
+    for score in (-1, 12):
+        with pytest.raises(ValueError):
+            board.record('job-1', 'a', score)
+    assert board.top('job-1') == []
+
+def test_memory_score_at_percentile():
+    """Test the score threshold for a percentile"""
+    board = MemoryLeaderboard()
+    for i in range(10):
+        board.record('job-1', f'c{i}', float(i + 1))
+    assert board.score_at_percentile('job-1', 90) == 10.0
+    assert board.score_at_percentile('job-1', 50) == 6.0
+    assert board.score_at_percentile('job-1', 0) == 1.0
+    assert board.score_at_percentile('empty', 50) is None
+
+class CountingQuery:
+    def __init__(self, rows, log):
+        self.rows, self.log, self.filters, self.head = rows, log, [], False
+
+    def select(self, *columns, count=None, head=None):
+        self.head = bool(head)
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda r: r[column] == value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda r: r[column] > value)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda r: r[column] < value)
+        return self
+
+    def limit(self, n):
+        return self
+
+    def execute(self):
+        matched = [r for r in self.rows if all(f(r) for f in self.filters)]
+        self.log.append('count' if self.head else 'select')
+        return type('Response', (), {'data': [] if self.head else matched, 'count': len(matched)})()
+
+def test_supabase_rank_uses_counts_only():
+    """Test that rank lookups count rows instead of loading the leaderboard"""
+    rows = [{'job_id': 'j', 'student_id': s, 'final_score': score}
+            for s, score in [('a', 9.0), ('b', 7.0), ('c', 7.0), ('d', 4.0)]]
+    log = []
+    client = type('Client', (), {'table': lambda self, name: CountingQuery(rows, log)})()
+    rank = SupabaseLeaderboard(client).rank('j', 'c')
+    assert rank == {'rank': 3, 'total': 4, 'percentile': 25.0, 'final_score': 7.0}
+    assert log == ['select', 'count', 'count', 'count']
+
+def test_supabase_candidate_key_resolves_email_to_student_id():
+    """Test that candidates are ranked under their student id, never their email"""
+    student_id = '8f14e45f-ceea-4e7a-9d5c-1f2b3c4d5e6f'
+    rows = [{'id': student_id, 'email': 'jane@example.com'}]
+    client = type('Client', (), {'table': lambda self, name: CountingQuery(rows, [])})()
+    board = SupabaseLeaderboard(client)
+    assert board.candidate_key({'email': 'jane@example.com'}) == student_id
+    assert board.candidate_key({'email': 'unknown@example.com'}) is None
+    assert board.candidate_key({'id': 'jane@example.com'}) is None
+    assert board.candidate_key({'id': student_id.upper()}) == student_id
@@ -0,0 +1,65 @@
+import asyncio
+import time
+import pytest
+from llm_async import AsyncLLMClient
+
+class FakeLLMClient(AsyncLLMClient):
+    """AsyncLLMClient with the network call replaced by a short sleep"""
+
+    def __init__(self, delay=0.05, **kwargs):
+        super().__init__(api_key=None, model='fake-model', **kwargs)
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def _request(self, prompt, max_tokens, model=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if prompt == 'fail':
+                raise RuntimeError('boom')
+            return f'{prompt}:{max_tokens}'
+        finally:
+            self.active -= 1
+
+def test_gather_runs_prompts_concurrently():
+    """Test that fan-out takes roughly one round-trip instead of one per prompt"""
+    client = FakeLLMClient(delay=0.1, max_concurrency=8)
+    try:
+        started = time.perf_counter()
+        results = client.gather([(f'p{i}', 100) for i in range(6)])
+        elapsed = time.perf_counter() - started
+    finally:
+        client.close()
+    assert results == [f'p{i}:100' for i in range(6)]
+    assert elapsed < 0.4
+
+def test_semaphore_bounds_concurrency():
+    """Test that no more than max_concurrency requests are in flight"""
+    client = FakeLLMClient(delay=0.02, max_concurrency=2)
+    try:
+        client.gather([(f'p{i}', 10) for i in range(7)])
+    finally:
+        client.close()
+    assert client.peak == 2
+
+def test_failures_are_returned_in_place():
+    """Test that one failing prompt does not fail the whole fan-out"""
+    client = FakeLLMClient(delay=0.01)
+    try:
+        results = client.gather([('ok', 1), ('fail', 1), ('ok', 2)])
+        with pytest.raises(RuntimeError):
+            client.complete('fail')
+    finally:
+        client.close()
+    assert results[0] == 'ok:1'
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == 'ok:2'
+
+def test_close_drains_in_flight_calls():
+    """Test that close waits for submitted calls to finish before tearing down the loop"""
+    client = FakeLLMClient(delay=0.2)
+    futures = [client.submit(f'p{i}', 10) for i in range(3)]
+    client.close(drain_timeout=2)
+    assert [future.result(timeout=0) for future in futures] == ['p0:10', 'p1:10', 'p2:10']
@@ -0,0 +1,52 @@
+import time
+from llm_cache import MemoryCache, SQLiteCache, make_cache_key
+
+def test_cache_key_depends_on_all_parameters():
+    """Test that every completion parameter is part of the key"""
+    base = make_cache_key('model-a', 'prompt', 500, 0.7)
+    assert base == make_cache_key('model-a', 'prompt', 500, 0.7)
+    assert base != make_cache_key('model-b', 'prompt', 500, 0.7)
+    assert base != make_cache_key('model-a', 'prompt!', 500, 0.7)
+    assert base != make_cache_key('model-a', 'prompt', 501, 0.7)
+    assert base != make_cache_key('model-a', 'prompt', 500, 0.2)
+
+def test_memory_cache_lru_eviction():
+    """Test that the least recently used entry is evicted first"""
+    cache = MemoryCache(ttl_seconds=60, max_entries=2)
+    cache.set('a', '1')
+    cache.set('b', '2')
+    assert cache.get('a') == '1'
+    cache.set('c', '3')
+    assert cache.get('b') is None
+    assert cache.get('a') == '1'
+    assert cache.get('c') == '3'
+    stats = cache.stats()
+    assert stats['hits'] == 3
+    assert stats['misses'] == 1
+
+def test_memory_cache_ttl_expiry():
+    """Test that expired entries are not returned"""
+    cache = MemoryCache(ttl_seconds=0.01, max_entries=10)
+    cache.set('a', '1')
+    time.sleep(0.02)
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+def test_sqlite_cache_persists_and_evicts(tmp_path):
+    """Test that the on-disk cache survives reopening and honours max_entries"""
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = SQLiteCache(path, ttl_seconds=60, max_entries=2)
+    cache.set('a', '1')
+    time.sleep(0.01)
+    cache.set('b', '2')
+    time.sleep(0.01)
+    assert cache.get('a') == '1'
+    time.sleep(0.01)
+    cache.set('c', '3')
+
+    reopened = SQLiteCache(path, ttl_seconds=60, max_entries=2)
+    assert reopened.get('a') == '1'
+    assert reopened.get('b') is None
+    assert reopened.get('c') == '3'
+    reopened.delete('a')
+    assert reopened.get('a') is None
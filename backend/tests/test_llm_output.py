@@ -0,0 +1,51 @@
+import json
+import os
+import time
+import pytest
+from llm_output import OutputParseError, OutputParser, SCHEMAS, iter_candidates
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'llm_responses.json')
+
+with open(FIXTURES, encoding='utf-8') as f:
+    CORPUS = json.load(f)
+
+@pytest.mark.parametrize('case', CORPUS, ids=[case['note'] for case in CORPUS])
+def test_fixture_corpus(case):
+    """Test each recorded response parses (or is rejected) as expected"""
+    parser = OutputParser()
+    if case['ok']:
+        SCHEMAS[case['schema']].validate(parser.parse(case['response'], case['schema']))
+    else:
+        with pytest.raises(OutputParseError):
+            parser.parse(case['response'], case['schema'])
+
+def test_repair_is_only_requested_when_needed():
+    """Test that the model is asked to fix output only after local parsing fails"""
+    calls = []
+
+    def repair(text, schema, error):
+        calls.append((text, error))
+        return '{"score": 4, "reason": "Fixed"}'
+
+    parser = OutputParser()
+    assert parser.parse('```json\n{"score": 8, "reason": "ok"}\n```', 'score', repair=repair)['score'] == 8
+    assert calls == []
+    assert parser.parse('I give it a four', 'score', repair=repair) == {'score': 4, 'reason': 'Fixed'}
+    assert len(calls) == 1
+    stats = parser.stats()['score']
+    assert (stats['lenient'], stats['repaired'], stats['failed']) == (1, 1, 0)
+    assert stats['success_rate'] == 1.0
+
+def test_failed_repair_raises():
+    """Test that a repair that still does not parse surfaces as a parse error"""
+    parser = OutputParser()
+    with pytest.raises(OutputParseError):
+        parser.parse('nope', 'summary', repair=lambda text, schema, error: 'still nope')
+    assert parser.stats()['summary']['failed'] == 1
+
+def test_noisy_input_is_scanned_quickly():
+    """Test that pathological input does not make the scanner slow"""
+    text = '[' * 5000 + '"unterminated ' + '{' * 5000 + ', ' * 20000
+    started = time.perf_counter()
+    assert list(iter_candidates(text)) == []
+    assert time.perf_counter() - started < 1.0
@@ -0,0 +1,125 @@
+import time
+import pytest
+from llm_output import OutputParser
+from llm_router import LLMDeadlineExceeded, LLMRouter, Route, StubLLMClient
+from rate_limiter import RateLimitScheduler
+from prompts import build_evaluation_prompt, build_score_prompt
+
+SCORE_PROMPT = build_score_prompt('What is React?', 'A UI library', 'A library')
+
+def make_router(primary, fallback=None, **kwargs):
+    routes = [Route('primary', primary)] + ([Route('fallback', fallback)] if fallback else [])
+    return LLMRouter(routes, **kwargs)
+
+def test_slow_primary_is_hedged():
+    """Test that a hedged request to the fallback wins when the primary is slow"""
+    primary, fallback = StubLLMClient(latency=1.0), StubLLMClient(latency=0.01)
+    router = make_router(primary, fallback, hedge_initial_delay=0.05)
+    try:
+        started = time.perf_counter()
+        router.complete(SCORE_PROMPT, 100)
+        assert time.perf_counter() - started < 0.5
+    finally:
+        router.close()
+    stats = router.stats()['endpoints']['score']
+    assert stats['wins'] == {'fallback': 1}
+    assert (stats['hedges'], stats['hedge_wins']) == (1, 1)
+
+def test_failed_route_fails_over():
+    """Test that an error on the primary is retried on the next route immediately"""
+    router = make_router(StubLLMClient(fail=True), StubLLMClient(), hedge=False)
+    try:
+        assert router.complete(SCORE_PROMPT, 100)
+        results = router.gather([(SCORE_PROMPT, 100), ('plain prompt', 10)])
+        assert results[1] == 'stub response'
+        assert list(router.stream(SCORE_PROMPT, 100))
+    finally:
+        router.close()
+    stats = router.stats()['endpoints']['score']
+    assert stats['failovers'] == 3 and stats['wins'] == {'fallback': 3}
+
+def test_deadline_is_enforced():
+    """Test that no call outlives its deadline"""
+    router = make_router(StubLLMClient(latency=2.0), StubLLMClient(latency=2.0), deadline=0.1,
+                         hedge_initial_delay=0.02)
+    try:
+        started = time.perf_counter()
+        with pytest.raises(LLMDeadlineExceeded):
+            router.complete(SCORE_PROMPT, 100)
+        assert time.perf_counter() - started < 0.5
+    finally:
+        router.close()
+    assert router.stats()['endpoints']['score']['deadline_exceeded'] == 1
+
+def test_hedge_delay_follows_observed_p95():
+    """Test that once enough samples exist, hedging waits for the route's p95 latency"""
+    primary = StubLLMClient(latency=0.01)
+    router = make_router(primary, hedge_initial_delay=None, hedge_min_delay=0.001, min_samples=5)
+    try:
+        assert router.hedge_delay('score', router.routes[0]) is None
+        for _ in range(5):
+            router.complete(SCORE_PROMPT, 100)
+    finally:
+        router.close()
+    assert 0.005 < router.hedge_delay('score', router.routes[0]) < 0.2
+    # Other endpoints on the same route keep their own samples
+    assert router.hedge_delay('question_batch', router.routes[0]) is None
+
+class RateLimitedStub(StubLLMClient):
+    """Answers every request with a 429"""
+
+    async def _request(self, prompt, max_tokens, model=None):
+        self.calls += 1
+        error = RuntimeError('Rate limit reached')
+        error.status_code = 429
+        raise error
+
+def test_rate_limit_backs_off_instead_of_failing_over_to_same_route():
+    """Test that a 429 pauses the scheduler and is raised when no other healthy route exists"""
+    primary = RateLimitedStub()
+    scheduler = RateLimitScheduler(requests_per_minute=0)
+    router = make_router(primary, hedge=False, scheduler=scheduler, rate_limit_cooldown=30)
+    try:
+        # As app.call_groq_api calls it: the 30s pause outlasts the deadline, so the 429 is raised at once
+        with pytest.raises(RuntimeError):
+            scheduler.call(lambda: router.complete(SCORE_PROMPT, 100), timeout=5, penalize=False)
+    finally:
+        router.close()
+    assert primary.calls == 1
+    # Paused once, by the router
+    assert scheduler.stats()['throttled'] == 1 and scheduler.stats()['retries'] == 0
+    assert not router.healthy(router.routes[0])
+    assert router.stats()['endpoints']['score']['rate_limited'] == 1
+
+def test_hedges_and_failovers_are_charged_to_the_scheduler():
+    """Test that extra attempts take scheduler budget and hedges are skipped when none is free"""
+    scheduler = RateLimitScheduler(requests_per_minute=0, tokens_per_minute=10000)
+    router = make_router(StubLLMClient(fail=True), StubLLMClient(), hedge=False, scheduler=scheduler)
+    try:
+        assert router.complete(SCORE_PROMPT, 100)
+    finally:
+        router.close()
+    assert scheduler.stats()['admitted'] == 1
+
+    scheduler = RateLimitScheduler(requests_per_minute=1)
+    scheduler.acquire()
+    router = make_router(StubLLMClient(latency=0.2), StubLLMClient(), hedge_initial_delay=0.01, scheduler=scheduler)
+    try:
+        assert router.complete(SCORE_PROMPT, 100)
+    finally:
+        router.close()
+    stats = router.stats()['endpoints']['score']
+    assert (stats['hedges'], stats['hedges_skipped']) == (0, 1)
+    assert stats['wins'] == {'primary': 1}
+
+def test_stub_answers_parse():
+    """Test that the stub's canned answers satisfy the output schemas"""
+    stub = StubLLMClient()
+    parser = OutputParser()
+    questions = [{'question': 'Q1', 'candidate_answer': 'A1'}, {'question': 'Q2', 'candidate_answer': 'A2'}]
+    try:
+        evaluations = parser.parse(stub.complete(build_evaluation_prompt(questions, 'Dev')), 'evaluation')
+        assert len(evaluations['evaluations']) == 2
+        assert parser.parse(stub.complete(SCORE_PROMPT), 'score') == parser.parse(stub.complete(SCORE_PROMPT), 'score')
+    finally:
+        stub.close()
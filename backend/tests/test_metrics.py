@@ -0,0 +1,47 @@
+import pytest
+from metrics import Counter, Gauge, Histogram, Registry
+
+def test_counter_renders_labels_in_declared_order():
+    """Test that counters render one escaped sample per label set"""
+    counter = Counter('test_events_total', 'Events', ('endpoint', 'reason'))
+    counter.inc('score', 'llm_error')
+    counter.inc('score', 'llm_error', amount=2)
+    counter.inc('summary', 'say "hi"')
+    text = counter.render()
+    assert '# TYPE test_events_total counter' in text
+    assert 'test_events_total{endpoint="score",reason="llm_error"} 3' in text
+    assert 'test_events_total{endpoint="summary",reason="say \\"hi\\""} 1' in text
+
+def test_histogram_buckets_are_cumulative():
+    """Test that histogram buckets, sum and count follow the Prometheus format"""
+    histogram = Histogram('test_seconds', 'Latency', ('route',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, '/api/score')
+    lines = histogram.render().splitlines()
+    assert 'test_seconds_bucket{route="/api/score",le="0.1"} 2' in lines
+    assert 'test_seconds_bucket{route="/api/score",le="1"} 3' in lines
+    assert 'test_seconds_bucket{route="/api/score",le="+Inf"} 4' in lines
+    assert 'test_seconds_sum{route="/api/score"} 3.65' in lines
+    assert 'test_seconds_count{route="/api/score"} 4' in lines
+
+def test_gauge_goes_up_and_down():
+    """Test that gauges can be set and moved in both directions"""
+    gauge = Gauge('test_depth', 'Depth', ('priority',))
+    gauge.inc('interactive')
+    gauge.inc('interactive', amount=2)
+    gauge.inc('interactive', amount=-1)
+    gauge.set(4, 'background')
+    text = gauge.render()
+    assert '# TYPE test_depth gauge' in text
+    assert 'test_depth{priority="interactive"} 2' in text
+    assert 'test_depth{priority="background"} 4' in text
+
+def test_label_count_and_reregistration_are_checked():
+    """Test that wrong label counts fail and re-registering returns the live metric"""
+    registry = Registry()
+    counter = registry.register(Counter('test_total', 'Total', ('a',)))
+    with pytest.raises(ValueError):
+        counter.inc('x', 'y')
+    assert registry.register(Counter('test_total', 'Total', ('a',))) is counter
+    with pytest.raises(ValueError):
+        registry.register(Histogram('test_total', 'Total', ('a',)))
@@ -0,0 +1,38 @@
+from prompts import (EVALUATION_SYSTEM, Prompt, PromptStats, build_evaluation_prompt, build_score_batch_prompt,
+                     build_summary_prompt, clip, prompt_tokens, to_messages)
+
+QUESTIONS = [
+    {'question': 'What is React?', 'ideal_answer': 'A UI library', 'candidate_answer': 'A library', 'difficulty': 'easy'},
+    {'question': 'Explain useEffect', 'ideal_answer': 'Side effects', 'candidate_answer': '', 'difficulty': 'medium'},
+]
+
+def test_static_instructions_are_shared_across_requests():
+    """Test that only the user message varies, so the system prefix can be cached"""
+    first = build_evaluation_prompt(QUESTIONS, 'Frontend Developer')
+    second = build_evaluation_prompt(QUESTIONS[:1], 'Data Engineer')
+    assert first.system is second.system is EVALUATION_SYSTEM
+    assert 'Frontend Developer' in first.user and 'Frontend Developer' not in first.system
+    assert 'Question 2 (Difficulty: MEDIUM)' in first.user
+    assert [m['role'] for m in to_messages(first)] == ['system', 'user']
+    assert to_messages('plain') == [{'role': 'user', 'content': 'plain'}]
+
+def test_user_fields_are_clipped():
+    """Test that an oversized answer cannot inflate the prompt without bound"""
+    items = [{'question': 'Q', 'ideal': 'I', 'candidate_answer': 'x' * 50000}]
+    prompt = build_score_batch_prompt(items)
+    assert len(prompt.user) < 10000 and '[truncated]' in prompt.user
+    assert clip('short') == 'short' and clip(None) == ''
+
+def test_prompt_stats_per_endpoint():
+    """Test that token estimates are aggregated per prompt type"""
+    stats = PromptStats()
+    summary = build_summary_prompt([{'question': 'Q', 'candidate_answer': 'A', 'score': 7}], 'Jane', 'Dev', 7.0, 'good')
+    stats.record(summary)
+    stats.record(summary)
+    stats.record('legacy prompt text')
+    report = stats.stats()
+    assert report['summary']['calls'] == 2
+    assert report['summary']['max_prompt_tokens'] == prompt_tokens(summary)
+    assert 0 < report['summary']['system_share'] < 1
+    assert report['other']['system_tokens'] == 0
+    assert prompt_tokens(Prompt('x', 'a' * 400, 'b' * 40)) == 110
@@ -0,0 +1,95 @@
+import threading
+import time
+from question_pool import QuestionPool
+
+DIFFICULTIES = ['easy', 'easy', 'medium', 'medium', 'hard', 'hard']
+
+def make_generator(calls):
+    lock = threading.Lock()
+
+    def generate(job_context, job_description, custom_questions):
+        with lock:
+            calls.append((job_context, tuple(custom_questions)))
+            n = len(calls)
+        return [
+            {'question': f'{job_context} q{n}-{i}', 'ideal_answer': 'ideal', 'difficulty': d}
+            for i, d in enumerate(DIFFICULTIES)
+        ]
+    return generate
+
+def test_pool_serves_randomized_set_after_warm_up():
+    """Test that a warmed pool serves a full question set without generating on demand"""
+    calls = []
+    pool = QuestionPool(make_generator(calls), target_per_difficulty=4, low_watermark=2)
+    assert pool.draw('job-1', DIFFICULTIES) is None
+
+    pool.warm('job-1', 'Backend Developer', 'Python APIs')
+    pool.shutdown(wait=True)
+
+    questions = pool.draw('job-1', DIFFICULTIES)
+    assert [q['difficulty'] for q in questions] == DIFFICULTIES
+    assert len({q['question'] for q in questions}) == 6
+    assert len(calls) == 2  # two batches of 2 per difficulty reach the target of 4
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline, 'timed out waiting for question pool'
+        time.sleep(0.005)
+
+def test_pool_refills_when_low():
+    """Test that drawing below the low watermark triggers a background refill"""
+    calls = []
+    pool = QuestionPool(make_generator(calls), target_per_difficulty=2, low_watermark=2, max_workers=1)
+    pool.warm('job-1', 'Frontend Developer')
+    wait_for(lambda: pool.stats()['available']['job-1']['hard'] == 2)
+    assert len(calls) == 1
+
+    assert pool.draw('job-1', DIFFICULTIES) is not None
+    wait_for(lambda: pool.stats()['available']['job-1']['hard'] == 2)
+    assert len(calls) == 2
+    assert pool.draw('job-1', DIFFICULTIES) is not None
+    pool.shutdown(wait=True)
+
+def test_changed_custom_questions_replace_pool():
+    """Test that changing a job's custom questions discards stale questions"""
+    calls = []
+    pool = QuestionPool(make_generator(calls), target_per_difficulty=2, low_watermark=1, max_workers=1)
+    pool.warm('job-1', 'Developer', custom_questions=['React?'])
+    pool.warm('job-1', 'Developer', custom_questions=['Kubernetes?'])
+    pool.shutdown(wait=True)
+    assert calls[-1] == ('Developer', ('Kubernetes?',))
+    # replace=False keeps whatever is already registered
+    pool.warm('job-1', 'Something else', replace=False)
+    assert pool._pools['job-1'].custom_questions == ['Kubernetes?']
+
+def test_pools_and_refills_are_bounded():
+    """Test that varying job text cannot grow the pool store or the refill queue without limit"""
+    release = threading.Event()
+    calls = []
+    generate = make_generator(calls)
+
+    def blocking_generate(*args):
+        release.wait(2)
+        return generate(*args)
+
+    pool = QuestionPool(blocking_generate, target_per_difficulty=2, low_watermark=1, max_workers=1,
+                        max_jobs=3, max_pending_refills=2)
+    for i in range(10):
+        pool.warm(f'job-{i}', f'Developer {i}')
+    stats = pool.stats()
+    assert stats['jobs'] == 3 and stats['evicted'] == 7
+    assert stats['refills_running'] <= 2 and stats['refills_deferred'] >= 1
+    release.set()
+    pool.shutdown(wait=True)
+    # Refills of evicted pools stop before generating
+    assert len(calls) <= 2
+
+def test_unused_pools_expire():
+    """Test that pools unused for longer than the TTL are dropped"""
+    pool = QuestionPool(make_generator([]), target_per_difficulty=2, low_watermark=1, ttl_seconds=0.05)
+    pool.warm('job-1', 'Developer')
+    pool.shutdown(wait=True)
+    time.sleep(0.1)
+    assert pool.draw('job-1', DIFFICULTIES) is None
+    assert pool.stats()['jobs'] == 0
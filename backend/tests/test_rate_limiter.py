@@ -0,0 +1,118 @@
+import threading
+import time
+import pytest
+from rate_limiter import (RateLimitScheduler, TokenBucket, QueueFullError, DeadlineExceededError,
+                          PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, LLM_QUEUE_DEPTH, LLM_QUEUE_WAIT_SECONDS,
+                          LLM_SCHEDULER_EVENTS)
+
+class FakeRateLimit(Exception):
+    status_code = 429
+
+def test_token_bucket_refills_over_time():
+    """Test that a drained bucket reports the time until enough tokens are back"""
+    bucket = TokenBucket(per_minute=60)
+    now = bucket.updated
+    assert bucket.time_until(60, now) == 0
+    bucket.take(60, now)
+    assert bucket.time_until(1, now) == pytest.approx(1.0)
+    assert bucket.time_until(1, now + 1.0) == 0
+    assert TokenBucket(per_minute=0).time_until(10 ** 6, now) == 0
+
+def test_higher_priority_is_admitted_first():
+    """Test that interactive callers overtake queued background callers"""
+    scheduler = RateLimitScheduler(requests_per_minute=600)  # one request every 0.1s
+    scheduler.acquire(requests=600)  # drain the bucket
+    order = []
+
+    def waiter(name, priority):
+        scheduler.acquire(priority=priority, timeout=5)
+        order.append(name)
+
+    background = threading.Thread(target=waiter, args=('background', PRIORITY_BACKGROUND))
+    background.start()
+    time.sleep(0.02)
+    interactive = threading.Thread(target=waiter, args=('interactive', PRIORITY_INTERACTIVE))
+    interactive.start()
+    background.join()
+    interactive.join()
+    assert order == ['interactive', 'background']
+    assert scheduler.stats()['wait_seconds_max'] > 0
+
+def test_queue_bound_and_deadline():
+    """Test that callers are rejected when the queue is full or their deadline passes"""
+    scheduler = RateLimitScheduler(requests_per_minute=1, max_queue=1)
+    scheduler.acquire()
+    with pytest.raises(DeadlineExceededError):
+        scheduler.acquire(timeout=0.05)
+
+    blocker = threading.Thread(target=lambda: pytest.raises(DeadlineExceededError, scheduler.acquire, timeout=0.3))
+    blocker.start()
+    time.sleep(0.05)
+    with pytest.raises(QueueFullError):
+        scheduler.acquire(timeout=0.05)
+    blocker.join()
+    stats = scheduler.stats()
+    assert stats['rejected'] == 1
+    assert stats['deadline_exceeded'] == 2
+
+def test_call_retries_provider_429():
+    """Test that 429 responses are retried with backoff and other errors are not"""
+    scheduler = RateLimitScheduler(requests_per_minute=0, backoff_base=0.01)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise FakeRateLimit('slow down')
+        return 'ok'
+
+    assert scheduler.call(flaky, timeout=5) == 'ok'
+    assert scheduler.stats()['retries'] == 2
+
+    with pytest.raises(ValueError):
+        scheduler.call(lambda: (_ for _ in ()).throw(ValueError('bad')), timeout=5)
+
+class RetryAfterRateLimit(FakeRateLimit):
+    response = type('Response', (), {'headers': {'retry-after': '10'}})()
+
+def test_call_fails_fast_when_retry_after_passes_the_deadline():
+    """Test that a Retry-After beyond the caller's deadline raises at once instead of sleeping past it"""
+    scheduler = RateLimitScheduler(requests_per_minute=0, backoff_base=0.01)
+    started = time.monotonic()
+    with pytest.raises(RetryAfterRateLimit):
+        scheduler.call(lambda: (_ for _ in ()).throw(RetryAfterRateLimit('slow down')), timeout=1)
+    assert time.monotonic() - started < 0.5
+    assert scheduler.stats()['retries'] == 0
+    assert scheduler.paused_for() > 9
+
+def test_call_without_penalize_leaves_the_pause_to_fn():
+    """Test that penalize=False retries without pausing the scheduler a second time"""
+    scheduler = RateLimitScheduler(requests_per_minute=0, backoff_base=0.01)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 2:
+            scheduler.penalize(0.01)  # what LLMRouter does on a 429
+            raise FakeRateLimit('slow down')
+        return 'ok'
+
+    assert scheduler.call(flaky, timeout=5, penalize=False) == 'ok'
+    assert scheduler.stats()['throttled'] == 1 and scheduler.stats()['retries'] == 1
+
+def test_queue_metrics_are_exported():
+    """Test that queue depth, wait time and 429 backoffs reach the Prometheus registry"""
+    scheduler = RateLimitScheduler(requests_per_minute=600)
+    scheduler.acquire(requests=600)
+    waits = LLM_QUEUE_WAIT_SECONDS.count('background')
+    throttled = LLM_SCHEDULER_EVENTS.value('throttled')
+    depth = []
+    waiter = threading.Thread(target=scheduler.acquire, kwargs={'priority': PRIORITY_BACKGROUND, 'timeout': 5})
+    waiter.start()
+    time.sleep(0.02)
+    depth.append(LLM_QUEUE_DEPTH.value('background'))
+    waiter.join()
+    scheduler.penalize(0.01)
+    assert depth[0] >= 1 and LLM_QUEUE_DEPTH.value('background') == depth[0] - 1
+    assert LLM_QUEUE_WAIT_SECONDS.count('background') == waits + 1
+    assert LLM_SCHEDULER_EVENTS.value('throttled') == throttled + 1
@@ -0,0 +1,36 @@
+from llm_cache import MemoryCache, SQLiteCache
+from resume_cache import ResumeCache, file_digest, new_hasher
+
+INFO = {'name': 'Jane Smith', 'email': 'jane.smith@example.com', 'phone': None}
+
+def test_memory_hit_and_fields_only_fallback():
+    """Test that a full parse is reused for later full and fields_only requests"""
+    cache = ResumeCache(MemoryCache(max_entries=4))
+    assert cache.get('abc') is None
+    cache.set('abc', 'resume text', INFO)
+    assert cache.get('abc') == ('resume text', INFO)
+    assert cache.get('abc', fields_only=True) == ('resume text', INFO)
+
+def test_fields_only_entry_does_not_serve_full_request():
+    """Test that a truncated fields_only parse is never returned as the full text"""
+    cache = ResumeCache(MemoryCache())
+    cache.set('abc', 'partial', INFO, fields_only=True)
+    assert cache.get('abc', fields_only=True) == ('partial', INFO)
+    assert cache.get('abc') is None
+
+def test_disk_tier_survives_new_memory_tier(tmp_path):
+    """Test that entries on disk are found by a fresh process and promoted to memory"""
+    path = str(tmp_path / 'resume_cache.sqlite3')
+    ResumeCache(MemoryCache(), SQLiteCache(path, table='resume_cache')).set('abc', 'resume text', INFO)
+    cache = ResumeCache(MemoryCache(), SQLiteCache(path, table='resume_cache'))
+    assert cache.get('abc') == ('resume text', INFO)
+    assert len(cache.memory) == 1
+
+def test_file_digest_matches_streaming_hasher(tmp_path):
+    """Test that hashing a file on disk matches hashing it chunk by chunk while spooling"""
+    path = tmp_path / 'resume.pdf'
+    path.write_bytes(b'%PDF' * 50000)
+    hasher = new_hasher()
+    hasher.update(b'%PDF' * 25000)
+    hasher.update(b'%PDF' * 25000)
+    assert file_digest(str(path)) == hasher.hexdigest()
@@ -0,0 +1,61 @@
+import io
+import os
+import pytest
+import resume_parser
+from resume_fixtures import make_pdf, make_docx, SAMPLE_HEADER
+
+def test_spool_upload_enforces_size_limit():
+    """Test that uploads are copied to disk and oversized ones are rejected"""
+    path = resume_parser.spool_upload(io.BytesIO(b'x' * 1000), max_bytes=1000, suffix='.pdf')
+    try:
+        assert os.path.getsize(path) == 1000
+    finally:
+        os.unlink(path)
+    with pytest.raises(resume_parser.FileTooLargeError):
+        resume_parser.spool_upload(io.BytesIO(b'x' * 1001), max_bytes=1000)
+
+def test_pdf_pages_are_streamed_and_capped():
+    """Test that PDF text is produced page by page and stops at the page cap"""
+    pdf = make_pdf([SAMPLE_HEADER] + [[f'Experience page {i}'] for i in range(1, 5)])
+    chunks = list(resume_parser.iter_pdf_chunks(io.BytesIO(pdf), max_pages=3))
+    assert len(chunks) == 3
+    assert 'jane.smith@example.com' in chunks[0]
+    assert 'Experience page 2' in chunks[2]
+
+def test_join_chunks_caps_characters():
+    """Test the character cap on joined text"""
+    assert resume_parser.join_chunks(['abc', 'def'], max_chars=10) == ('abcdef', False)
+    assert resume_parser.join_chunks(['abc', 'def', 'ghi'], max_chars=5) == ('abcde', True)
+
+def test_fields_only_stops_after_contact_fields(tmp_path):
+    """Test that early-stop parsing does not read pages past the contact details"""
+    pdf = make_pdf([SAMPLE_HEADER] + [[f'Project {i}'] for i in range(1, 6)])
+    path = tmp_path / 'resume.pdf'
+    path.write_bytes(pdf)
+
+    text, info = resume_parser.parse_resume_file(str(path), '.pdf', fields_only=True)
+    assert info['email'] == 'jane.smith@example.com'
+    assert info['phone']
+    assert 'Project 1' not in text
+
+    full_text, full_info = resume_parser.parse_resume_file(str(path), '.pdf')
+    assert 'Project 5' in full_text
+    assert full_info['email'] == info['email']
+
+def test_early_extraction_scans_each_chunk_once(monkeypatch):
+    """Test that early extraction over a long document scans every character at most once"""
+    import contact_extractor
+    scanned = []
+    scan = contact_extractor._scan
+    monkeypatch.setattr(contact_extractor, '_scan', lambda text, *args: scanned.append(len(text)) or scan(text, *args))
+    paragraphs = [f'Paragraph {i} about distributed systems and Python.\n' for i in range(3000)]
+
+    text, info = resume_parser.extract_contact_info_early(iter(paragraphs))
+    assert len(text) == sum(map(len, paragraphs))
+    assert info['email'] is None
+    assert sum(scanned) <= len(text)
+
+def test_docx_extraction():
+    """Test DOCX text extraction"""
+    text = resume_parser.extract_text_from_docx(io.BytesIO(make_docx(SAMPLE_HEADER + ['Skills: Python'])))
+    assert text.splitlines() == SAMPLE_HEADER + ['Skills: Python']
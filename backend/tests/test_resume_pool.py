@@ -0,0 +1,117 @@
+import threading
+import time
+import pytest
+import resume_pool
+from resume_pool import ResumeParsePool, PoolBusyError, ParseTimeoutError
+from resume_fixtures import make_pdf, SAMPLE_HEADER
+from resume_parser import parse_resume_document
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / 'resume.pdf'
+    path.write_bytes(make_pdf([SAMPLE_HEADER, ['Skills: Python, Flask']]))
+    return str(path)
+
+def test_parse_in_worker_process(pdf_path):
+    """Test that parsing in a worker process returns the same result as in-thread parsing"""
+    pool = ResumeParsePool(max_workers=1, max_tasks_per_child=1)
+    try:
+        first = pool.parse(pdf_path, '.pdf')
+        second = pool.parse(pdf_path, '.pdf')  # served by a recycled worker
+    finally:
+        pool.shutdown()
+    inline = ResumeParsePool(max_workers=0).parse(pdf_path, '.pdf')
+    assert first == second == inline
+    assert first[1]['email'] == 'jane.smith@example.com'
+
+def test_rejects_when_queue_is_full(pdf_path, monkeypatch):
+    """Test that callers beyond max_pending are rejected instead of queued"""
+    release = threading.Event()
+    entered = threading.Event()
+
+    def slow_parse(path, file_ext, fields_only=False):
+        entered.set()
+        release.wait(5)
+        return '', {}, 0
+
+    monkeypatch.setattr(resume_pool, 'parse_resume_document', slow_parse)
+    pool = ResumeParsePool(max_workers=0, max_pending=1)
+    worker = threading.Thread(target=pool.parse, args=(pdf_path, '.pdf'))
+    worker.start()
+    entered.wait(5)
+    with pytest.raises(PoolBusyError):
+        pool.parse(pdf_path, '.pdf')
+    release.set()
+    worker.join()
+    assert pool.stats()['rejected'] == 1
+
+def test_waiting_caller_gets_the_next_free_slot(pdf_path, monkeypatch):
+    """Test that a caller passing wait queues for a slot instead of being rejected"""
+    release = threading.Event()
+    entered = threading.Event()
+
+    def slow_parse(path, file_ext, fields_only=False):
+        entered.set()
+        release.wait(5)
+        return 'text', {}, 0
+
+    monkeypatch.setattr(resume_pool, 'parse_resume_document', slow_parse)
+    pool = ResumeParsePool(max_workers=0, max_pending=1)
+    worker = threading.Thread(target=pool.parse, args=(pdf_path, '.pdf'))
+    worker.start()
+    entered.wait(5)
+    with pytest.raises(PoolBusyError):
+        pool.parse(pdf_path, '.pdf', wait=0.05)
+    threading.Timer(0.05, release.set).start()
+    assert pool.parse(pdf_path, '.pdf', wait=5) == ('text', {})
+    worker.join()
+    assert pool.stats()['rejected'] == 1 and pool.stats()['completed'] == 2
+
+def hang_on_marked_files(path, file_ext, fields_only=False):
+    """Runs in the worker processes, so it has to be importable at module level"""
+    if 'hang' in path:
+        time.sleep(60)
+    return parse_resume_document(path, file_ext, fields_only)
+
+def test_timeout_spares_concurrent_parses(tmp_path, pdf_path, monkeypatch):
+    """Test that a parse lost when a hung parse restarts the pool is retried instead of failing"""
+    hang_path = tmp_path / 'hang.pdf'
+    hang_path.write_bytes(make_pdf([SAMPLE_HEADER]))
+    monkeypatch.setattr(resume_pool, 'parse_resume_document', hang_on_marked_files)
+    # One worker: the normal parse is queued behind the hung one and cancelled by its restart
+    pool = ResumeParsePool(max_workers=1, task_timeout=3)
+    results = {}
+
+    def parse(name, path):
+        try:
+            results[name] = pool.parse(path, '.pdf')
+        except Exception as e:
+            results[name] = e
+
+    hung = threading.Thread(target=parse, args=('hung', str(hang_path)))
+    normal = threading.Thread(target=parse, args=('normal', pdf_path))
+    try:
+        hung.start()
+        time.sleep(0.5)
+        normal.start()
+        hung.join(30)
+        normal.join(30)
+    finally:
+        pool.shutdown()
+    assert isinstance(results['hung'], ParseTimeoutError)
+    assert results['normal'][1]['email'] == 'jane.smith@example.com'
+    assert pool.stats()['restarts'] == 1 and pool.stats()['retried'] == 1
+
+def test_timeout_restarts_pool(tmp_path):
+    """Test that a task exceeding the timeout fails fast and the pool recovers"""
+    pool = ResumeParsePool(max_workers=1, task_timeout=0.0001)
+    path = tmp_path / 'resume.pdf'
+    path.write_bytes(make_pdf([SAMPLE_HEADER] * 3))
+    try:
+        with pytest.raises(ParseTimeoutError):
+            pool.parse(str(path), '.pdf')
+        assert pool.stats()['restarts'] == 1
+        pool.task_timeout = 30
+        assert pool.parse(str(path), '.pdf')[1]['email'] == 'jane.smith@example.com'
+    finally:
+        pool.shutdown()
@@ -0,0 +1,57 @@
+import threading
+import pytest
+from score_batcher import ScoreBatcher
+
+def test_concurrent_requests_share_one_batch():
+    """Test that requests arriving within the window are graded together and demultiplexed"""
+    calls = []
+
+    def grade(items):
+        calls.append(len(items))
+        return [{'score': len(item['candidate_answer']), 'reason': item['question']} for item in items]
+
+    batcher = ScoreBatcher(grade, max_batch_size=16, max_wait_ms=100)
+    results = {}
+
+    def worker(i):
+        results[i] = batcher.score({'question': f'q{i}', 'ideal': '', 'candidate_answer': 'x' * i}, timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(1, 9)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.shutdown()
+
+    assert sum(calls) == 8
+    assert len(calls) < 8
+    for i in range(1, 9):
+        assert results[i] == {'score': i, 'reason': f'q{i}'}
+
+def test_batch_size_limit():
+    """Test that a full batch is dispatched without waiting for the window"""
+    calls = []
+    batcher = ScoreBatcher(lambda items: calls.append(len(items)) or [{'score': 5}] * len(items),
+                           max_batch_size=3, max_wait_ms=1000)
+    futures = [batcher.submit({'question': 'q', 'ideal': '', 'candidate_answer': 'a'}) for _ in range(3)]
+    assert all(f.result(timeout=0.5) == {'score': 5} for f in futures)
+    batcher.shutdown()
+    assert calls == [3]
+
+def test_failures_propagate_to_waiting_requests():
+    """Test that a failed or short batch fails only the affected requests"""
+    batcher = ScoreBatcher(lambda items: [{'score': 9, 'reason': 'ok'}], max_batch_size=2, max_wait_ms=200)
+    first = batcher.submit({'question': 'a', 'ideal': '', 'candidate_answer': 'a'})
+    second = batcher.submit({'question': 'b', 'ideal': '', 'candidate_answer': 'b'})
+    assert first.result(timeout=1) == {'score': 9, 'reason': 'ok'}
+    with pytest.raises(ValueError):
+        second.result(timeout=1)
+    batcher.shutdown()
+
+    def boom(items):
+        raise RuntimeError('rate limited')
+
+    batcher = ScoreBatcher(boom, max_wait_ms=1)
+    with pytest.raises(RuntimeError):
+        batcher.score({'question': 'a', 'ideal': '', 'candidate_answer': 'a'}, timeout=1)
+    batcher.shutdown()
@@ -0,0 +1,64 @@
+import json
+import logging
+import time
+import tracing
+from tracing import OTLPFileExporter, Tracer
+
+class ListExporter:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, trace):
+        self.traces.append(trace)
+
+    def close(self):
+        pass
+
+def test_spans_nest_and_are_noops_outside_a_trace():
+    """Test that spans parent to the enclosing span and record nothing without a trace"""
+    with tracing.span('orphan') as orphan:
+        assert orphan is None
+    exporter = ListExporter()
+    tracer = Tracer(exporter, sample_rate=1.0)
+    trace = tracer.start('POST /api/score', request_id='req-1')
+    with tracing.span('llm.call', endpoint='score') as outer:
+        with tracing.span('llm.parse') as inner:
+            pass
+    tracer.finish(trace, status=200)
+    assert tracing.current_trace() is None
+    assert exporter.traces == [trace]
+    assert trace.request_id == 'req-1'
+    assert inner.parent_id == outer.span_id
+    assert outer.parent_id == trace.root.span_id
+
+def test_unsampled_fast_requests_are_not_exported():
+    """Test that only sampled, slow or failed traces reach the exporter"""
+    exporter = ListExporter()
+    tracer = Tracer(exporter, sample_rate=0.0, slow_ms=10000)
+    tracer.finish(tracer.start('GET /api/health'))
+    assert exporter.traces == []
+    failed = tracer.start('POST /api/summary')
+    tracer.finish(failed, error=True)
+    assert exporter.traces == [failed]
+
+def test_slow_request_is_logged_and_exported_as_otlp(tmp_path, caplog):
+    """Test that a slow request writes a warning and an OTLP/JSON line"""
+    path = tmp_path / 'traces.jsonl'
+    tracer = Tracer(OTLPFileExporter(str(path)), sample_rate=0.0, slow_ms=5)
+    trace = tracer.start('POST /api/evaluate-answers', request_id='bad id with spaces')
+    with tracing.span('llm.call', max_tokens=1500):
+        time.sleep(0.01)
+    with caplog.at_level(logging.WARNING, logger='tracing'):
+        tracer.finish(trace, status=200)
+    tracer.close()
+    assert 'Slow request POST /api/evaluate-answers' in caplog.text
+    assert 'llm.call=' in caplog.text
+    
+    spans = json.loads(path.read_text())['resourceSpans'][0]['scopeSpans'][0]['spans']
+    root, child = spans
+    # Malformed request ids are replaced by the trace id
+    assert trace.request_id == trace.trace_id
+    assert root['traceId'] == child['traceId'] == trace.trace_id
+    assert child['parentSpanId'] == root['spanId']
+    assert {'key': 'max_tokens', 'value': {'intValue': '1500'}} in child['attributes']
+    assert int(child['endTimeUnixNano']) - int(child['startTimeUnixNano']) >= 10 ** 7
@@ -0,0 +1,299 @@
+"""
+Lightweight request tracing.
+
+Every request gets a trace: a request id (taken from a well-formed
+X-Request-ID header or generated) and a tree of timed spans opened with
+
+    with tracing.span('llm.call', endpoint='score'):
+        ...
+
+The current trace and span live in context variables, so nested spans
+parent themselves and code running outside a request (background workers,
+the async LLM loop) records nothing. Recording a span is a few attribute
+writes and one list append; serialization only happens for traces that are
+exported:
+
+- a random TRACE_SAMPLE_RATE fraction of requests (head sampling)
+- every request slower than TRACE_SLOW_MS or answered with a 5xx, which
+  also writes a one-line slow-request warning with the slowest spans
+
+Exporters: 'log' writes one JSON line per trace to the "tracing" logger,
+'otlp-file' appends OTLP/JSON ExportTraceServiceRequest lines to
+TRACE_EXPORT_PATH (readable by the OpenTelemetry collector's file
+receiver), 'off' disables export but keeps the slow-request log.
+"""
+import contextvars
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_RE = re.compile(r'^[A-Za-z0-9._:-]{1,64}$')
+
+# OTLP enums
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_CODE_ERROR = 2
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar('trace', default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar('span', default=None)
+
+
+class Span:
+    __slots__ = ('name', 'span_id', 'parent_id', 'start_ns', 'end_ns', 'attributes', 'error')
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+
+class Trace:
+    def __init__(self, name: str, request_id: Optional[str], sampled: bool, attributes: Dict[str, Any]):
+        self.trace_id = uuid.uuid4().hex
+        self.request_id = request_id if request_id and REQUEST_ID_RE.match(request_id) else self.trace_id
+        self.sampled = sampled
+        self.root = Span(name, None, attributes)
+        self.spans: List[Span] = [self.root]
+        self._tokens: tuple = ()
+
+    @property
+    def duration_ms(self) -> float:
+        return self.root.duration_ms
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_request_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.request_id if trace else None
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Time a block as a child of the current span; a no-op outside a trace"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _current_span.get()
+    current = Span(name, parent.span_id if parent else None, attributes)
+    trace.spans.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # A generator span closed from another context (client disconnect); nothing to restore
+            pass
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Add attributes to the innermost open span of the current trace"""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+# --- Exporters ---------------------------------------------------------------
+
+def _json_safe(value: Any) -> Any:
+    return value if isinstance(value, (str, int, float, bool)) or value is None else str(value)
+
+
+class LogExporter:
+    """One JSON line per trace on the "tracing" logger"""
+
+    def export(self, trace: Trace) -> None:
+        root_start = trace.root.start_ns
+        logger.info(json.dumps({
+            'trace_id': trace.trace_id,
+            'request_id': trace.request_id,
+            'name': trace.root.name,
+            'duration_ms': round(trace.duration_ms, 2),
+            'attributes': {k: _json_safe(v) for k, v in trace.root.attributes.items()},
+            'spans': [{
+                'name': s.name,
+                'span_id': s.span_id,
+                'parent_id': s.parent_id,
+                'start_ms': round((s.start_ns - root_start) / 1e6, 2),
+                'duration_ms': round(s.duration_ms, 2),
+                'attributes': {k: _json_safe(v) for k, v in s.attributes.items()},
+                'error': s.error,
+            } for s in trace.spans[1:]],
+        }, separators=(',', ':')))
+
+    def close(self) -> None:
+        pass
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        # proto3 JSON encodes int64 as a string
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class OTLPFileExporter:
+    """Append OTLP/JSON ExportTraceServiceRequest lines to a file"""
+
+    def __init__(self, path: str, service_name: str = 'swipe-backend'):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _span(self, trace: Trace, s: Span) -> Dict[str, Any]:
+        attributes = dict(s.attributes)
+        if s is trace.root:
+            attributes['request_id'] = trace.request_id
+        entry = {
+            'traceId': trace.trace_id,
+            'spanId': s.span_id,
+            'name': s.name,
+            'kind': SPAN_KIND_SERVER if s is trace.root else SPAN_KIND_INTERNAL,
+            'startTimeUnixNano': str(s.start_ns),
+            'endTimeUnixNano': str(s.end_ns or time.time_ns()),
+            'attributes': [{'key': k, 'value': _otlp_value(v)} for k, v in attributes.items() if v is not None],
+            'status': {'code': STATUS_CODE_ERROR, 'message': s.error} if s.error else {},
+        }
+        if s.parent_id:
+            entry['parentSpanId'] = s.parent_id
+        return entry
+
+    def export(self, trace: Trace) -> None:
+        line = json.dumps({'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': self.service_name}}]},
+            'scopeSpans': [{
+                'scope': {'name': 'swipe.tracing'},
+                'spans': [self._span(trace, s) for s in trace.spans],
+            }],
+        }]}, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+# --- Tracer ------------------------------------------------------------------
+
+class Tracer:
+    def __init__(self, exporter=None, sample_rate: float = 0.0, slow_ms: float = 2000.0,
+                 max_spans: int = 256):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.max_spans = max_spans
+        self._lock = threading.Lock()
+        self._stats = {'traces': 0, 'exported': 0, 'slow': 0, 'export_errors': 0}
+
+    def start(self, name: str, request_id: Optional[str] = None, **attributes: Any) -> Trace:
+        """Begin a trace and make it current for this context"""
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        trace = Trace(name, request_id, sampled, attributes)
+        trace._tokens = (_current_trace.set(trace), _current_span.set(trace.root))
+        return trace
+
+    def finish(self, trace: Trace, error: bool = False, **attributes: Any) -> None:
+        """Close the root span, then export the trace if it was sampled, slow or failed"""
+        trace.root.end_ns = time.time_ns()
+        trace.root.attributes.update(attributes)
+        if trace._tokens:
+            trace_token, span_token = trace._tokens
+            trace._tokens = ()
+            try:
+                _current_span.reset(span_token)
+                _current_trace.reset(trace_token)
+            except ValueError:
+                # Finished from a different context (e.g. a streamed response); nothing to restore
+                pass
+
+        duration_ms = trace.duration_ms
+        slow = self.slow_ms > 0 and duration_ms >= self.slow_ms
+        with self._lock:
+            self._stats['traces'] += 1
+            self._stats['slow'] += slow
+        if slow:
+            slowest = sorted(trace.spans[1:], key=lambda s: s.duration_ms, reverse=True)[:3]
+            logger.warning("[Trace] Slow request %s %.0fms request_id=%s spans: %s",
+                           trace.root.name, duration_ms, trace.request_id,
+                           ', '.join(f'{s.name}={s.duration_ms:.0f}ms' for s in slowest) or '-')
+        if self.exporter is None or not (trace.sampled or slow or error):
+            return
+        del trace.spans[self.max_spans:]
+        try:
+            self.exporter.export(trace)
+            with self._lock:
+                self._stats['exported'] += 1
+        except Exception as e:
+            with self._lock:
+                self._stats['export_errors'] += 1
+            logger.error(f"[Trace] Export failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, sample_rate=self.sample_rate, slow_ms=self.slow_ms,
+                        exporter=type(self.exporter).__name__ if self.exporter else None)
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+def create_tracer_from_env() -> Tracer:
+    """
+    TRACE_EXPORTER: log (default) | otlp-file | off
+    TRACE_SAMPLE_RATE: fraction of requests exported (default 0.01)
+    TRACE_SLOW_MS: slow-request threshold in ms, always exported and logged (default 2000, 0 disables)
+    TRACE_EXPORT_PATH: file for the otlp-file exporter
+    """
+    kind = os.getenv('TRACE_EXPORTER', 'log').lower()
+    exporter = None
+    if kind == 'log':
+        exporter = LogExporter()
+    elif kind == 'otlp-file':
+        path = os.getenv('TRACE_EXPORT_PATH') or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), '.traces', 'traces.jsonl')
+        exporter = OTLPFileExporter(path)
+    elif kind != 'off':
+        logger.warning(f"[Trace] Unknown TRACE_EXPORTER={kind}, exporting nothing")
+    return Tracer(exporter,
+                  sample_rate=float(os.getenv('TRACE_SAMPLE_RATE', 0.01)),
+                  slow_ms=float(os.getenv('TRACE_SLOW_MS', 2000)))
@@ -48,6 +48,9 @@ CREATE INDEX idx_interviews_student_id ON interviews(student_id);
 CREATE INDEX idx_interviews_status ON interviews(status);
 CREATE INDEX idx_interviews_final_score ON interviews(final_score DESC);
 CREATE INDEX idx_students_email ON students(email);
+-- Keyset pagination: GET /api/jobs pages on (created_at, id), candidate listings on (final_score, id)
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at_id ON jobs(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_interviews_job_score_id ON interviews(job_id, final_score DESC, id);
 
 -- Create updated_at trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -68,6 +71,54 @@ CREATE TRIGGER update_students_updated_at BEFORE UPDATE ON students
 CREATE TRIGGER update_interviews_updated_at BEFORE UPDATE ON interviews
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Per-job leaderboard: one compact row per candidate, kept in sync with interviews.
+-- Ranking queries read this table instead of the interviews JSONB bodies.
+-- This section is idempotent: run it on its own to add the leaderboard to an existing database.
+CREATE TABLE IF NOT EXISTS job_leaderboard (
+    job_id UUID NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    student_id UUID NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+    interview_id UUID REFERENCES interviews(id) ON DELETE CASCADE,
+    name VARCHAR(255),
+    final_score DECIMAL(3,1) NOT NULL CHECK (final_score >= 0 AND final_score <= 10),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (job_id, student_id)
+);
+
+-- Serves top-K, rank and percentile lookups as index range scans
+CREATE INDEX IF NOT EXISTS idx_job_leaderboard_rank ON job_leaderboard(job_id, final_score DESC, student_id);
+
+-- Incremental maintenance: finalized scores written directly to interviews
+-- (e.g. from the browser) update the leaderboard as well
+CREATE OR REPLACE FUNCTION sync_job_leaderboard()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.final_score IS NULL OR NEW.job_id IS NULL OR NEW.student_id IS NULL THEN
+        DELETE FROM job_leaderboard WHERE job_id = NEW.job_id AND student_id = NEW.student_id;
+        RETURN NEW;
+    END IF;
+    INSERT INTO job_leaderboard (job_id, student_id, interview_id, name, final_score, updated_at)
+    SELECT NEW.job_id, NEW.student_id, NEW.id, s.name, NEW.final_score, NOW()
+    FROM students s WHERE s.id = NEW.student_id
+    ON CONFLICT (job_id, student_id) DO UPDATE
+        SET interview_id = EXCLUDED.interview_id,
+            name = EXCLUDED.name,
+            final_score = EXCLUDED.final_score,
+            updated_at = EXCLUDED.updated_at;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS sync_interviews_leaderboard ON interviews;
+CREATE TRIGGER sync_interviews_leaderboard AFTER INSERT OR UPDATE OF final_score ON interviews
+    FOR EACH ROW EXECUTE FUNCTION sync_job_leaderboard();
+
+-- Backfill for existing databases
+INSERT INTO job_leaderboard (job_id, student_id, interview_id, name, final_score)
+SELECT i.job_id, i.student_id, i.id, s.name, i.final_score
+FROM interviews i JOIN students s ON s.id = i.student_id
+WHERE i.final_score IS NOT NULL AND i.job_id IS NOT NULL
+ON CONFLICT (job_id, student_id) DO NOTHING;
+
 -- Insert sample data
 INSERT INTO jobs (title, description, custom_questions) VALUES
 ('Fullstack Developer', 'React/Node.js developer position with 2+ years experience', '[]'::jsonb),
@@ -78,6 +129,7 @@ INSERT INTO jobs (title, description, custom_questions) VALUES
 -- ALTER TABLE jobs ENABLE ROW LEVEL SECURITY;
 -- ALTER TABLE students ENABLE ROW LEVEL SECURITY;
 -- ALTER TABLE interviews ENABLE ROW LEVEL SECURITY;
+-- ALTER TABLE job_leaderboard ENABLE ROW LEVEL SECURITY;
 
 -- Grant permissions (adjust based on your Supabase setup)
 -- GRANT ALL ON ALL TABLES IN SCHEMA public TO authenticated;